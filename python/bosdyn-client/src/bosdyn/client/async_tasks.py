@@ -6,12 +6,20 @@
 
 """Utilities for managing periodic tasks consisting of asynchronous GRPC calls."""
 import abc
+import collections
+import functools
+import heapq
+import itertools
+import logging
+import threading
 import time
 
 import six
 
 from .exceptions import ResponseError, RpcError
 
+_LOGGER = logging.getLogger(__name__)
+
 
 class AsyncTasks(object):
     """Manages a set of tasks which work by periodically calling an update() method.
@@ -37,6 +45,209 @@ class AsyncTasks(object):
             task.update()
 
 
+class TaskStats(object):
+    """Scheduling statistics of a task run by an AsyncTaskScheduler.
+
+    Attributes:
+        num_queries: Number of queries started.
+        num_overruns: Number of periods skipped because the previous query was still in flight,
+            or because the scheduler's limit of outstanding queries was reached.
+        num_coalesced: Number of periods skipped because the scheduler was late, e.g. when a
+            task's result handler took longer than a period.
+        total_jitter_sec: Sum of the delays between when queries were due and when they started.
+        max_jitter_sec: Largest delay between when a query was due and when it started.
+    """
+
+    def __init__(self):
+        self.num_queries = 0
+        self.num_overruns = 0
+        self.num_coalesced = 0
+        self.total_jitter_sec = 0.0
+        self.max_jitter_sec = 0.0
+
+    @property
+    def mean_jitter_sec(self):
+        """Mean delay between when queries were due and when they started."""
+        if not self.num_queries:
+            return 0.0
+        return self.total_jitter_sec / self.num_queries
+
+
+class AsyncTaskScheduler(object):
+    """Runs tasks on a dedicated thread, instead of polling them with AsyncTasks.update().
+
+    Periodic tasks (AsyncPeriodicGRPCTask, such as AsyncPeriodicQuery) start their queries when
+    their period_sec is due, and their results are handled on the scheduler thread when the
+    queries complete.  A task has at most one query in flight: the periods which are due while
+    it is in flight, or which are missed because the scheduler thread is late, are skipped rather
+    than run late.  Other tasks are polled with update() every poll_period_sec.
+
+    Args:
+        tasks: List of tasks to run.
+        max_outstanding: Maximum number of queries in flight for all tasks, or None for no limit.
+            Queries over the limit start in turn as the queries in flight complete.
+        poll_period_sec: Time between updates of tasks which are not periodic.
+        logger: Logger for errors, by default this module's logger.
+    """
+
+    def __init__(self, tasks=None, max_outstanding=None, poll_period_sec=0.05, logger=None):
+        self._max_outstanding = max_outstanding
+        self._poll_period_sec = poll_period_sec
+        self._logger = logger or _LOGGER
+        self._cond = threading.Condition()
+        self._locked_schedule = []  # Heap of (due time, sequence number, task).
+        self._locked_done_tasks = collections.deque()  # Tasks whose query completed.
+        self._locked_should_exit = False
+        self._sequence = itertools.count()  # Orders tasks due at the same time.
+        self._num_outstanding = 0
+        # (task, due time) of the queries waiting for fewer queries to be outstanding.
+        self._waiting = collections.deque()
+        self._stats = {}  # {task -> TaskStats}
+        self._thread = None
+        for task in tasks or []:
+            self.add_task(task)
+
+    def __del__(self):
+        self.stop()
+
+    def add_task(self, task):
+        """Add a task to run, starting now.
+
+        Args:
+            task: Task to add.
+        """
+        with self._cond:
+            self._stats[task] = TaskStats()
+            heapq.heappush(self._locked_schedule, (time.monotonic(), next(self._sequence), task))
+            self._cond.notify()
+
+    def stats(self, task):
+        """Return a copy of the TaskStats of a task."""
+        with self._cond:
+            stats = TaskStats()
+            stats.__dict__.update(self._stats[task].__dict__)
+            return stats
+
+    def start(self):
+        """Start the scheduler thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        with self._cond:
+            self._locked_should_exit = False
+        self._thread = threading.Thread(target=self._scheduler_thread)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Shut down the scheduler thread if it is running.  Queries in flight are not handled."""
+        if self._thread:
+            with self._cond:
+                self._locked_should_exit = True
+                self._cond.notify()
+            self._thread.join()
+            self._thread = None
+
+    def _scheduler_thread(self):
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                while not (self._locked_should_exit or self._locked_done_tasks or
+                           (self._locked_schedule and self._locked_schedule[0][0] <= now)):
+                    timeout = None
+                    if self._locked_schedule:
+                        timeout = self._locked_schedule[0][0] - now
+                    self._cond.wait(timeout)
+                    now = time.monotonic()
+                if self._locked_should_exit:
+                    return
+                done_tasks = list(self._locked_done_tasks)
+                self._locked_done_tasks.clear()
+                due_tasks = []
+                while self._locked_schedule and self._locked_schedule[0][0] <= now:
+                    due_time, _sequence, task = heapq.heappop(self._locked_schedule)
+                    due_tasks.append((due_time, task))
+            for task in done_tasks:
+                self._handle_done(task)
+            for due_time, task in due_tasks:
+                self._run_due(task, due_time)
+
+    def _run_due(self, task, due_time):
+        period_sec = getattr(task, '_period_sec', None)
+        if period_sec is None:
+            try:
+                task.update()
+            except Exception:  # pylint: disable=broad-except
+                self._logger.exception('Error updating task %s', task)
+            period_sec = self._poll_period_sec
+        else:
+            try:
+                self._start_query(task, due_time)
+            except Exception:  # pylint: disable=broad-except
+                self._logger.exception('Error starting query of task %s', task)
+        now = time.monotonic()
+        next_due_time = due_time + period_sec
+        if next_due_time <= now:
+            num_missed = int((now - next_due_time) // period_sec) + 1
+            next_due_time += num_missed * period_sec
+            with self._cond:
+                self._stats[task].num_coalesced += num_missed
+        with self._cond:
+            heapq.heappush(self._locked_schedule, (next_due_time, next(self._sequence), task))
+
+    def _start_query(self, task, due_time):
+        stats = self._stats[task]
+        if task._future is not None:
+            with self._cond:
+                stats.num_overruns += 1
+            return
+        if self._max_outstanding is not None and self._num_outstanding >= self._max_outstanding:
+            with self._cond:
+                stats.num_overruns += 1
+            # Start the query as soon as another one completes, in turn with the other tasks.
+            if all(waiting_task is not task for waiting_task, _due_time in self._waiting):
+                self._waiting.append((task, due_time))
+            return
+        jitter_sec = time.monotonic() - due_time
+        task._last_call = time.time()
+        try:
+            future = task._start_query()
+        except (RpcError, ResponseError) as err:
+            task._handle_error(err)
+            future = None
+        with self._cond:
+            stats.num_queries += 1
+            stats.total_jitter_sec += jitter_sec
+            stats.max_jitter_sec = max(stats.max_jitter_sec, jitter_sec)
+        if future is None:
+            return
+        task._future = future
+        self._num_outstanding += 1
+        future.add_done_callback(functools.partial(self._on_query_done, task))
+
+    def _on_query_done(self, task, future):  # pylint: disable=unused-argument
+        # Called from the thread completing the query: handle it on the scheduler thread.
+        with self._cond:
+            self._locked_done_tasks.append(task)
+            self._cond.notify()
+
+    def _handle_done(self, task):
+        future = task._future
+        task._future = None
+        self._num_outstanding -= 1
+        try:
+            task._handle_result(future.result())
+        except (RpcError, ResponseError) as err:
+            task._handle_error(err)
+        except Exception:  # pylint: disable=broad-except
+            self._logger.exception('Error handling result of task %s', task)
+        if self._waiting:
+            waiting_task, due_time = self._waiting.popleft()
+            try:
+                self._start_query(waiting_task, due_time)
+            except Exception:  # pylint: disable=broad-except
+                self._logger.exception('Error starting query of task %s', waiting_task)
+
+
 @six.add_metaclass(abc.ABCMeta)  # pylint: disable=too-few-public-methods
 class AsyncGRPCTask(object):
     """Task to be accomplished using asynchronous GRPC calls.
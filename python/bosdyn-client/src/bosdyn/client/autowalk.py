@@ -57,6 +57,16 @@ class AutowalkClient(BaseClient):
                          _get_compile_autowalk_response_from_chunks,
                          _compile_autowalk_error_from_response, copy_request=False, **kwargs)
 
+    async def compile_autowalk_aio(self, walk, data_chunk_byte_size=1000 * 1000, **kwargs):
+        """Asyncio version of compile_autowalk()."""
+        request = self._compile_autowalk_request(walk)
+        self._apply_request_processors(request, copy_request=False)
+        return await self.call_aio(self.aio_stub.CompileAutowalk,
+                                   BaseClient.chunk_message(request, data_chunk_byte_size),
+                                   _get_compile_autowalk_response_from_chunks,
+                                   _compile_autowalk_error_from_response, copy_request=False,
+                                   **kwargs)
+
     def load_autowalk(self, walk, leases=[], data_chunk_byte_size=1000 * 1000, **kwargs):
         """
         Send the input walk file to the autowalk service for compilation and
@@ -69,6 +79,17 @@ class AutowalkClient(BaseClient):
                          _get_load_autowalk_response_from_chunks,
                          _load_autowalk_error_from_response, copy_request=False, **kwargs)
 
+    async def load_autowalk_aio(self, walk, leases=[], data_chunk_byte_size=1000 * 1000,
+                                **kwargs):
+        """Asyncio version of load_autowalk()."""
+        request = self._load_autowalk_request(walk, leases)
+        self._apply_request_processors(request, copy_request=False)
+        return await self.call_aio(self.aio_stub.LoadAutowalk,
+                                   BaseClient.chunk_message(request, data_chunk_byte_size),
+                                   _get_load_autowalk_response_from_chunks,
+                                   _load_autowalk_error_from_response, copy_request=False,
+                                   **kwargs)
+
     @staticmethod
     def _compile_autowalk_request(walk):
         request = autowalk_pb2.CompileAutowalkRequest(walk=walk)
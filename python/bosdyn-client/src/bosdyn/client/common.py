@@ -5,11 +5,14 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Contains elements common to all service clients."""
+import contextlib
 import copy
 import functools
 import logging
 import math
 import socket
+import threading
+import time
 import types
 
 import grpc
@@ -18,6 +21,7 @@ import six
 from .channel import TransportError, translate_exception
 from .exceptions import (Error, InternalServerError, InvalidRequestError, LeaseUseError,
                          LicenseError, UnsetStatusError)
+from .server_util import get_bytes_field_allowlist
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,6 +29,19 @@ from bosdyn.api import data_chunk_pb2, license_pb2
 
 DEFAULT_RPC_TIMEOUT = 30  # seconds
 
+# Policies for protecting the requests passed to BaseClient.call*() from the request processors,
+# selected by BaseClient.request_copy_policy.  These apply unless copy_request=False is passed.
+#  Copy the whole request, and run the processors on the copy.
+REQUEST_COPY_DEEP = 'deep'
+#  Run the processors on the request itself, and restore the fields which the standard processors
+#  set (header, lease and leases) once the request has been sent.  Only those small fields are
+#  copied, however large the request.  Custom request processors must not modify other fields,
+#  and the request must not be used by other threads or tasks until the call returns.
+REQUEST_COPY_PROCESSED_FIELDS = 'processed_fields'
+
+# Request fields set by the standard request processors.
+_PROCESSED_REQUEST_FIELDS = ('header', 'lease', 'leases')
+
 
 def common_header_errors(response):
     """Return an exception based on common response header. None if no error."""
@@ -199,6 +216,97 @@ def maybe_raise(exc):
         raise exc
 
 
+def _is_repeated(field):
+    # FieldDescriptor.label was replaced by is_repeated in newer protobuf versions.
+    is_repeated = getattr(field, 'is_repeated', None)
+    if is_repeated is not None:
+        return is_repeated
+    return field.label == field.LABEL_REPEATED
+
+
+def _save_processed_fields(request):
+    """Return copies of the fields of request which request processors may set."""
+    saved_fields = []
+    for name in _PROCESSED_REQUEST_FIELDS:
+        field = request.DESCRIPTOR.fields_by_name.get(name)
+        if field is None or field.message_type is None:
+            continue
+        if _is_repeated(field):
+            saved_fields.append((name, [copy.deepcopy(value) for value in getattr(request, name)]))
+        elif request.HasField(name):
+            saved_fields.append((name, copy.deepcopy(getattr(request, name))))
+        else:
+            saved_fields.append((name, None))
+    return saved_fields
+
+
+def _restore_processed_fields(request, saved_fields):
+    """Restore the fields saved by _save_processed_fields()."""
+    for name, saved in saved_fields:
+        request.ClearField(name)
+        if isinstance(saved, list):
+            getattr(request, name).extend(saved)
+        elif saved is not None:
+            getattr(request, name).CopyFrom(saved)
+
+
+def _processed_fields_message(request):
+    """Return a message of the type of request, with copies of only the processed fields."""
+    message = type(request)()
+    _restore_processed_fields(message, _save_processed_fields(request))
+    return message
+
+
+# {message type -> function removing the large bytes fields of a message}, for logging.
+_STRIP_FOR_LOG_FUNCS = get_bytes_field_allowlist()
+
+
+def _strip_for_log(message):
+    """Return message, or a copy of it without its large bytes fields if it has any."""
+    strip_func = _STRIP_FOR_LOG_FUNCS.get(type(message))
+    if strip_func is None:
+        return message
+    message = copy.deepcopy(message)
+    strip_func(message)
+    return message
+
+
+class _LogMessage(object):
+    """Log argument which formats a message only if the log record is emitted."""
+
+    __slots__ = ('_format_func', '_message', '_max_chars', '_text')
+
+    def __init__(self, format_func, message, max_chars=None):
+        self._format_func = format_func
+        self._message = message
+        self._max_chars = max_chars
+        self._text = None
+
+    def __str__(self):
+        # Each log handler formats the record, so only format the message once.
+        if self._text is None:
+            text = self._format_func(self._message)
+            if self._max_chars is not None and len(text) > self._max_chars:
+                text = '{}... ({} more characters)\n'.format(text[:self._max_chars],
+                                                           len(text) - self._max_chars)
+            self._text = text
+        return self._text
+
+
+class _CoalescedRpc(object):
+    """Response future of an rpc shared by identical calls (see BaseClient.coalesced_rpcs)."""
+
+    __slots__ = ('future', 'ttl_sec', 'done_time')
+
+    def __init__(self, future, ttl_sec):
+        self.future = future
+        self.ttl_sec = ttl_sec
+        self.done_time = None  # time.monotonic() when the response was received.
+
+    def expired(self, now):
+        return self.done_time is not None and now - self.done_time >= self.ttl_sec
+
+
 def print_response(func):
     """Decorate "error from response" functions to print for debugging specific messages."""
 
@@ -241,19 +349,55 @@ def process_kwargs(func):
 
 
 class BaseClient(object):
-    """Helper base class for all clients to Boston Dynamics services."""
+    """Helper base class for all clients to Boston Dynamics services.
+
+    Requests and responses are logged at DEBUG level.  They are only formatted if the log record
+    is emitted, without their large bytes fields (see server_util.strip_large_bytes_fields), and
+    are truncated to log_max_chars characters, or log_max_chars_by_method[method name] for a
+    given rpc method.
+
+    By default, each request is copied before the request processors modify it, so the request
+    passed in by the caller is unchanged.  For rpcs with large requests, setting
+    request_copy_policy to REQUEST_COPY_PROCESSED_FIELDS avoids copying the whole request.
+
+    Read-only rpcs can be coalesced: while a call of an rpc named in coalesced_rpcs is in flight,
+    identical calls (same rpc method and request) from any thread share its response future
+    instead of making their own rpc, and the response is reused for the given number of seconds
+    after it is received.  Shared responses must not be modified by the caller, and cancelling a
+    shared future cancels it for all callers.  Clients list their rpcs which are safe to coalesce
+    in read_only_rpcs:
+
+        robot_state_client.coalesce_read_only_rpcs(ttl_sec=0.02)
+
+    Response processors may also have an on_rpc_error(request, error) method, which is called
+    when an rpc fails without a response (see rpc_metrics.RpcMetrics).
+
+    Besides the blocking foo() and future-based foo_async() methods, some clients have asyncio
+    versions of their methods named foo_aio(), which are coroutines:
+
+        robot_id = await robot_id_client.get_id_aio()
+
+    The asyncio versions make the rpcs on a grpc.aio channel (see aio_channel) with call_aio() or
+    call_aio_stream(), running the same request/response processors and response handlers as the
+    other versions, and also support streaming rpcs.
+    """
 
     _SPLIT_SERVICE = '.'
     _SPLIT_METHOD = '/'
 
+    # Names of the rpcs of the service which only read state, so may be coalesced.
+    read_only_rpcs = ()
+
     def __init__(self, stub_creation_func, name=None):
         self._service_type_short = getattr(self.__class__, 'service_type',
                                            'BaseClient').split(BaseClient._SPLIT_SERVICE)[-1]
 
         self._channel = None
+        self._aio_channel = None
         self._logger = None
         self._name = name
         self._stub = None
+        self._aio_stub = None
         self._stub_creation_func = stub_creation_func
 
         self.logger = logging.getLogger(self._name or 'bosdyn.{}'.format(self._service_type_short))
@@ -261,14 +405,26 @@ class BaseClient(object):
         self.response_processors = []
         self.lease_wallet = None
         self.client_name = None
+        self.request_copy_policy = REQUEST_COPY_DEEP
+        # Maximum length of the text of a logged request or response, None for no limit.
+        self.log_max_chars = None
+        # {rpc method name (e.g. 'GetRobotState') -> maximum length}, overriding log_max_chars.
+        self.log_max_chars_by_method = {}
+        # Callable returning a grpc.aio channel, used to create aio_channel on first use.
+        self.aio_channel_factory = None
+        # {rpc method name -> time (sec) to reuse a response} of the rpcs to coalesce.
+        self.coalesced_rpcs = {}
+        self._coalescing_lock = threading.Lock()
+        # {(rpc method name, serialized request) -> _CoalescedRpc}
+        self._locked_coalesced_calls = {}
 
     @staticmethod
     def request_trim_for_log(req):
-        return '\n{}\n'.format(req)
+        return '\n{}\n'.format(_strip_for_log(req))
 
     @staticmethod
     def response_trim_for_log(resp):
-        return '\n{}\n'.format(resp)
+        return '\n{}\n'.format(_strip_for_log(resp))
 
     @property
     def channel(self):
@@ -281,6 +437,32 @@ class BaseClient(object):
         self._channel = channel
         self._stub = self._stub_creation_func(channel)
 
+    @property
+    def aio_channel(self):
+        """The grpc.aio channel used by the asyncio (foo_aio) methods of the client.
+
+        If it is unset, it is created with aio_channel_factory on first use.  A grpc.aio channel
+        must only be used from the event loop on which it was first used.
+        """
+        if self._aio_channel is None:
+            if self.aio_channel_factory is None:
+                raise Error('Client aio channel is unset!')
+            self.aio_channel = self.aio_channel_factory()
+        return self._aio_channel
+
+    @aio_channel.setter
+    def aio_channel(self, channel):
+        self._aio_channel = channel
+        self._aio_stub = None if channel is None else self._stub_creation_func(channel)
+
+    @property
+    def aio_stub(self):
+        """The stub on aio_channel, for the rpc methods passed to call_aio()."""
+        if self._aio_stub is None:
+            # Creates the aio channel and its stub.
+            self.aio_channel  # pylint: disable=pointless-statement
+        return self._aio_stub
+
     def update_from(self, other):
         """Adopt key objects like processors, logger, and wallet from other."""
         self.request_processors = other.request_processors + self.request_processors
@@ -289,28 +471,31 @@ class BaseClient(object):
         self.lease_wallet = other.lease_wallet
         self.client_name = other.client_name
 
+    def coalesce_read_only_rpcs(self, ttl_sec=0.0):
+        """Coalesce identical concurrent calls of the rpcs in read_only_rpcs.
+
+        Args:
+         ttl_sec:  time (sec) to reuse a response after it is received, 0 to only share the
+                   response with the calls made while the rpc is in flight.
+        """
+        for rpc_name in self.read_only_rpcs:
+            self.coalesced_rpcs[rpc_name] = ttl_sec
+
     def update_request_iterator(self, request_iterator, logger, rpc_method, is_blocking,
                                 copy_request=True):
+        log_prefix = 'blocking request' if is_blocking else 'async request'
         for request in request_iterator:
-            request = self._apply_request_processors(request, copy_request=copy_request)
-            if is_blocking:
-                logger.debug('blocking request: %s %s', rpc_method._method,
-                             self.request_trim_for_log(request))
-            else:
-                logger.debug('async request: %s %s', rpc_method._method,
-                             self.request_trim_for_log(request))
-            yield request
+            with self._processed_request(request, copy_request, logger, rpc_method,
+                                         log_prefix) as processed_request:
+                yield processed_request
 
     def update_response_iterator(self, response_iterator, logger, rpc_method, is_blocking):
         try:
             for response in response_iterator:
-                response = self._apply_response_processors(copy.deepcopy(response))
-                if is_blocking:
-                    logger.debug('blocking response: %s %s', rpc_method._method,
-                                 self.request_trim_for_log(response))
-                else:
-                    logger.debug('async response: %s %s', rpc_method._method,
-                                 self.request_trim_for_log(response))
+                # Each response is a new message, so the processors may modify it in place.
+                response = self._apply_response_processors(response)
+                self._log_response(logger, 'blocking response' if is_blocking else 'async response',
+                                   rpc_method, response)
                 yield response
         except TransportError as e:
             # Iterating through the response_iterator is the point that transport exceptions will
@@ -319,7 +504,9 @@ class BaseClient(object):
             # Any ResponseErrors or other exception types can be let through untranslated.
             # Use the "raise from None" pattern to reset the exception's context, which produces
             # confusing stack traces.
-            six.raise_from(translate_exception(e), None)
+            error = translate_exception(e)
+            self._apply_error_processors(None, error)
+            six.raise_from(error, None)
 
     @process_kwargs
     def call(self, rpc_method, request, value_from_response=None, error_from_response=None,
@@ -330,24 +517,30 @@ class BaseClient(object):
         Additionally, value_from_response and error_from_response that are not common handlers
         must accept streaming responses if it is a grpc streaming response.
         """
+        if self.coalesced_rpcs and self._coalesced_rpc_key(rpc_method, request, kwargs):
+            return self.call_async(rpc_method, request, value_from_response, error_from_response,
+                                   copy_request=copy_request, **kwargs).result()
         logger = self._get_logger(rpc_method)
         if isinstance(rpc_method, grpc.StreamUnaryMultiCallable) or isinstance(
                 rpc_method, grpc.StreamStreamMultiCallable):
             # The incoming request is a streaming request.
-            request = self.update_request_iterator(request, logger, rpc_method, is_blocking=True,
-                                                   copy_request=copy_request)
+            processed_request = contextlib.nullcontext(
+                self.update_request_iterator(request, logger, rpc_method, is_blocking=True,
+                                             copy_request=copy_request))
         else:
-            request = self._apply_request_processors(request, copy_request=copy_request)
-            logger.debug('blocking request: %s %s', rpc_method._method,
-                         self.request_trim_for_log(request))
+            processed_request = self._processed_request(request, copy_request, logger, rpc_method,
+                                                        'blocking request')
 
-        try:
-            timeout = kwargs.pop('timeout', DEFAULT_RPC_TIMEOUT)
-            response = rpc_method(request, timeout=timeout, **kwargs)
-        except TransportError as e:
-            # Use the "raise from None" pattern to reset the exception's context, which produces
-            # confusing stack traces.
-            six.raise_from(translate_exception(e), None)
+        with processed_request as request:
+            try:
+                timeout = kwargs.pop('timeout', DEFAULT_RPC_TIMEOUT)
+                response = rpc_method(request, timeout=timeout, **kwargs)
+            except TransportError as e:
+                error = translate_exception(e)
+                self._apply_error_processors(request, error)
+                # Use the "raise from None" pattern to reset the exception's context, which
+                # produces confusing stack traces.
+                six.raise_from(error, None)
 
         if isinstance(rpc_method, grpc.UnaryStreamMultiCallable) or isinstance(
                 rpc_method, grpc.StreamStreamMultiCallable):
@@ -357,8 +550,7 @@ class BaseClient(object):
                                                   value_from_response)
         else:
             response = self._apply_response_processors(response)
-            logger.debug('response: %s %s', rpc_method._method,
-                         self.response_trim_for_log(response))
+            self._log_response(logger, 'response', rpc_method, response)
             return self.handle_response(response, error_from_response, value_from_response)
 
     def handle_response(self, response, error_from_response, value_from_response):
@@ -390,31 +582,230 @@ class BaseClient(object):
 
         value_from_response and error_from_response should not raise their own exceptions!
 
-        Asynchronous calls cannot be done with streaming rpcs right now.
+        Asynchronous calls cannot be done with streaming rpcs right now; use call_aio() instead.
         """
-        request = self._apply_request_processors(request, copy_request=copy_request)
-        logger = self._get_logger(rpc_method)
-        logger.debug('async request: %s %s', rpc_method._method, self.request_trim_for_log(request))
-        timeout = kwargs.pop('timeout', DEFAULT_RPC_TIMEOUT)
-        response_future = rpc_method.future(request, timeout=timeout, **kwargs)
+        coalesced_key = None
+        if self.coalesced_rpcs:
+            coalesced_key = self._coalesced_rpc_key(rpc_method, request, kwargs)
+        if coalesced_key is not None:
+            with self._coalescing_lock:
+                coalesced = self._locked_coalesced_calls.get(coalesced_key)
+                if coalesced is not None and not coalesced.expired(time.monotonic()):
+                    return FutureWrapper(coalesced.future, value_from_response,
+                                         error_from_response)
+                response_future, processed_request, logger = self._start_async_call(
+                    rpc_method, request, copy_request, kwargs)
+                coalesced = self._locked_add_coalesced_call(coalesced_key, response_future)
+            response_future.add_done_callback(
+                functools.partial(self._on_coalesced_call_done, coalesced_key, coalesced))
+        else:
+            response_future, processed_request, logger = self._start_async_call(
+                rpc_method, request, copy_request, kwargs)
 
         def on_finish(fut):
             try:
                 result = fut.result()
             except Exception as exc:  # pylint: disable=broad-except
                 logger.debug('async exception: %s\n%s\n', rpc_method._method, exc)
+                try:
+                    self._apply_error_processors(processed_request, translate_exception(exc))
+                except Exception:  # pylint: disable=broad-except
+                    logger.exception("Error applying error processors.")
             else:
                 try:
                     self._apply_response_processors(result)
                 except Exception:  # pylint: disable=broad-except
                     logger.exception("Error applying response processors.")
                 else:
-                    logger.debug('async response: %s %s', rpc_method._method,
-                                 self.response_trim_for_log(result))
+                    self._log_response(logger, 'async response', rpc_method, result)
 
         response_future.add_done_callback(on_finish)
         return FutureWrapper(response_future, value_from_response, error_from_response)
 
+    def _start_async_call(self, rpc_method, request, copy_request, kwargs):
+        """Start an rpc, returning its response future, the request sent, and the logger.
+
+        The request returned is passed to the error processors if the rpc fails, so it keeps the
+        fields set by the request processors even if they are restored in the request passed in.
+        """
+        logger = self._get_logger(rpc_method)
+        timeout = kwargs.pop('timeout', DEFAULT_RPC_TIMEOUT)
+        with self._processed_request(request, copy_request, logger, rpc_method,
+                                     'async request') as processed_request:
+            # The request is serialized before future() returns.
+            response_future = rpc_method.future(processed_request, timeout=timeout, **kwargs)
+            if (processed_request is not None and copy_request and
+                    self.request_copy_policy == REQUEST_COPY_PROCESSED_FIELDS):
+                processed_request = _processed_fields_message(processed_request)
+        return response_future, processed_request, logger
+
+    def _coalesced_rpc_key(self, rpc_method, request, kwargs):
+        """Return the key of identical calls if the call may be coalesced, otherwise None."""
+        if (request is None or not isinstance(rpc_method, grpc.UnaryUnaryMultiCallable) or
+                set(kwargs) - {'timeout'}):
+            return None
+        rpc_name = self._rpc_method_name(rpc_method)
+        if rpc_name not in self.coalesced_rpcs:
+            return None
+        return (rpc_name, request.SerializeToString(deterministic=True))
+
+    def _locked_add_coalesced_call(self, key, response_future):
+        now = time.monotonic()
+        expired_keys = [
+            other_key for other_key, other in self._locked_coalesced_calls.items()
+            if other.expired(now)
+        ]
+        for expired_key in expired_keys:
+            del self._locked_coalesced_calls[expired_key]
+        coalesced = _CoalescedRpc(response_future, self.coalesced_rpcs.get(key[0], 0.0))
+        self._locked_coalesced_calls[key] = coalesced
+        return coalesced
+
+    def _on_coalesced_call_done(self, key, coalesced, response_future):
+        failed = response_future.cancelled() or response_future.exception() is not None
+        with self._coalescing_lock:
+            if self._locked_coalesced_calls.get(key) is not coalesced:
+                return
+            if failed or coalesced.ttl_sec <= 0:
+                # Errors are not reused: the next call retries the rpc.
+                del self._locked_coalesced_calls[key]
+            else:
+                coalesced.done_time = time.monotonic()
+
+    @process_kwargs
+    async def call_aio(self, rpc_method, request, value_from_response=None,
+                       error_from_response=None, copy_request=True, **kwargs):
+        """Coroutine returning the result of rpc_method(request, kwargs) after running processors.
+
+        rpc_method must be a method of a stub on a grpc.aio channel, such as the stub created for
+        aio_channel.  Streaming requests may be iterators or async iterators.  Streaming
+        responses are collected into a list, which is passed to value_from_response and
+        error_from_response as in call().
+
+        value_from_response and error_from_response should not raise their own exceptions!
+        """
+        logger = self._get_logger(rpc_method)
+        timeout = kwargs.pop('timeout', DEFAULT_RPC_TIMEOUT)
+        # grpc.aio serializes requests after the call is started, so the request is only
+        # restored once the call is complete.
+        with self._processed_aio_request(rpc_method, request, logger,
+                                         copy_request) as processed_request:
+            try:
+                rpc_call = rpc_method(processed_request, timeout=timeout, **kwargs)
+                if isinstance(rpc_method, (grpc.aio.UnaryStreamMultiCallable,
+                                           grpc.aio.StreamStreamMultiCallable)):
+                    # The outgoing response is a streaming response.
+                    responses = [
+                        response
+                        async for response in self._update_aio_response_iterator(
+                            rpc_call, logger, rpc_method)
+                    ]
+                    return self.handle_response_streaming(responses, error_from_response,
+                                                          value_from_response)
+                response = await rpc_call
+            except TransportError as e:
+                error = translate_exception(e)
+                self._apply_error_processors(processed_request, error)
+                # Use the "raise from None" pattern to reset the exception's context, which
+                # produces confusing stack traces.
+                six.raise_from(error, None)
+        response = self._apply_response_processors(response)
+        self._log_response(logger, 'aio response', rpc_method, response)
+        return self.handle_response(response, error_from_response, value_from_response)
+
+    async def call_aio_stream(self, rpc_method, request, copy_request=True, **kwargs):
+        """Async generator of the responses of a streaming rpc_method(request, kwargs).
+
+        Like call_aio(), but each response is yielded after running the response processors,
+        as soon as it is received.  Responses are not passed to value or error handlers.
+        """
+        logger = self._get_logger(rpc_method)
+        timeout = kwargs.pop('timeout', DEFAULT_RPC_TIMEOUT)
+        with self._processed_aio_request(rpc_method, request, logger,
+                                         copy_request) as processed_request:
+            try:
+                rpc_call = rpc_method(processed_request, timeout=timeout, **kwargs)
+                async for response in self._update_aio_response_iterator(
+                        rpc_call, logger, rpc_method):
+                    yield response
+            except TransportError as e:
+                error = translate_exception(e)
+                self._apply_error_processors(processed_request, error)
+                six.raise_from(error, None)
+
+    def _processed_aio_request(self, rpc_method, request, logger, copy_request):
+        if not isinstance(rpc_method, (grpc.aio.StreamUnaryMultiCallable,
+                                       grpc.aio.StreamStreamMultiCallable)):
+            return self._processed_request(request, copy_request, logger, rpc_method,
+                                           'aio request')
+        # The incoming request is a streaming request.
+        if hasattr(request, '__aiter__'):
+            return contextlib.nullcontext(
+                self._update_aio_request_iterator(request, logger, rpc_method, copy_request))
+        return contextlib.nullcontext(
+            self.update_request_iterator(request, logger, rpc_method, is_blocking=False,
+                                         copy_request=copy_request))
+
+    async def _update_aio_request_iterator(self, request_iterator, logger, rpc_method,
+                                           copy_request):
+        async for request in request_iterator:
+            with self._processed_request(request, copy_request, logger, rpc_method,
+                                         'aio request') as processed_request:
+                yield processed_request
+
+    async def _update_aio_response_iterator(self, response_iterator, logger, rpc_method):
+        async for response in response_iterator:
+            response = self._apply_response_processors(response)
+            self._log_response(logger, 'aio response', rpc_method, response)
+            yield response
+
+    @contextlib.contextmanager
+    def _processed_request(self, request, copy_request, logger, rpc_method, log_prefix):
+        """Context for sending a request, yielding it after running the request processors.
+
+        Unless copy_request is False, the request passed in is unchanged after the context exits,
+         by the method selected by request_copy_policy.
+        """
+        if (request is None or not copy_request or
+                self.request_copy_policy != REQUEST_COPY_PROCESSED_FIELDS):
+            request = self._apply_request_processors(request, copy_request=copy_request)
+            self._log_request(logger, log_prefix, rpc_method, request)
+            yield request
+            return
+        saved_fields = _save_processed_fields(request)
+        try:
+            self._apply_request_processors(request, copy_request=False)
+            self._log_request(logger, log_prefix, rpc_method, request)
+            yield request
+        finally:
+            _restore_processed_fields(request, saved_fields)
+
+    def _log_request(self, logger, log_prefix, rpc_method, request):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%s: %s %s', log_prefix, rpc_method._method,
+                         _LogMessage(self.request_trim_for_log, request,
+                                     self._log_max_chars(rpc_method)))
+
+    def _log_response(self, logger, log_prefix, rpc_method, response):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%s: %s %s', log_prefix, rpc_method._method,
+                         _LogMessage(self.response_trim_for_log, response,
+                                     self._log_max_chars(rpc_method)))
+
+    def _log_max_chars(self, rpc_method):
+        if self.log_max_chars_by_method:
+            return self.log_max_chars_by_method.get(self._rpc_method_name(rpc_method),
+                                                    self.log_max_chars)
+        return self.log_max_chars
+
+    @staticmethod
+    def _rpc_method_name(rpc_method):
+        """Return the name of the rpc of a stub method, e.g. 'GetRobotState'."""
+        method_name = getattr(rpc_method, '_method', None) or ''
+        if isinstance(method_name, bytes):
+            method_name = method_name.decode()
+        return str(method_name).split(BaseClient._SPLIT_METHOD)[-1]
+
     def _apply_request_processors(self, request, copy_request=True):
         if request is None:
             return
@@ -431,6 +822,16 @@ class BaseClient(object):
             proc.mutate(response)
         return response
 
+    def _apply_error_processors(self, request, error):
+        """Pass a failed rpc to the response processors which have an on_rpc_error(request, error)
+        method.  request is None unless it is a single request message."""
+        if not hasattr(request, 'DESCRIPTOR'):
+            request = None
+        for proc in self.response_processors:
+            on_rpc_error = getattr(proc, 'on_rpc_error', None)
+            if on_rpc_error is not None:
+                on_rpc_error(request, error)
+
     def _get_logger(self, rpc_method):
         method_name = getattr(rpc_method, '_method', None)
         if method_name:
@@ -41,6 +41,8 @@ class DirectoryClient(BaseClient):
     default_service_name = 'directory'
     # gRPC service proto definition implemented by this service
     service_type = 'bosdyn.api.DirectoryService'
+    # Rpcs which may be coalesced, see BaseClient.coalesce_read_only_rpcs().
+    read_only_rpcs = ('ListServiceEntries', 'GetServiceEntry')
 
     def __init__(self):
         super(DirectoryClient, self).__init__(directory_service_pb2_grpc.DirectoryServiceStub)
@@ -4,7 +4,13 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
+import bisect
+import threading
+
+from google.protobuf import timestamp_pb2
+
 from bosdyn.api import geometry_pb2
+from bosdyn.util import sec_to_nsec, timestamp_to_nsec
 
 from . import math_helpers
 
@@ -104,7 +110,8 @@ def get_a_tform_b(frame_tree_snapshot, frame_a, frame_b, validate=True):
     """Get the SE(3) pose representing the transform between frame_a and frame_b.
 
     Using frame_tree_snapshot, find the math_helpers.SE3Pose to transform geometry from
-    frame_a's representation to frame_b's.
+    frame_a's representation to frame_b's.  For many lookups in the same snapshot, compile it
+    into a FrameTree instead.
 
     Args:
         frame_tree_snapshot (dict) dictionary representing the child_to_parent_edge_map
@@ -137,7 +144,7 @@ def get_a_tform_b(frame_tree_snapshot, frame_a, frame_b, validate=True):
     inverse_edges = _list_parent_edges(frame_a)
     forward_edges = _list_parent_edges(frame_b)
 
-    # Possible optimization: Nearest common ancestor pruning.
+    # Use a FrameTree for nearest common ancestor pruning and cached lookups.
 
     def _accumulate_transforms(parent_edges):
         ret = math_helpers.SE3Pose.from_identity()
@@ -150,6 +157,334 @@ def get_a_tform_b(frame_tree_snapshot, frame_a, frame_b, validate=True):
     return frame_a_tform_root_frame * root_frame_tform_frame_b
 
 
+class FrameTree(object):
+    """A FrameTreeSnapshot compiled for repeated transform lookups.
+
+    The edges of the snapshot are converted to math_helpers.SE3Poses once, the transform from the
+    root to every frame is precomputed, and get_a_tform_b() walks only up to the lowest common
+    ancestor of the two frames.  Looked up transforms are memoized, so repeated lookups of the same
+    pair of frames are dictionary lookups.  Each lookup returns a new pose, which the caller may
+    modify.
+
+    Args:
+        frame_tree_snapshot (geometry_pb2.FrameTreeSnapshot)
+        validate (bool) if the FrameTreeSnapshot should be checked for a valid tree structure
+
+    Raises:
+        ValidateFrameTreeError: The snapshot is not a valid tree.  Unknown parent frames and cycles
+            are always detected, the other cases only if validate is True.
+    """
+
+    def __init__(self, frame_tree_snapshot, validate=True):
+        if validate:
+            validate_frame_tree_snapshot(frame_tree_snapshot)
+        self._parent_by_frame = {}
+        self._parent_tform_child_by_frame = {}
+        for frame_name, edge in frame_tree_snapshot.child_to_parent_edge_map.items():
+            self._parent_by_frame[frame_name] = edge.parent_frame_name
+            self._parent_tform_child_by_frame[frame_name] = math_helpers.SE3Pose.from_proto(
+                edge.parent_tform_child)
+        self._depth_by_frame = {}
+        self._root_by_frame = {}
+        self._root_tform_frame = {}
+        self._frame_tform_root = {}
+        self._a_tform_b_cache = {}
+        for frame_name in self._parent_by_frame:
+            self._compile_frame(frame_name)
+
+    def _compile_frame(self, frame_name):
+        """Compute the depth, root and root transform of the frame and of its ancestors."""
+        chain = []
+        cur_frame = frame_name
+        while cur_frame not in self._depth_by_frame:
+            if cur_frame not in self._parent_by_frame:
+                raise ValidateFrameTreeUnknownFrameError()
+            if cur_frame in chain:
+                raise ValidateFrameTreeCycleError()
+            if not self._parent_by_frame[cur_frame]:
+                # At the root of the tree
+                self._depth_by_frame[cur_frame] = 0
+                self._root_by_frame[cur_frame] = cur_frame
+                self._root_tform_frame[cur_frame] = math_helpers.SE3Pose.from_identity()
+                break
+            chain.append(cur_frame)
+            cur_frame = self._parent_by_frame[cur_frame]
+        for child in reversed(chain):
+            parent = self._parent_by_frame[child]
+            self._depth_by_frame[child] = self._depth_by_frame[parent] + 1
+            self._root_by_frame[child] = self._root_by_frame[parent]
+            self._root_tform_frame[child] = (self._root_tform_frame[parent] *
+                                             self._parent_tform_child_by_frame[child])
+
+    def __contains__(self, frame_name):
+        return frame_name in self._depth_by_frame
+
+    @property
+    def frame_names(self):
+        """List of the frames in the tree."""
+        return list(self._depth_by_frame)
+
+    def get_root_frame_name(self, frame_name):
+        """Returns the name of the root of the tree containing frame_name, or None."""
+        return self._root_by_frame.get(frame_name)
+
+    def get_root_tform_frame(self, frame_name):
+        """Returns the precomputed math_helpers.SE3Pose from the root to frame_name, or None."""
+        return _copy_se3_pose(self._root_tform_frame.get(frame_name))
+
+    def get_lowest_common_ancestor(self, frame_a, frame_b):
+        """Returns the name of the deepest frame which is an ancestor of (or is) both frames.
+
+        Returns None if either frame is unknown or the frames are in disjoint trees.
+        """
+        if frame_a not in self._depth_by_frame or frame_b not in self._depth_by_frame:
+            return None
+        if self._root_by_frame[frame_a] != self._root_by_frame[frame_b]:
+            return None
+        depth_a = self._depth_by_frame[frame_a]
+        depth_b = self._depth_by_frame[frame_b]
+        while depth_a > depth_b:
+            frame_a = self._parent_by_frame[frame_a]
+            depth_a -= 1
+        while depth_b > depth_a:
+            frame_b = self._parent_by_frame[frame_b]
+            depth_b -= 1
+        while frame_a != frame_b:
+            frame_a = self._parent_by_frame[frame_a]
+            frame_b = self._parent_by_frame[frame_b]
+        return frame_a
+
+    def get_a_tform_b(self, frame_a, frame_b):
+        """Get the SE(3) pose representing the transform between frame_a and frame_b.
+
+        Args:
+            frame_a (string)
+            frame_b (string)
+
+        Returns:
+            math_helpers.SE3Pose between frame_a and frame_b if they exist in the tree. None
+            otherwise.
+        """
+        return _copy_se3_pose(self._get_a_tform_b(frame_a, frame_b))
+
+    def _get_a_tform_b(self, frame_a, frame_b):
+        """Like get_a_tform_b(), but returns the memoized pose, which must not be modified."""
+        key = (frame_a, frame_b)
+        try:
+            return self._a_tform_b_cache[key]
+        except KeyError:
+            pass
+        a_tform_b = self._compute_a_tform_b(frame_a, frame_b)
+        if a_tform_b is not None:
+            self._a_tform_b_cache[key] = a_tform_b
+        return a_tform_b
+
+    def get_se2_a_tform_b(self, frame_a, frame_b):
+        """Get the SE(2) pose representing the transform between frame_a and frame_b.
+
+        Returns:
+            math_helpers.SE2Pose between frame_a and frame_b if they exist in the tree and
+            frame a is a gravity aligned frame. None otherwise.
+        """
+        if not is_gravity_aligned_frame_name(frame_a):
+            return None
+        se3_a_tform_b = self._get_a_tform_b(frame_a, frame_b)
+        if se3_a_tform_b is None:
+            return None
+        return se3_a_tform_b.get_closest_se2_transform()
+
+    def _compute_a_tform_b(self, frame_a, frame_b):
+        ancestor = self.get_lowest_common_ancestor(frame_a, frame_b)
+        if ancestor is None:
+            return None
+        if frame_a == frame_b:
+            return math_helpers.SE3Pose.from_identity()
+        if ancestor == self._root_by_frame[ancestor]:
+            # Both transforms from the root are precomputed.
+            return self._get_frame_tform_root(frame_a) * self._root_tform_frame[frame_b]
+        # Compose only the edges below the common ancestor.
+        return (self._ancestor_tform_frame(ancestor, frame_a).inverse() *
+                self._ancestor_tform_frame(ancestor, frame_b))
+
+    def _get_frame_tform_root(self, frame_name):
+        try:
+            return self._frame_tform_root[frame_name]
+        except KeyError:
+            frame_tform_root = self._root_tform_frame[frame_name].inverse()
+            self._frame_tform_root[frame_name] = frame_tform_root
+            return frame_tform_root
+
+    def _ancestor_tform_frame(self, ancestor, frame_name):
+        ret = math_helpers.SE3Pose.from_identity()
+        while frame_name != ancestor:
+            ret = self._parent_tform_child_by_frame[frame_name] * ret
+            frame_name = self._parent_by_frame[frame_name]
+        return ret
+
+
+class FrameTreeBuffer(object):
+    """Time-indexed buffer of FrameTreeSnapshots, for transforms at times between snapshots.
+
+    Snapshots are compiled into FrameTrees and kept sorted by acquisition time in robot clock.
+    get_a_tform_b() finds the two snapshots around the requested time by bisection, and
+    interpolates between their transforms with math_helpers.SE3Pose.interp().
+
+    The buffer holds at most max_snapshots snapshots.  When max_age_sec is set, snapshots older
+    than max_age_sec before the newest one are also evicted.  Times are either
+    google.protobuf.Timestamp protos or seconds since the epoch, in robot clock.
+
+    To follow the robot state, e.g.:
+        robot_state_cache.subscribe(lambda state, previous: buffer.add_robot_state(state))
+
+    Args:
+        max_snapshots (int) maximum number of snapshots to keep
+        max_age_sec (float) maximum age of snapshots relative to the newest one, or None
+        validate (bool) if the FrameTreeSnapshots should be checked for a valid tree structure
+    """
+
+    def __init__(self, max_snapshots=100, max_age_sec=None, validate=False):
+        self.max_snapshots = max_snapshots
+        self.max_age_sec = max_age_sec
+        self.validate = validate
+        self._lock = threading.Lock()
+        self._locked_times_nsec = []
+        self._locked_trees = []
+
+    def __len__(self):
+        with self._lock:
+            return len(self._locked_times_nsec)
+
+    @property
+    def time_range_nsec(self):
+        """The (oldest, newest) snapshot times in nanoseconds, or None if empty."""
+        with self._lock:
+            if not self._locked_times_nsec:
+                return None
+            return self._locked_times_nsec[0], self._locked_times_nsec[-1]
+
+    def add(self, frame_tree_snapshot, acquisition_time):
+        """Add a snapshot acquired at the given time.
+
+        Args:
+            frame_tree_snapshot (geometry_pb2.FrameTreeSnapshot)
+            acquisition_time (Timestamp or float seconds) robot time of the snapshot
+
+        Returns:
+            The compiled FrameTree.
+        """
+        tree = FrameTree(frame_tree_snapshot, validate=self.validate)
+        time_nsec = _to_nsec(acquisition_time)
+        with self._lock:
+            index = bisect.bisect_right(self._locked_times_nsec, time_nsec)
+            self._locked_times_nsec.insert(index, time_nsec)
+            self._locked_trees.insert(index, tree)
+            self._locked_evict()
+        return tree
+
+    def add_robot_state(self, robot_state):
+        """Add the snapshot of the kinematic state of a robot_state_pb2.RobotState."""
+        kinematic_state = robot_state.kinematic_state
+        return self.add(kinematic_state.transforms_snapshot,
+                        kinematic_state.acquisition_timestamp)
+
+    def add_image_response(self, image_response):
+        """Add the snapshot of the shot of an image_pb2.ImageResponse."""
+        return self.add(image_response.shot.transforms_snapshot,
+                        image_response.shot.acquisition_time)
+
+    def _locked_evict(self):
+        num_evicted = max(0, len(self._locked_times_nsec) - self.max_snapshots)
+        if self.max_age_sec is not None and self._locked_times_nsec:
+            oldest_nsec = self._locked_times_nsec[-1] - sec_to_nsec(self.max_age_sec)
+            num_evicted = max(num_evicted,
+                              bisect.bisect_left(self._locked_times_nsec, oldest_nsec))
+        if num_evicted:
+            del self._locked_times_nsec[:num_evicted]
+            del self._locked_trees[:num_evicted]
+
+    def clear(self):
+        """Remove all snapshots."""
+        with self._lock:
+            self._locked_times_nsec = []
+            self._locked_trees = []
+
+    def get_frame_tree(self, time, max_time_diff_sec=0.0):
+        """Get the FrameTree of the snapshot nearest the given time.
+
+        Returns:
+            The FrameTree, or None if no snapshot is within max_time_diff_sec of the time.
+        """
+        time_nsec = _to_nsec(time)
+        with self._lock:
+            index = bisect.bisect_left(self._locked_times_nsec, time_nsec)
+            candidates = [
+                i for i in (index - 1, index) if 0 <= i < len(self._locked_times_nsec)
+            ]
+            if not candidates:
+                return None
+            nearest = min(candidates,
+                          key=lambda i: abs(self._locked_times_nsec[i] - time_nsec))
+            if abs(self._locked_times_nsec[nearest] - time_nsec) > sec_to_nsec(
+                    max_time_diff_sec):
+                return None
+            return self._locked_trees[nearest]
+
+    def get_a_tform_b(self, frame_a, frame_b, time, max_extrapolation_sec=0.0):
+        """Get the SE(3) pose representing the transform between frame_a and frame_b at a time.
+
+        The transforms of the snapshots before and after the time are interpolated.  A time
+        outside of the range of the buffer gets the transform of the nearest snapshot, if within
+        max_extrapolation_sec of it.
+
+        Args:
+            frame_a (string)
+            frame_b (string)
+            time (Timestamp or float seconds) robot time of the transform
+            max_extrapolation_sec (float) how far outside of the buffer a time may be
+
+        Returns:
+            math_helpers.SE3Pose between frame_a and frame_b if they exist in the snapshots around
+            the time. None otherwise.
+        """
+        time_nsec = _to_nsec(time)
+        with self._lock:
+            times_nsec = self._locked_times_nsec
+            if not times_nsec:
+                return None
+            index = bisect.bisect_left(times_nsec, time_nsec)
+            if index < len(times_nsec) and times_nsec[index] == time_nsec:
+                return self._locked_trees[index].get_a_tform_b(frame_a, frame_b)
+            if index == 0 or index == len(times_nsec):
+                nearest = min(index, len(times_nsec) - 1)
+                if abs(times_nsec[nearest] - time_nsec) > sec_to_nsec(max_extrapolation_sec):
+                    return None
+                return self._locked_trees[nearest].get_a_tform_b(frame_a, frame_b)
+            before_nsec, after_nsec = times_nsec[index - 1], times_nsec[index]
+            before_tree, after_tree = self._locked_trees[index - 1], self._locked_trees[index]
+        # Interpolation makes a new pose, so the memoized poses need not be copied.
+        before = before_tree._get_a_tform_b(frame_a, frame_b)  # pylint: disable=protected-access
+        after = after_tree._get_a_tform_b(frame_a, frame_b)  # pylint: disable=protected-access
+        if before is None or after is None:
+            return None
+        fraction = float(time_nsec - before_nsec) / (after_nsec - before_nsec)
+        return math_helpers.SE3Pose.interp(before, after, fraction)
+
+
+def _copy_se3_pose(pose):
+    """Return a copy of a math_helpers.SE3Pose, or None if pose is None."""
+    if pose is None:
+        return None
+    return math_helpers.SE3Pose(pose.x, pose.y, pose.z,
+                                math_helpers.Quat(pose.rot.w, pose.rot.x, pose.rot.y, pose.rot.z))
+
+
+def _to_nsec(time):
+    """Convert a Timestamp proto or a time in seconds to nanoseconds."""
+    if isinstance(time, timestamp_pb2.Timestamp):
+        return timestamp_to_nsec(time)
+    return sec_to_nsec(time)
+
+
 def get_se2_a_tform_b(frame_tree_snapshot, frame_a, frame_b, validate=True):
     """Get the SE(2) pose representing the transform between frame_a and frame_b.
 
@@ -131,6 +131,22 @@ class GraphNavClient(BaseClient):
         return self.call_async(self._stub.GetLocalizationState, req, None, common_header_errors,
                                copy_request=False, **kwargs)
 
+    async def get_localization_state_aio(self, request_live_point_cloud=False,
+                                         request_live_images=False,
+                                         request_live_terrain_maps=False,
+                                         request_live_world_objects=False,
+                                         request_live_robot_state=False, waypoint_id=None,
+                                         **kwargs):
+        """Asyncio version of get_localization_state()."""
+        req = self._build_get_localization_state_request(
+            request_live_point_cloud=request_live_point_cloud,
+            request_live_images=request_live_images,
+            request_live_terrain_maps=request_live_terrain_maps,
+            request_live_world_objects=request_live_world_objects,
+            request_live_robot_state=request_live_robot_state, waypoint_id=waypoint_id)
+        return await self.call_aio(self.aio_stub.GetLocalizationState, req, None,
+                                   common_header_errors, copy_request=False, **kwargs)
+
     def navigate_route(self, route, cmd_duration, route_follow_params=None, travel_params=None,
                        leases=None, timesync_endpoint=None, command_id=None,
                        destination_waypoint_tform_body_goal=None, **kwargs):
@@ -490,6 +506,14 @@ class GraphNavClient(BaseClient):
                                error_from_response=common_header_errors, copy_request=False,
                                **kwargs)
 
+    async def download_graph_aio(self, **kwargs):
+        """Asyncio version of download_graph()."""
+        request = self._build_download_graph_request()
+        return await self.call_aio(self.aio_stub.DownloadGraph, request,
+                                   value_from_response=_get_graph,
+                                   error_from_response=common_header_errors, copy_request=False,
+                                   **kwargs)
+
     def download_waypoint_snapshot(
             self,
             waypoint_snapshot_id,
@@ -517,6 +541,18 @@ class GraphNavClient(BaseClient):
                          error_from_response=_download_waypoint_snapshot_stream_errors,
                          copy_request=False, **kwargs)
 
+    async def download_waypoint_snapshot_aio(self, waypoint_snapshot_id, download_images=False,
+                                             do_not_download_point_cloud=False, **kwargs):
+        """Asyncio version of download_waypoint_snapshot()."""
+        request = self._build_download_waypoint_snapshot_request(
+            waypoint_snapshot_id,
+            download_images,
+            do_not_download_point_cloud)
+        return await self.call_aio(self.aio_stub.DownloadWaypointSnapshot, request,
+                                   value_from_response=_get_streamed_waypoint_snapshot,
+                                   error_from_response=_download_waypoint_snapshot_stream_errors,
+                                   copy_request=False, **kwargs)
+
 
     def download_edge_snapshot(self, edge_snapshot_id, **kwargs):
         """Downloads a specific edge snapshot with streaming from the server.
@@ -535,6 +571,14 @@ class GraphNavClient(BaseClient):
                          error_from_response=_download_edge_snapshot_stream_errors,
                          copy_request=False, **kwargs)
 
+    async def download_edge_snapshot_aio(self, edge_snapshot_id, **kwargs):
+        """Asyncio version of download_edge_snapshot()."""
+        request = self._build_download_edge_snapshot_request(edge_snapshot_id)
+        return await self.call_aio(self.aio_stub.DownloadEdgeSnapshot, request,
+                                   value_from_response=_get_streamed_edge_snapshot,
+                                   error_from_response=_download_edge_snapshot_stream_errors,
+                                   copy_request=False, **kwargs)
+
     def _write_bytes(self, filepath, filename, data):
         """Write data to a file."""
         os.makedirs(filepath, exist_ok=True)
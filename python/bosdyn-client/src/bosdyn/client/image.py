@@ -6,11 +6,13 @@
 
 """For clients to use the image service."""
 import collections
+import functools
 import os
 
 import numpy as np
 
 from bosdyn.api import image_pb2, image_service_pb2_grpc
+from bosdyn.client import frame_helpers, math_helpers
 from bosdyn.client.common import (BaseClient, common_header_errors, error_factory, error_pair,
                                   handle_common_header_errors)
 from bosdyn.client.exceptions import ResponseError, UnsetStatusError
@@ -103,6 +105,12 @@ class ImageClient(BaseClient):
         return self.call_async(self._stub.ListImageSources, req, _list_image_sources_value,
                                common_header_errors, copy_request=False, **kwargs)
 
+    async def list_image_sources_aio(self, **kwargs):
+        """Asyncio version of list_image_sources()"""
+        req = self._get_list_image_source_request()
+        return await self.call_aio(self.aio_stub.ListImageSources, req, _list_image_sources_value,
+                                   common_header_errors, copy_request=False, **kwargs)
+
     def get_image_from_sources(self, image_sources, **kwargs):
         """Obtain images from sources using default parameters.
 
@@ -126,6 +134,11 @@ class ImageClient(BaseClient):
         return self.get_image_async([build_image_request(source) for source in image_sources],
                                     **kwargs)
 
+    async def get_image_from_sources_aio(self, image_sources, **kwargs):
+        """Asyncio version of get_image_from_sources()"""
+        return await self.get_image_aio(
+            [build_image_request(source) for source in image_sources], **kwargs)
+
     def get_image(self, image_requests, **kwargs):
         """Obtain the set of images from the robot.
 
@@ -153,6 +166,12 @@ class ImageClient(BaseClient):
         return self.call_async(self._stub.GetImage, req, _get_image_value, _error_from_response,
                                copy_request=False, **kwargs)
 
+    async def get_image_aio(self, image_requests, **kwargs):
+        """Asyncio version of get_image()"""
+        req = self._get_image_request(image_requests)
+        return await self.call_aio(self.aio_stub.GetImage, req, _get_image_value,
+                                   _error_from_response, copy_request=False, **kwargs)
+
     @staticmethod
     def _get_image_request(image_requests):
         return image_pb2.GetImageRequest(image_requests=image_requests)
@@ -393,6 +412,170 @@ def _depth_image_data_to_numpy(image_response):
     return depth_array
 
 
+def _check_depth_image_source(image_response):
+    """Raise ValueError if the image_response is not a pinhole depth image."""
+    if image_response.source.image_type != image_pb2.ImageSource.IMAGE_TYPE_DEPTH:
+        raise ValueError('requires an image_type of IMAGE_TYPE_DEPTH.')
+
+    if image_response.shot.image.pixel_format != image_pb2.Image.PIXEL_FORMAT_DEPTH_U16:
+        raise ValueError(
+            'IMAGE_TYPE_DEPTH with an unsupported format, requires PIXEL_FORMAT_DEPTH_U16.')
+
+    if not image_response.source.HasField('pinhole'):
+        raise ValueError('Requires a pinhole camera_model.')
+
+
+class DepthProjector(object):
+    """Converts depth images from one camera into point clouds.
+
+    The ray through each pixel, scaled by the depth scale, is computed once for the intrinsics
+    and resolution of the camera.  Projecting an image then only multiplies the valid depths by
+    their rays.  The points can optionally be transformed out of the sensor frame while they are
+    written, and written into a preallocated output buffer.
+
+    Use get_depth_projector() to share projectors between images of the same camera.
+
+    Args:
+        rows (int): Rows of the depth images.
+        cols (int): Columns of the depth images.
+        focal_length (tuple): (fx, fy) of the pinhole intrinsics [pixels].
+        principal_point (tuple): (cx, cy) of the pinhole intrinsics [pixels].
+        depth_scale (double): Depth image values per meter.
+        stride (int): Only every stride'th row and column of the images is projected.
+    """
+
+    def __init__(self, rows, cols, focal_length, principal_point, depth_scale, stride=1):
+        self.rows = rows
+        self.cols = cols
+        self.focal_length = tuple(focal_length)
+        self.principal_point = tuple(principal_point)
+        self.depth_scale = depth_scale
+        self.stride = stride
+        fx, fy = self.focal_length
+        cx, cy = self.principal_point
+        pixel_rows = np.arange(0, rows, stride)
+        pixel_cols = np.arange(0, cols, stride)
+        # Separate contiguous planes are much faster to index with a mask than (x, y) pairs.
+        x_rays, y_rays = np.meshgrid((pixel_cols - cx) / (fx * depth_scale),
+                                     (pixel_rows - cy) / (fy * depth_scale))
+        self._x_rays = np.ascontiguousarray(x_rays)
+        self._y_rays = np.ascontiguousarray(y_rays)
+
+    @property
+    def key(self):
+        """The intrinsics, resolution and stride the projector was computed for."""
+        return _depth_projector_key(self.rows, self.cols, self.focal_length,
+                                    self.principal_point, self.depth_scale, self.stride)
+
+    @property
+    def max_points(self):
+        """The number of points in the cloud of an image with only valid depths."""
+        return self._x_rays.size
+
+    @staticmethod
+    def from_image_response(image_response, stride=1):
+        """Create a DepthProjector for the camera of a depth image.
+
+        Raises:
+            ValueError: The image_response is not a pinhole depth image.
+        """
+        _check_depth_image_source(image_response)
+        source = image_response.source
+        intrinsics = source.pinhole.intrinsics
+        return DepthProjector(source.rows, source.cols,
+                              (intrinsics.focal_length.x, intrinsics.focal_length.y),
+                              (intrinsics.principal_point.x, intrinsics.principal_point.y),
+                              source.depth_scale, stride=stride)
+
+    def project(self, depth, min_dist=0, max_dist=1000, transform=None, out=None):
+        """Converts a depth image into a point cloud.
+
+        Args:
+            depth (image_pb2.ImageResponse or numpy array): The depth image, or its uint16 data as
+                a (rows, cols) array.
+            min_dist (double): All points in the returned point cloud will be greater than
+                min_dist from the image plane [meters].
+            max_dist (double): All points in the returned point cloud will be less than max_dist
+                from the image plane [meters].
+            transform (math_helpers.SE3Pose or 4x4 numpy array): Optional frame_tform_sensor to
+                express the points in another frame.
+            out (numpy array): Optional float64 buffer of at least (N, 3) to write the points
+                into.
+
+        Returns:
+            An (N, 3) numpy array of the (x,y,z) points, a view of out if given.
+        """
+        if isinstance(depth, image_pb2.ImageResponse):
+            depth = _depth_image_data_to_numpy(depth)
+        if depth.shape[:2] != (self.rows, self.cols):
+            raise ValueError('Depth image of shape {} does not match the projector ({}, {}).'
+                             .format(depth.shape, self.rows, self.cols))
+        if self.stride != 1:
+            depth = depth[::self.stride, ::self.stride]
+
+        valid_inds = _depth_image_get_valid_indices(depth, np.rint(min_dist * self.depth_scale),
+                                                    np.rint(max_dist * self.depth_scale))
+        depth = depth[valid_inds]
+        if out is None:
+            out = np.empty((len(depth), 3))
+        elif out.ndim != 2 or out.shape[0] < len(depth) or out.shape[1] != 3:
+            raise ValueError('Output buffer of shape {} cannot hold {} points.'.format(
+                out.shape, len(depth)))
+        else:
+            out = out[:len(depth)]
+
+        x = self._x_rays[valid_inds]
+        x *= depth
+        y = self._y_rays[valid_inds]
+        y *= depth
+        z = depth / self.depth_scale
+        if transform is None:
+            out[:, 0] = x
+            out[:, 1] = y
+            out[:, 2] = z
+            return out
+
+        if isinstance(transform, math_helpers.SE3Pose):
+            transform = transform.to_matrix()
+        # Apply frame_tform_sensor to the points one output coordinate at a time, without
+        # allocating another cloud.
+        scratch = np.empty_like(z)
+        for axis in range(3):
+            column = out[:, axis]
+            np.multiply(x, transform[axis, 0], out=column)
+            column += np.multiply(y, transform[axis, 1], out=scratch)
+            column += np.multiply(z, transform[axis, 2], out=scratch)
+            column += transform[axis, 3]
+        return out
+
+
+def _depth_projector_key(rows, cols, focal_length, principal_point, depth_scale, stride):
+    return (rows, cols, tuple(focal_length), tuple(principal_point), depth_scale, stride)
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_depth_projector(key):
+    rows, cols, focal_length, principal_point, depth_scale, stride = key
+    return DepthProjector(rows, cols, focal_length, principal_point, depth_scale, stride)
+
+
+def get_depth_projector(image_response, stride=1):
+    """Get the DepthProjector for the camera of a depth image, reusing the projectors of recently
+    seen cameras.
+
+    Raises:
+        ValueError: The image_response is not a pinhole depth image.
+    """
+    _check_depth_image_source(image_response)
+    source = image_response.source
+    intrinsics = source.pinhole.intrinsics
+    return _cached_depth_projector(
+        _depth_projector_key(source.rows, source.cols,
+                             (intrinsics.focal_length.x, intrinsics.focal_length.y),
+                             (intrinsics.principal_point.x, intrinsics.principal_point.y),
+                             source.depth_scale, stride))
+
+
 def depth_image_to_pointcloud(image_response, min_dist=0, max_dist=1000):
     """Converts a depth image into a point cloud using the camera intrinsics. The point
     cloud is represented as a numpy array of (x,y,z) values.  Requests can optionally filter
@@ -412,40 +595,50 @@ def depth_image_to_pointcloud(image_response, min_dist=0, max_dist=1000):
     Returns:
         A numpy stack of (x,y,z) values representing depth image as a point cloud expressed in the sensor frame.
     """
+    projector = get_depth_projector(image_response)
+    return projector.project(image_response, min_dist=min_dist, max_dist=max_dist)
 
-    if image_response.source.image_type != image_pb2.ImageSource.IMAGE_TYPE_DEPTH:
-        raise ValueError('requires an image_type of IMAGE_TYPE_DEPTH.')
 
-    if image_response.shot.image.pixel_format != image_pb2.Image.PIXEL_FORMAT_DEPTH_U16:
-        raise ValueError(
-            'IMAGE_TYPE_DEPTH with an unsupported format, requires PIXEL_FORMAT_DEPTH_U16.')
+def depth_images_to_pointcloud(image_responses, frame_name=None, min_dist=0, max_dist=1000,
+                               stride=1, out=None):
+    """Converts depth images, e.g. from several cameras, into a single point cloud.
 
-    if not image_response.source.HasField('pinhole'):
-        raise ValueError('Requires a pinhole camera_model.')
+    Args:
+        image_responses (list of image_pb2.ImageResponse): ImageResponses containing depth
+            images.
+        frame_name (string): Frame to express the points in, using the transforms snapshot of
+            each image.  Default None requires a single image, whose sensor frame is used.
+        min_dist (double): All points in the returned point cloud will be greater than min_dist
+            from the image plane [meters].
+        max_dist (double): All points in the returned point cloud will be less than max_dist
+            from the image plane [meters].
+        stride (int): Only every stride'th row and column of the images is projected.
+        out (numpy array): Optional float64 buffer of at least (N, 3) to write the points into.
 
-    source_rows = image_response.source.rows
-    source_cols = image_response.source.cols
-    fx = image_response.source.pinhole.intrinsics.focal_length.x
-    fy = image_response.source.pinhole.intrinsics.focal_length.y
-    cx = image_response.source.pinhole.intrinsics.principal_point.x
-    cy = image_response.source.pinhole.intrinsics.principal_point.y
-    depth_scale = image_response.source.depth_scale
-
-    # Convert the proto representation into a numpy array.
-    depth_array = _depth_image_data_to_numpy(image_response)
-
-    # Determine which indices have valid data in the user requested range.
-    valid_inds = _depth_image_get_valid_indices(depth_array, np.rint(min_dist * depth_scale),
-                                                np.rint(max_dist * depth_scale))
-
-    # Compute the valid data.
-    rows, cols = np.mgrid[0:source_rows, 0:source_cols]
-    depth_array = depth_array[valid_inds]
-    rows = rows[valid_inds]
-    cols = cols[valid_inds]
-
-    # Convert the valid distance data to (x,y,z) values expressed in the sensor frame.
-    z = depth_array / depth_scale
-    x = np.multiply(z, (cols - cx)) / fx
-    y = np.multiply(z, (rows - cy)) / fy
-    return np.vstack((x, y, z)).T
+    Returns:
+        An (N, 3) numpy array of the (x,y,z) points, a view of out if given.
+
+    Raises:
+        ValueError: An image is not a pinhole depth image, or frame_name is not in the
+            transforms snapshot of an image.
+    """
+    if frame_name is None and len(image_responses) > 1:
+        raise ValueError('A frame_name is required to combine several depth images.')
+    projectors = [get_depth_projector(response, stride) for response in image_responses]
+    max_points = sum(projector.max_points for projector in projectors)
+    if out is None:
+        out = np.empty((max_points, 3))
+    num_points = 0
+    for projector, response in zip(projectors, image_responses):
+        transform = None
+        if frame_name is not None:
+            shot = response.shot
+            transform = frame_helpers.get_a_tform_b(shot.transforms_snapshot, frame_name,
+                                                    shot.frame_name_image_sensor)
+            if transform is None:
+                raise ValueError('No transform from {} to {} in the image snapshot.'.format(
+                    frame_name, shot.frame_name_image_sensor))
+        points = projector.project(response, min_dist=min_dist, max_dist=max_dist,
+                                   transform=transform, out=out[num_points:])
+        num_points += len(points)
+    return out[:num_points]
@@ -20,6 +20,8 @@ class LicenseClient(BaseClient):
     default_service_name = 'license'
     # gRPC service proto definition implemented by this service
     service_type = 'bosdyn.api.LicenseService'
+    # Rpcs which may be coalesced, see BaseClient.coalesce_read_only_rpcs().
+    read_only_rpcs = ('GetLicenseInfo', 'GetFeatureEnabled')
 
     def __init__(self):
         super(LicenseClient, self).__init__(license_service_pb2_grpc.LicenseServiceStub)
@@ -285,6 +285,8 @@ class SE2Pose(object):
             rotated_pos = rotation_matrix.dot((other.x, other.y))
             return SE2Pose(self.x + rotated_pos[0], self.y + rotated_pos[1],
                            recenter_angle_mod(self.angle + other.angle, 0.0))
+        if isinstance(other, SE2PoseArray):
+            return SE2PoseArray.from_poses([self]).mult(other)
         else:
             raise TypeError("Can't multiply types %s and %s." % (type(self), type(other)))
 
@@ -668,6 +670,8 @@ class SE3Pose(object):
         if isinstance(other, SE3Pose):
             (x, y, z) = self.rot.transform_point(other.x, other.y, other.z)
             return SE3Pose(self.x + x, self.y + y, self.z + z, self.rot.mult(other.rot))
+        if isinstance(other, SE3PoseArray):
+            return SE3PoseArray.from_poses([self]).mult(other)
         else:
             raise TypeError("Can't multiply types %s and %s." % (type(self), type(other)))
 
@@ -937,6 +941,8 @@ class Quat(object):
             return Vec3(x, y, z)
         if isinstance(other, Quat):
             return self.mult(other)
+        if isinstance(other, QuatArray):
+            return QuatArray.from_quats([self]).mult(other)
         raise TypeError("Can't multiply types %s and %s." % (type(self), type(other)))
 
     def normalize(self):
@@ -997,6 +1003,574 @@ class Quat(object):
         return Quat(result[0], result[1], result[2], result[3])
 
 
+def _wrap_angles(angles):
+    """Vectorized recenter_angle_mod(angles, 0.0)."""
+    return (angles + math.pi) % (2 * math.pi) - math.pi
+
+
+def _broadcast_rows(*arrays):
+    """Broadcast 2-D arrays with 1 or N rows, and any number of columns, to N rows."""
+    num_rows = max(len(array) for array in arrays)
+    return [numpy.broadcast_to(array, (num_rows, array.shape[1])) for array in arrays]
+
+
+def _quat_mult(a, b):
+    """Multiply the (..., 4) wxyz quaternions a and b elementwise, with broadcasting."""
+    aw, ax, ay, az = a[..., 0], a[..., 1], a[..., 2], a[..., 3]
+    bw, bx, by, bz = b[..., 0], b[..., 1], b[..., 2], b[..., 3]
+    return numpy.stack([
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ], axis=-1)
+
+
+def _quat_rotate(quats, points):
+    """Rotate the (..., 3) points by the (..., 4) wxyz quaternions, with broadcasting.
+
+    Computes q * p * q^-1 (with the inverse taken as the conjugate) in closed form.
+    """
+    w = quats[..., 0:1]
+    u = quats[..., 1:4]
+    uv = numpy.sum(u * points, axis=-1, keepdims=True)
+    uu = numpy.sum(u * u, axis=-1, keepdims=True)
+    return (w * w - uu) * points + 2.0 * uv * u + 2.0 * w * numpy.cross(u, points)
+
+
+class QuatArray(object):
+    """Class representing N quaternions, backed by an (N, 4) numpy array of (w, x, y, z).
+
+    The operations are vectorized versions of those of math_helpers.Quat.  Binary operations
+    accept a single Quat, or a QuatArray of length 1 or N.
+    """
+
+    def __init__(self, wxyz):
+        self.data = numpy.asarray(wxyz, dtype=numpy.float64).reshape(-1, 4)
+
+    def __repr__(self):
+        return 'QuatArray({})'.format(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        """Returns a math_helpers.Quat for an integer index, else a QuatArray."""
+        if isinstance(index, numbers.Integral):
+            return Quat(*self.data[index])
+        return QuatArray(self.data[index])
+
+    def __iter__(self):
+        return (Quat(*row) for row in self.data)
+
+    @property
+    def w(self):
+        return self.data[:, 0]
+
+    @property
+    def x(self):
+        return self.data[:, 1]
+
+    @property
+    def y(self):
+        return self.data[:, 2]
+
+    @property
+    def z(self):
+        return self.data[:, 3]
+
+    @staticmethod
+    def identity(size):
+        """Create a QuatArray of 'size' identity rotations."""
+        data = numpy.zeros((size, 4))
+        data[:, 0] = 1.0
+        return QuatArray(data)
+
+    @staticmethod
+    def from_quats(quats):
+        """Create a QuatArray from an iterable of math_helpers.Quat."""
+        return QuatArray([(q.w, q.x, q.y, q.z) for q in quats])
+
+    @staticmethod
+    def from_proto(protos):
+        """Create a QuatArray from an iterable of geometry_pb2.Quaternion protos."""
+        return QuatArray([(q.w, q.x, q.y, q.z) for q in protos])
+
+    def to_proto(self):
+        """Converts the QuatArray into a list of geometry_pb2.Quaternion."""
+        return [geometry_pb2.Quaternion(w=w, x=x, y=y, z=z) for w, x, y, z in self.data.tolist()]
+
+    def inverse(self):
+        """Computes the inverse of each quaternion."""
+        return QuatArray(self.data * (1.0, -1.0, -1.0, -1.0))
+
+    def mult(self, other):
+        """Computes the multiplication of the quaternions with a Quat or QuatArray."""
+        return QuatArray(_quat_mult(self.data, _as_quat_data(other)))
+
+    def __mul__(self, other):
+        """Overrides the '*' symbol to compute the multiplication with a Quat or QuatArray."""
+        if isinstance(other, (Quat, QuatArray)):
+            return self.mult(other)
+        raise TypeError("Can't multiply types %s and %s." % (type(self), type(other)))
+
+    def transform_points(self, points):
+        """Rotate points by the quaternions.
+
+        Inputs:
+            points (Nx3 or 3 numpy array): one point for each quaternion, or one point for all.
+
+        Returns:
+            Nx3 numpy array of the rotated points.
+        """
+        return _quat_rotate(self.data, numpy.asarray(points, dtype=numpy.float64))
+
+    def to_matrix(self):
+        """Creates the Nx3x3 numpy stack of rotation matrices of the quaternions."""
+        w, x, y, z = self.data.T
+        ret = numpy.empty((len(self.data), 3, 3))
+        ret[:, 0, 0] = 1.0 - 2.0 * y * y - 2.0 * z * z
+        ret[:, 0, 1] = 2.0 * x * y - 2.0 * z * w
+        ret[:, 0, 2] = 2.0 * x * z + 2.0 * y * w
+
+        ret[:, 1, 0] = 2.0 * x * y + 2.0 * z * w
+        ret[:, 1, 1] = 1.0 - 2.0 * x * x - 2.0 * z * z
+        ret[:, 1, 2] = 2.0 * y * z - 2.0 * x * w
+
+        ret[:, 2, 0] = 2.0 * x * z - 2.0 * y * w
+        ret[:, 2, 1] = 2.0 * y * z + 2.0 * x * w
+        ret[:, 2, 2] = 1.0 - 2.0 * x * x - 2.0 * y * y
+        return ret
+
+    @staticmethod
+    def from_matrix(rot):
+        """Creates a QuatArray from an Nx3x3 numpy stack of rotation matrices.
+
+        Each matrix is converted as in Quat.from_matrix().
+        """
+        rot = numpy.asarray(rot, dtype=numpy.float64).reshape(-1, 3, 3)
+        r00, r11, r22 = rot[:, 0, 0], rot[:, 1, 1], rot[:, 2, 2]
+        traces = numpy.stack([1 + r00 + r11 + r22, 1 + r00 - r11 - r22, 1 - r00 + r11 - r22,
+                              1 - r00 - r11 + r22], axis=-1)
+        # Prefer the w branch so we get consistently signed quaternions, as in Quat.from_matrix.
+        branches = numpy.where(traces[:, 0] > 0.1, 0, numpy.argmax(traces, axis=-1))
+        if numpy.any(traces[numpy.arange(len(rot)), branches] < 1e-6):
+            raise ArithmeticError('Matrix cannot be converged to quaternion.  Are you sure this is'
+                                  ' a valid rotation matrix?')
+        data = numpy.empty((len(rot), 4))
+        for branch in range(4):
+            rows = branches == branch
+            if not numpy.any(rows):
+                continue
+            r = rot[rows]
+            big = numpy.sqrt(traces[rows, branch]) * 0.5
+            denom = 4.0 * big
+            if branch == 0:
+                quat = (big, (r[:, 2, 1] - r[:, 1, 2]) / denom, (r[:, 0, 2] - r[:, 2, 0]) / denom,
+                        (r[:, 1, 0] - r[:, 0, 1]) / denom)
+            elif branch == 1:
+                quat = ((r[:, 2, 1] - r[:, 1, 2]) / denom, big, (r[:, 0, 1] + r[:, 1, 0]) / denom,
+                        (r[:, 0, 2] + r[:, 2, 0]) / denom)
+            elif branch == 2:
+                quat = ((r[:, 0, 2] - r[:, 2, 0]) / denom, (r[:, 0, 1] + r[:, 1, 0]) / denom, big,
+                        (r[:, 1, 2] + r[:, 2, 1]) / denom)
+            else:
+                quat = ((r[:, 1, 0] - r[:, 0, 1]) / denom, (r[:, 0, 2] + r[:, 2, 0]) / denom,
+                        (r[:, 1, 2] + r[:, 2, 1]) / denom, big)
+            data[rows] = numpy.stack(quat, axis=-1)
+        return QuatArray(data)
+
+    def to_yaw(self):
+        """Computes the Euler angles yaw of the quaternions, as in Quat.to_yaw()."""
+        w, x, y, z = self.data.T
+        mag = numpy.hypot(w, z)
+        # When the problem is ill posed, rotate 180 degrees around the y-axis first as in
+        # Quat.closest_yaw_only_quaternion().
+        yaw_w = numpy.where(mag > 0, w, -y)
+        yaw_z = numpy.where(mag > 0, z, -x)
+        return _wrap_angles(2 * numpy.arctan2(yaw_z, yaw_w))
+
+    def normalize(self):
+        """Normalizes the quaternions in place."""
+        norms = numpy.linalg.norm(self.data, axis=-1)
+        degenerate = norms < 1e-15
+        self.data[~degenerate] /= norms[~degenerate, numpy.newaxis]
+        self.data[degenerate] = (1.0, 0.0, 0.0, 0.0)
+        return self
+
+    @staticmethod
+    def slerp(a, b, fraction):
+        """Spherical linear interpolation between quaternions, as in Quat.slerp().
+
+        Args:
+            a(Quat or QuatArray): Lower blend input.
+            b(Quat or QuatArray): Upper blend input.
+            fraction(float or numpy array of N floats): The blending factors.
+        Returns:
+            QuatArray
+        """
+        v0, v1 = numpy.broadcast_arrays(_as_quat_data(a), _as_quat_data(b))
+        fraction = numpy.asarray(fraction, dtype=numpy.float64).reshape(-1, 1)
+        dot = numpy.sum(v0 * v1, axis=-1, keepdims=True)
+        # Take the shorter path by reversing one of the quaternions.
+        v0 = numpy.where(dot < 0.0, -v0, v0)
+        dot = numpy.abs(dot)
+
+        # Linearly interpolate and normalize when the inputs are too close for comfort.
+        lerp = v0 + fraction * (v1 - v0)
+        lerp /= numpy.linalg.norm(lerp, axis=-1, keepdims=True)
+
+        DOT_THRESHOLD = 1.0 - 1e-4
+        theta_0 = numpy.arccos(numpy.minimum(dot, DOT_THRESHOLD))
+        theta = theta_0 * fraction
+        sin_theta = numpy.sin(theta)
+        sin_theta_0 = numpy.sin(theta_0)
+        s0 = numpy.cos(theta) - dot * sin_theta / sin_theta_0
+        s1 = sin_theta / sin_theta_0
+        return QuatArray(numpy.where(dot > DOT_THRESHOLD, lerp, s0 * v0 + s1 * v1))
+
+
+def _as_quat_data(quats):
+    if isinstance(quats, Quat):
+        return numpy.array([[quats.w, quats.x, quats.y, quats.z]], dtype=numpy.float64)
+    if isinstance(quats, QuatArray):
+        return quats.data
+    raise TypeError('Expected a Quat or QuatArray, got %s.' % type(quats))
+
+
+class SE3PoseArray(object):
+    """Class representing N SE3Poses, backed by an (N, 7) numpy array.
+
+    The columns are (x, y, z, w, qx, qy, qz), the order in which an SE3Pose iterates.  The
+    operations are vectorized versions of those of math_helpers.SE3Pose.  Binary operations accept
+    a single SE3Pose, or an SE3PoseArray of length 1 or N.
+    """
+
+    def __init__(self, data):
+        self.data = numpy.asarray(data, dtype=numpy.float64).reshape(-1, 7)
+
+    def __repr__(self):
+        return 'SE3PoseArray({})'.format(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        """Returns a math_helpers.SE3Pose for an integer index, else an SE3PoseArray."""
+        if isinstance(index, numbers.Integral):
+            x, y, z, w, qx, qy, qz = self.data[index]
+            return SE3Pose(x, y, z, Quat(w, qx, qy, qz))
+        return SE3PoseArray(self.data[index])
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self.data)))
+
+    @property
+    def positions(self):
+        """Nx3 numpy view of the positions."""
+        return self.data[:, 0:3]
+
+    @property
+    def rot(self):
+        """QuatArray viewing the rotations."""
+        return QuatArray(self.data[:, 3:7])
+
+    @staticmethod
+    def from_positions_and_rotations(positions, rotations):
+        """Create an SE3PoseArray from Nx3 positions and a QuatArray (or Nx4 wxyz array)."""
+        if isinstance(rotations, (Quat, QuatArray)):
+            rotations = _as_quat_data(rotations)
+        positions, rotations = _broadcast_rows(
+            numpy.asarray(positions, dtype=numpy.float64).reshape(-1, 3),
+            numpy.asarray(rotations, dtype=numpy.float64).reshape(-1, 4))
+        return SE3PoseArray(numpy.hstack([positions, rotations]))
+
+    @staticmethod
+    def identity(size):
+        """Create an SE3PoseArray of 'size' identity SE(3) poses."""
+        data = numpy.zeros((size, 7))
+        data[:, 3] = 1.0
+        return SE3PoseArray(data)
+
+    @staticmethod
+    def from_poses(poses):
+        """Create an SE3PoseArray from an iterable of math_helpers.SE3Pose."""
+        return SE3PoseArray([tuple(pose) for pose in poses])
+
+    @staticmethod
+    def from_proto(protos):
+        """Create an SE3PoseArray from an iterable of geometry_pb2.SE3Pose protos."""
+        rows = []
+        for tform in protos:
+            position = tform.position
+            if tform.HasField('rotation'):
+                rotation = tform.rotation
+                rows.append((position.x, position.y, position.z, rotation.w, rotation.x,
+                             rotation.y, rotation.z))
+            else:
+                # Use the identity quaternion if no rotation is provided, as SE3Pose does.
+                rows.append((position.x, position.y, position.z, 1.0, 0.0, 0.0, 0.0))
+        return SE3PoseArray(rows)
+
+    def to_proto(self):
+        """Converts the SE3PoseArray into a list of geometry_pb2.SE3Pose."""
+        return [
+            geometry_pb2.SE3Pose(position=geometry_pb2.Vec3(x=x, y=y, z=z),
+                                 rotation=geometry_pb2.Quaternion(w=w, x=qx, y=qy, z=qz))
+            for x, y, z, w, qx, qy, qz in self.data.tolist()
+        ]
+
+    def inverse(self):
+        """Compute the inverse of each SE(3) pose."""
+        inv_rot = self.data[:, 3:7] * (1.0, -1.0, -1.0, -1.0)
+        return SE3PoseArray(numpy.hstack([-_quat_rotate(inv_rot, self.data[:, 0:3]), inv_rot]))
+
+    def mult(self, se3poses):
+        """
+        Computes the multiplication of the poses with an SE3Pose or SE3PoseArray.
+
+        For example, if the poses represent a_tform_b and the input poses represent b_tform_c,
+        then the output will represent the transforms a_tform_c.
+
+        Returns:
+            SE3PoseArray representing the multiplication of the SE(3) poses.
+        """
+        other = _as_se3_data(se3poses)
+        positions = self.data[:, 0:3] + _quat_rotate(self.data[:, 3:7], other[:, 0:3])
+        rotations = _quat_mult(self.data[:, 3:7], other[:, 3:7])
+        return SE3PoseArray(numpy.hstack(_broadcast_rows(positions, rotations)))
+
+    def __mul__(self, other):
+        """Overrides the '*' symbol to compute the multiplication with an SE3Pose or
+        SE3PoseArray."""
+        if isinstance(other, (SE3Pose, SE3PoseArray)):
+            return self.mult(other)
+        raise TypeError("Can't multiply types %s and %s." % (type(self), type(other)))
+
+    def transform_points(self, points):
+        """
+        Transform points by the SE(3) poses.
+
+        Inputs:
+            points (Nx3 or 3 numpy array): one point for each pose, or one point for all.
+
+        Returns:
+            Nx3 numpy array of the transformed points.
+        """
+        points = numpy.asarray(points, dtype=numpy.float64)
+        return self.data[:, 0:3] + _quat_rotate(self.data[:, 3:7], points)
+
+    def to_matrix(self):
+        """Returns the Nx4x4 numpy stack of matrices of the SE(3) poses."""
+        ret = numpy.zeros((len(self.data), 4, 4))
+        ret[:, 0:3, 0:3] = self.rot.to_matrix()
+        ret[:, 0:3, 3] = self.data[:, 0:3]
+        ret[:, 3, 3] = 1.0
+        return ret
+
+    @staticmethod
+    def from_matrix(mat):
+        """Create an SE3PoseArray from an Nx4x4 numpy stack of matrices."""
+        mat = numpy.asarray(mat, dtype=numpy.float64).reshape(-1, 4, 4)
+        return SE3PoseArray.from_positions_and_rotations(mat[:, 0:3, 3],
+                                                         QuatArray.from_matrix(mat[:, 0:3, 0:3]))
+
+    @staticmethod
+    def interp(a, b, fraction):
+        """
+        Performs a blend of SE3Poses, as in SE3Pose.interp().
+
+        Args:
+            a(SE3Pose or SE3PoseArray): Lower blend input.
+            b(SE3Pose or SE3PoseArray): Upper blend input.
+            fraction(float or numpy array of N floats): The blending factors.
+        Returns:
+            SE3PoseArray
+        """
+        a_data, b_data = numpy.broadcast_arrays(_as_se3_data(a), _as_se3_data(b))
+        fraction = numpy.asarray(fraction, dtype=numpy.float64).reshape(-1, 1)
+        positions = a_data[:, 0:3] * (1.0 - fraction) + b_data[:, 0:3] * fraction
+        rotations = QuatArray.slerp(QuatArray(a_data[:, 3:7]), QuatArray(b_data[:, 3:7]),
+                                    fraction)
+        return SE3PoseArray.from_positions_and_rotations(positions, rotations)
+
+
+def _as_se3_data(poses):
+    if isinstance(poses, SE3Pose):
+        return numpy.array([tuple(poses)], dtype=numpy.float64)
+    if isinstance(poses, SE3PoseArray):
+        return poses.data
+    raise TypeError('Expected an SE3Pose or SE3PoseArray, got %s.' % type(poses))
+
+
+class SE2PoseArray(object):
+    """Class representing N SE2Poses, backed by an (N, 3) numpy array of (x, y, angle).
+
+    The operations are vectorized versions of those of math_helpers.SE2Pose.  Binary operations
+    accept a single SE2Pose, or an SE2PoseArray of length 1 or N.
+    """
+
+    def __init__(self, data):
+        self.data = numpy.asarray(data, dtype=numpy.float64).reshape(-1, 3)
+
+    def __repr__(self):
+        return 'SE2PoseArray({})'.format(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        """Returns a math_helpers.SE2Pose for an integer index, else an SE2PoseArray."""
+        if isinstance(index, numbers.Integral):
+            return SE2Pose(*self.data[index])
+        return SE2PoseArray(self.data[index])
+
+    def __iter__(self):
+        return (SE2Pose(*row) for row in self.data)
+
+    @property
+    def positions(self):
+        """Nx2 numpy view of the positions."""
+        return self.data[:, 0:2]
+
+    @property
+    def angles(self):
+        """Numpy view of the angles."""
+        return self.data[:, 2]
+
+    @staticmethod
+    def identity(size):
+        """Create an SE2PoseArray of 'size' identity SE(2) poses."""
+        return SE2PoseArray(numpy.zeros((size, 3)))
+
+    @staticmethod
+    def from_poses(poses):
+        """Create an SE2PoseArray from an iterable of math_helpers.SE2Pose."""
+        return SE2PoseArray([(pose.x, pose.y, pose.angle) for pose in poses])
+
+    @staticmethod
+    def from_proto(protos):
+        """Create an SE2PoseArray from an iterable of geometry_pb2.SE2Pose protos."""
+        return SE2PoseArray([(tform.position.x, tform.position.y, tform.angle) for tform in protos])
+
+    def to_proto(self):
+        """Converts the SE2PoseArray into a list of geometry_pb2.SE2Pose."""
+        return [
+            geometry_pb2.SE2Pose(position=geometry_pb2.Vec2(x=x, y=y), angle=angle)
+            for x, y, angle in self.data.tolist()
+        ]
+
+    @staticmethod
+    def flatten(se3poses):
+        """Flatten an SE3PoseArray to an SE2PoseArray, as in SE2Pose.flatten()."""
+        return SE2PoseArray(
+            numpy.column_stack([se3poses.data[:, 0:2], se3poses.rot.to_yaw()]))
+
+    def get_closest_se3_transform(self, height_z=0.0):
+        """Compute the closest SE3PoseArray, as in SE2Pose.get_closest_se3_transform()."""
+        half_angles = self.data[:, 2] / 2.0
+        data = numpy.zeros((len(self.data), 7))
+        data[:, 0:2] = self.data[:, 0:2]
+        data[:, 2] = height_z
+        data[:, 3] = numpy.cos(half_angles)
+        data[:, 6] = numpy.sin(half_angles)
+        return SE3PoseArray(data)
+
+    def inverse(self):
+        """Compute the inverse of each SE(2) pose."""
+        x, y, angle = self.data.T
+        c = numpy.cos(angle)
+        s = numpy.sin(angle)
+        return SE2PoseArray(numpy.column_stack([-x * c - y * s, x * s - y * c, -angle]))
+
+    def mult(self, se2poses):
+        """
+        Computes the multiplication of the poses with an SE2Pose or SE2PoseArray.
+
+        For example, if the poses represent a_tform_b and the input poses represent b_tform_c,
+        then the output will represent the transforms a_tform_c.
+
+        Returns:
+            SE2PoseArray representing the multiplication of the SE(2) poses.
+        """
+        other = _as_se2_data(se2poses)
+        x, y = self.transform_points(other[:, 0:2]).T
+        angle = _wrap_angles(self.data[:, 2] + other[:, 2])
+        return SE2PoseArray(numpy.column_stack(numpy.broadcast_arrays(x, y, angle)))
+
+    def __mul__(self, other):
+        """Overrides the '*' symbol to compute the multiplication with an SE2Pose or
+        SE2PoseArray."""
+        if isinstance(other, (SE2Pose, SE2PoseArray)):
+            return self.mult(other)
+        raise TypeError("Can't multiply types %s and %s." % (type(self), type(other)))
+
+    def transform_points(self, points):
+        """
+        Transform points by the SE(2) poses.
+
+        Inputs:
+            points (Nx2 or 2 numpy array): one point for each pose, or one point for all.
+
+        Returns:
+            Nx2 numpy array of the transformed points.
+        """
+        points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 2)
+        c = numpy.cos(self.data[:, 2])
+        s = numpy.sin(self.data[:, 2])
+        return numpy.column_stack([self.data[:, 0] + c * points[:, 0] - s * points[:, 1],
+                                   self.data[:, 1] + s * points[:, 0] + c * points[:, 1]])
+
+    def to_matrix(self):
+        """Returns the Nx3x3 numpy stack of matrices of the SE(2) poses."""
+        c = numpy.cos(self.data[:, 2])
+        s = numpy.sin(self.data[:, 2])
+        ret = numpy.zeros((len(self.data), 3, 3))
+        ret[:, 0, 0] = c
+        ret[:, 0, 1] = -s
+        ret[:, 1, 0] = s
+        ret[:, 1, 1] = c
+        ret[:, 0:2, 2] = self.data[:, 0:2]
+        ret[:, 2, 2] = 1.0
+        return ret
+
+    @staticmethod
+    def from_matrix(mat):
+        """Create an SE2PoseArray from an Nx3x3 numpy stack of matrices."""
+        mat = numpy.asarray(mat, dtype=numpy.float64).reshape(-1, 3, 3)
+        return SE2PoseArray(
+            numpy.column_stack(
+                [mat[:, 0, 2], mat[:, 1, 2],
+                 numpy.arctan2(mat[:, 1, 0], mat[:, 0, 0])]))
+
+    @staticmethod
+    def interp(a, b, fraction):
+        """
+        Performs a blend of SE2Poses, interpolating the angles along the shorter direction.
+
+        Args:
+            a(SE2Pose or SE2PoseArray): Lower blend input.
+            b(SE2Pose or SE2PoseArray): Upper blend input.
+            fraction(float or numpy array of N floats): The blending factors.
+        Returns:
+            SE2PoseArray
+        """
+        a_data, b_data = numpy.broadcast_arrays(_as_se2_data(a), _as_se2_data(b))
+        fraction = numpy.asarray(fraction, dtype=numpy.float64).reshape(-1, 1)
+        positions = a_data[:, 0:2] * (1.0 - fraction) + b_data[:, 0:2] * fraction
+        angles = a_data[:, 2] + fraction[:, 0] * _wrap_angles(b_data[:, 2] - a_data[:, 2])
+        return SE2PoseArray(numpy.column_stack(numpy.broadcast_arrays(
+            positions[:, 0], positions[:, 1], _wrap_angles(angles))))
+
+
+def _as_se2_data(poses):
+    if isinstance(poses, SE2Pose):
+        return numpy.array([[poses.x, poses.y, poses.angle]], dtype=numpy.float64)
+    if isinstance(poses, SE2PoseArray):
+        return poses.data
+    raise TypeError('Expected an SE2Pose or SE2PoseArray, got %s.' % type(poses))
+
+
 def pose_to_xyz_yaw(A_tform_B):
     """Gets the x,y,z yaw of B in A from the SE3Pose protobuf message."""
     yaw = Quat.from_proto(A_tform_B.rotation).to_yaw()
@@ -14,6 +14,8 @@ from __future__ import print_function
 import collections
 import logging
 
+import numpy as np
+
 import bosdyn.api.point_cloud_pb2 as point_cloud_protos
 import bosdyn.api.point_cloud_service_pb2_grpc as point_cloud_service
 from bosdyn.client.common import (common_header_errors, error_factory, error_pair,
@@ -197,3 +199,145 @@ def _list_point_cloud_sources_value(response):
 
 def _get_point_cloud_value(response):
     return response.point_cloud_responses
+
+
+# Record layouts of the points of the encodings, as numpy dtypes.  The coarse coordinates are
+# signed bytes, and the shared "extra" value holding the fine digits is little-endian.
+_SC_DTYPES = {
+    point_cloud_protos.PointCloud.ENCODING_XYZ_4SC:
+        np.dtype([('coarse', 'i1', 3), ('extra', 'u1')]),
+    point_cloud_protos.PointCloud.ENCODING_XYZ_5SC:
+        np.dtype([('coarse', 'i1', 3), ('extra', '<u2')]),
+}
+_XYZ_32F_DTYPE = np.dtype('<f4')
+
+
+def _sc_scale_factor_limit(encoding):
+    """Largest scale factor whose three digits fit in the extra value of the encoding."""
+    num_values = 2**(8 * _SC_DTYPES[encoding]['extra'].itemsize)
+    return int(round(num_values**(1.0 / 3)))
+
+
+def decode_point_cloud(point_cloud):
+    """Decode the points of a point cloud.
+
+    ENCODING_XYZ_32F data is returned without a copy, as a read-only view of the proto data.
+    ENCODING_XYZ_4SC and ENCODING_XYZ_5SC points are decoded as described in point_cloud.proto:
+    each coordinate is (p1 * f + p2) / (c * f) * m, with the extra value read as unsigned.
+
+    Args:
+        point_cloud (point_cloud_pb2.PointCloud): The point cloud to decode.
+
+    Returns:
+        An (N, 3) float32 numpy array of the (x,y,z) points.
+
+    Raises:
+        ValueError: The encoding is not supported, the encoding parameters are invalid, or the
+            data does not match num_points.
+    """
+    encoding = point_cloud.encoding
+    num_points = point_cloud.num_points
+    if encoding == point_cloud_protos.PointCloud.ENCODING_XYZ_32F:
+        dtype = _XYZ_32F_DTYPE
+        bytes_per_point = 3 * dtype.itemsize
+    elif encoding in _SC_DTYPES:
+        dtype = _SC_DTYPES[encoding]
+        bytes_per_point = dtype.itemsize
+    else:
+        raise ValueError('Unsupported point cloud encoding {}.'.format(encoding))
+    if len(point_cloud.data) != num_points * bytes_per_point:
+        raise ValueError('Point cloud data has {} bytes, expected {} points of {} bytes.'.format(
+            len(point_cloud.data), num_points, bytes_per_point))
+
+    points = np.frombuffer(point_cloud.data, dtype=dtype)
+    if encoding == point_cloud_protos.PointCloud.ENCODING_XYZ_32F:
+        return points.reshape(num_points, 3)
+
+    params = point_cloud.encoding_parameters
+    factor = params.scale_factor
+    if factor <= 0:
+        raise ValueError('Point cloud scale_factor must be positive, got {}.'.format(factor))
+    if params.remapping_constant <= 0:
+        raise ValueError('Point cloud remapping_constant must be positive, got {}.'.format(
+            params.remapping_constant))
+    extra = points['extra'].astype(np.int32)
+    fine = np.empty((num_points, 3), dtype=np.float32)
+    fine[:, 0] = extra % factor
+    fine[:, 1] = (extra // factor) % factor
+    fine[:, 2] = (extra // (factor * factor)) % factor
+    fine -= factor / 2.0
+    meters_per_unit = (np.array([params.max_x, params.max_y, params.max_z]) /
+                       (params.remapping_constant * factor)).astype(np.float32)
+    out = points['coarse'].astype(np.float32)
+    out *= factor
+    out += fine
+    out *= meters_per_unit
+    return out
+
+
+def encode_point_cloud(points, encoding=point_cloud_protos.PointCloud.ENCODING_XYZ_32F,
+                       max_bounds=None, scale_factor=None, remapping_constant=127.0):
+    """Encode points into a point cloud, the inverse of decode_point_cloud().
+
+    Args:
+        points (numpy array): (N, 3) array of (x,y,z) points.
+        encoding (point_cloud_pb2.PointCloud.Encoding): Encoding of the data.
+        max_bounds (tuple): For ENCODING_XYZ_4SC and ENCODING_XYZ_5SC, (max_x, max_y, max_z)
+            half dimensions of the box holding the points [meters].  Default None to fit the
+            points.
+        scale_factor (int): For ENCODING_XYZ_4SC and ENCODING_XYZ_5SC, the scale factor.
+            Default None for the largest the encoding supports, 6 and 40 respectively.
+        remapping_constant (double): For ENCODING_XYZ_4SC and ENCODING_XYZ_5SC, the remapping
+            constant, in (0, 127] so that the coarse values fit in a signed byte.
+
+    Returns:
+        A point_cloud_pb2.PointCloud with the encoding, encoding parameters, data and number of
+        points set.
+
+    Raises:
+        ValueError: The encoding is not supported, the parameters are invalid for the encoding,
+            or points lie outside of max_bounds.
+    """
+    points = np.asarray(points).reshape(-1, 3)
+    point_cloud = point_cloud_protos.PointCloud(num_points=len(points), encoding=encoding)
+    params = point_cloud.encoding_parameters
+    if encoding == point_cloud_protos.PointCloud.ENCODING_XYZ_32F:
+        params.bytes_per_point = 3 * _XYZ_32F_DTYPE.itemsize
+        point_cloud.data = points.astype(_XYZ_32F_DTYPE, copy=False).tobytes()
+        return point_cloud
+    if encoding not in _SC_DTYPES:
+        raise ValueError('Unsupported point cloud encoding {}.'.format(encoding))
+
+    limit = _sc_scale_factor_limit(encoding)
+    factor = limit if scale_factor is None else int(scale_factor)
+    if not 0 < factor <= limit:
+        raise ValueError('Scale factor must be in [1, {}] for this encoding, got {}.'.format(
+            limit, scale_factor))
+    if not 0 < remapping_constant <= 127:
+        raise ValueError('Remapping constant must be in (0, 127], got {}.'.format(
+            remapping_constant))
+    if max_bounds is None:
+        max_bounds = np.max(np.abs(points), axis=0) if len(points) else np.ones(3)
+        # Avoid dividing by zero for points all in a plane through the origin.
+        max_bounds = np.where(max_bounds > 0, max_bounds, 1.0)
+    max_bounds = np.asarray(max_bounds, dtype=np.float64)
+    if np.any(np.abs(points) > max_bounds):
+        raise ValueError('Points must lie inside of the box [-max_bounds, max_bounds].')
+    params.scale_factor = factor
+    params.max_x, params.max_y, params.max_z = max_bounds.tolist()
+    params.remapping_constant = remapping_constant
+
+    dtype = _SC_DTYPES[encoding]
+    params.bytes_per_point = dtype.itemsize
+    # The decodable values are n - f/2 for all integers n = p1 * f + digit, so round to the
+    # nearest n and split it into the coarse byte and the fine digit.  The points are inside
+    # max_bounds and remapping_constant <= 127, so only a point at the upper bound can round
+    # past the largest n, which is then its nearest encodable value.
+    units = np.rint(points * (remapping_constant * factor / max_bounds) + factor / 2.0)
+    units = np.minimum(units.astype(np.int64), 128 * factor - 1)
+    coarse, digits = np.divmod(units, factor)
+    encoded = np.empty(len(points), dtype=dtype)
+    encoded['coarse'] = coarse
+    encoded['extra'] = digits[:, 0] + factor * (digits[:, 1] + factor * digits[:, 2])
+    point_cloud.data = encoded.tobytes()
+    return point_cloud
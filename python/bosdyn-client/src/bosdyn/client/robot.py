@@ -6,9 +6,14 @@
 
 """Settings common to a user's access to one robot."""
 import copy
+import functools
+import itertools
 import logging
+import threading
 import time
 
+import grpc
+
 import bosdyn.api.data_buffer_pb2 as data_buffer_protos
 import bosdyn.client.channel
 from bosdyn.util import timestamp_to_sec
@@ -42,6 +47,18 @@ from .token_manager import TokenManager
 _LOGGER = logging.getLogger(__name__)
 _DEFAULT_SECURE_CHANNEL_PORT = 443
 
+# Policies for how clients of a service share channels (see Robot.channel_policy_by_service).
+# All services of an authority share one channel.  This is the default.
+CHANNEL_POLICY_SHARED = 'shared'
+# The service gets a channel, and connection, of its own.
+CHANNEL_POLICY_DEDICATED = 'dedicated'
+# Clients of the service are assigned round-robin to a pool of channels to its authority.
+CHANNEL_POLICY_POOLED = 'pooled'
+
+# Services whose calls should not wait behind bulk data on a shared connection.
+LATENCY_CRITICAL_SERVICES = (EstopClient.default_service_name,
+                             RobotCommandClient.default_service_name)
+
 
 class RobotError(Error):
     """General class of errors to handle non-response non-grpc errors."""
@@ -73,6 +90,39 @@ class UnregisteredServiceTypeError(UnregisteredServiceError):
         return 'Service type "{}" has not been registered'.format(self.service_type)
 
 
+class ChannelStats(object):
+    """Usage of one channel created by a Robot.
+
+    Attributes:
+        channel: The grpc channel.
+        authority: Authority of the channel.
+        policy: The CHANNEL_POLICY_* the channel was created for.
+        key: Service name for a dedicated channel, index for a pooled channel, else None.
+        num_clients: Number of clients the channel has been handed out to.
+        state: Last grpc.ChannelConnectivity of the channel, if monitored.
+        num_connects: Number of times the channel became ready, if monitored.
+    """
+
+    def __init__(self, channel, authority, policy, key=None):
+        self.channel = channel
+        self.authority = authority
+        self.policy = policy
+        self.key = key
+        self.num_clients = 0
+        self.state = None
+        self.num_connects = 0
+
+    def _on_connectivity(self, state):
+        if state == grpc.ChannelConnectivity.READY and self.state != state:
+            self.num_connects += 1
+        self.state = state
+
+    def __repr__(self):
+        return 'ChannelStats({}, {}, {}, clients={}, connects={}, state={})'.format(
+            self.authority, self.policy, self.key, self.num_clients, self.num_connects,
+            self.state)
+
+
 class Robot(object):
     """Settings common to one user's access to one robot.
 
@@ -113,6 +163,17 @@ class Robot(object):
         self._current_user = None
         self.service_clients_by_name = {}
         self.channels_by_authority = {}
+        self.aio_channels_by_authority = {}
+        # Clients given an aio_channel_factory, whose aio channels are reset when they close.
+        self._aio_channel_clients = []
+        self.dedicated_aio_channels_by_service = {}
+        self.pooled_aio_channels_by_authority = {}
+        self._aio_pool_counters_by_authority = {}
+        self.dedicated_channels_by_service = {}
+        self.pooled_channels_by_authority = {}
+        self._pool_counters_by_authority = {}
+        self._channel_stats = []
+        self._channel_lock = threading.Lock()
         self.authorities_by_name = {}
         self._robot_id = None
         self._has_arm = None
@@ -134,6 +195,19 @@ class Robot(object):
         self.max_send_message_length = DEFAULT_MAX_MESSAGE_LENGTH
         self.max_receive_message_length = DEFAULT_MAX_MESSAGE_LENGTH
 
+        # How channels are shared between services, as a CHANNEL_POLICY_* by service name.
+        # Services not listed use CHANNEL_POLICY_SHARED.
+        self.channel_policy_by_service = {}
+        # Number of channels per authority for services using CHANNEL_POLICY_POOLED.
+        self.channel_pool_size = 2
+        # When set, channels send HTTP/2 pings after this long without activity so that a dead
+        # connection is noticed before the next call.  The robot rejects overly frequent pings,
+        # so keep this to at least several seconds.
+        self.channel_keepalive_time_ms = None
+        self.channel_keepalive_timeout_ms = 20000
+        # Record connectivity changes of new channels in their ChannelStats.
+        self.monitor_channel_connectivity = False
+
     def _shutdown(self):
         """Shut down background threads for tokens and time sync."""
         if self._time_sync_thread:
@@ -234,6 +308,10 @@ class Robot(object):
 
         if channel is None:
             channel = self.ensure_channel(service_name, options=options)
+            # The asyncio channel is created on first use, from within the event loop.
+            client.aio_channel_factory = functools.partial(self.ensure_aio_channel, service_name,
+                                                           options=options)
+            self._aio_channel_clients.append(client)
 
         client.channel = channel
         client.update_from(self)
@@ -257,6 +335,9 @@ class Robot(object):
         """Verify the right information exists before calling the ensure_secure_channel
         method.
 
+        The channel is chosen according to the channel policy of the service, see
+        channel_policy_by_service.
+
         Args:
             service_name: Name of the service in the directory.
         Returns:
@@ -266,6 +347,65 @@ class Robot(object):
             UnregisteredServiceNameError: service_name is unknown.
         """
 
+        authority = self._get_authority(service_name)
+        policy = self.channel_policy_by_service.get(service_name, CHANNEL_POLICY_SHARED)
+        if policy == CHANNEL_POLICY_DEDICATED:
+            channel = self.ensure_dedicated_channel(service_name, authority, options=options)
+        elif policy == CHANNEL_POLICY_POOLED:
+            channel = self.ensure_pooled_channel(authority, options=options)
+        else:
+            skip_app_token_check = service_name == 'robot-id'
+            channel = self.ensure_secure_channel(authority, skip_app_token_check, options=options)
+        with self._channel_lock:
+            for stats in self._channel_stats:
+                if stats.channel is channel:
+                    stats.num_clients += 1
+        return channel
+
+    def set_channel_policy(self, policy, service_names=LATENCY_CRITICAL_SERVICES):
+        """Set the channel policy of services.
+
+        Only clients created afterwards are affected.
+
+        Args:
+            policy: One of the CHANNEL_POLICY_* values.
+            service_names: Names of the services to apply the policy to.
+        """
+        if policy not in (CHANNEL_POLICY_SHARED, CHANNEL_POLICY_DEDICATED,
+                          CHANNEL_POLICY_POOLED):
+            raise ValueError('Unknown channel policy "{}"'.format(policy))
+        for service_name in service_names:
+            self.channel_policy_by_service[service_name] = policy
+
+    def channel_stats(self):
+        """Return a list of ChannelStats, one for each channel created by this robot."""
+        with self._channel_lock:
+            return list(self._channel_stats)
+
+    def ensure_aio_channel(self, service_name, options=[]):
+        """Asyncio version of ensure_channel(), returning a grpc.aio channel.
+
+        The channel is chosen according to the channel policy of the service, as for
+        ensure_channel().  A grpc.aio channel must only be used from the event loop on which it
+        was first used.
+
+        Args:
+            service_name: Name of the service in the directory.
+        Returns:
+            Existing grpc.aio channel if found, or newly created channel if not found.
+        Raises:
+            RpcError: There was a problem communicating with the robot.
+            UnregisteredServiceNameError: service_name is unknown.
+        """
+        authority = self._get_authority(service_name)
+        policy = self.channel_policy_by_service.get(service_name, CHANNEL_POLICY_SHARED)
+        if policy == CHANNEL_POLICY_DEDICATED:
+            return self.ensure_dedicated_aio_channel(service_name, authority, options=options)
+        if policy == CHANNEL_POLICY_POOLED:
+            return self.ensure_pooled_aio_channel(authority, options=options)
+        return self.ensure_secure_aio_channel(authority, options=options)
+
+    def _get_authority(self, service_name):
         # If a specific channel was not set, look up the authority so we can get a channel.
         # Get the authority from either
         #   1. The bootstrap authority for this client_class, if available
@@ -282,32 +422,170 @@ class Robot(object):
         # If authority still not known, then the service name has not been registered.
         if not authority:
             raise UnregisteredServiceNameError(service_name)
-
-        skip_app_token_check = service_name == 'robot-id'
-        return self.ensure_secure_channel(authority, skip_app_token_check, options=options)
+        return authority
 
     def ensure_secure_channel(self, authority, skip_app_token_check=False, options=[]):
         """Get the channel to access the given authority, creating it if it doesn't exist."""
-        if authority in self.channels_by_authority:
-            return self.channels_by_authority[authority]
+        with self._channel_lock:
+            if authority in self.channels_by_authority:
+                return self.channels_by_authority[authority]
 
-        # Update max send/receive message lengths.
-        if 'grpc.max_receive_message_length' not in [option[0] for option in options]:
-            options.append(('grpc.max_receive_message_length', self.max_receive_message_length))
-        if 'grpc.max_send_message_length' not in [option[0] for option in options]:
-            options.append(('grpc.max_send_message_length', self.max_send_message_length))
+            self._update_message_length_options(options)
 
-        # Channel doesn't exist, so create it.
+            # Channel doesn't exist, so create it.
+            channel = self._locked_create_secure_channel(authority, options,
+                                                         CHANNEL_POLICY_SHARED)
+            self.channels_by_authority[authority] = channel
+            return channel
+
+    def ensure_dedicated_channel(self, service_name, authority, options=[]):
+        """Get the channel used only by the given service, creating it if it doesn't exist.
+
+        The channel has its own connection to the robot, so its calls are not delayed by large
+        messages of other services.
+        """
+        with self._channel_lock:
+            if service_name in self.dedicated_channels_by_service:
+                return self.dedicated_channels_by_service[service_name]
+
+            options = self._separate_connection_options(options)
+            channel = self._locked_create_secure_channel(authority, options,
+                                                         CHANNEL_POLICY_DEDICATED, service_name)
+            self.dedicated_channels_by_service[service_name] = channel
+            return channel
+
+    def ensure_pooled_channel(self, authority, options=[]):
+        """Get the next channel of the pool of channels to the given authority, in round-robin
+        order.
+
+        The pool holds channel_pool_size channels, each with its own connection.  Channels are
+        created as they are first needed.
+        """
+        with self._channel_lock:
+            pool = self.pooled_channels_by_authority.setdefault(authority, [])
+            counter = self._pool_counters_by_authority.setdefault(authority, itertools.count())
+            index = next(counter) % max(1, self.channel_pool_size)
+            if index < len(pool):
+                return pool[index]
+
+            options = self._separate_connection_options(options)
+            channel = self._locked_create_secure_channel(authority, options,
+                                                         CHANNEL_POLICY_POOLED, len(pool))
+            pool.append(channel)
+            return channel
+
+    def _separate_connection_options(self, options):
+        """Return the options for a channel which must not share a connection with others."""
+        options = list(options)
+        self._update_message_length_options(options)
+        # Channels with the same target and arguments otherwise share their connection through
+        # the global subchannel pool.
+        options.append(('grpc.use_local_subchannel_pool', 1))
+        return options
+
+    def _keepalive_options(self, options):
+        """Return the options with the keepalive options added, if set and not present."""
+        if self.channel_keepalive_time_ms is not None:
+            option_names = [option[0] for option in options]
+            if 'grpc.keepalive_time_ms' not in option_names:
+                options = list(options) + [
+                    ('grpc.keepalive_time_ms', self.channel_keepalive_time_ms),
+                    ('grpc.keepalive_timeout_ms', self.channel_keepalive_timeout_ms),
+                ]
+        return options
+
+    def _locked_create_secure_channel(self, authority, options, policy, key=None):
+        options = self._keepalive_options(options)
         creds = bosdyn.client.channel.create_secure_channel_creds(
             self.cert, lambda: (self.app_token, self.user_token))
         channel = bosdyn.client.channel.create_secure_channel(self.address,
                                                               self._secure_channel_port, creds,
                                                               authority, options=options)
-        self.logger.debug('Created channel to %s at port %i with authority %s', self.address,
-                          self._secure_channel_port, authority)
-        self.channels_by_authority[authority] = channel
+        self.logger.debug('Created %s channel to %s at port %i with authority %s', policy,
+                          self.address, self._secure_channel_port, authority)
+        stats = ChannelStats(channel, authority, policy, key)
+        if self.monitor_channel_connectivity:
+            channel.subscribe(stats._on_connectivity)
+        self._channel_stats.append(stats)
+        return channel
+
+    def ensure_secure_aio_channel(self, authority, options=[]):
+        """Get the grpc.aio channel to access the given authority, creating it if it doesn't
+        exist."""
+        with self._channel_lock:
+            if authority in self.aio_channels_by_authority:
+                return self.aio_channels_by_authority[authority]
+
+            self._update_message_length_options(options)
+
+            # Channel doesn't exist, so create it.
+            channel = self._create_secure_aio_channel(authority, options, CHANNEL_POLICY_SHARED)
+            self.aio_channels_by_authority[authority] = channel
+            return channel
+
+    def ensure_dedicated_aio_channel(self, service_name, authority, options=[]):
+        """Asyncio version of ensure_dedicated_channel(), returning a grpc.aio channel."""
+        with self._channel_lock:
+            if service_name in self.dedicated_aio_channels_by_service:
+                return self.dedicated_aio_channels_by_service[service_name]
+
+            options = self._separate_connection_options(options)
+            channel = self._create_secure_aio_channel(authority, options,
+                                                      CHANNEL_POLICY_DEDICATED)
+            self.dedicated_aio_channels_by_service[service_name] = channel
+            return channel
+
+    def ensure_pooled_aio_channel(self, authority, options=[]):
+        """Asyncio version of ensure_pooled_channel(), returning a grpc.aio channel."""
+        with self._channel_lock:
+            pool = self.pooled_aio_channels_by_authority.setdefault(authority, [])
+            counter = self._aio_pool_counters_by_authority.setdefault(
+                authority, itertools.count())
+            index = next(counter) % max(1, self.channel_pool_size)
+            if index < len(pool):
+                return pool[index]
+
+            options = self._separate_connection_options(options)
+            channel = self._create_secure_aio_channel(authority, options, CHANNEL_POLICY_POOLED)
+            pool.append(channel)
+            return channel
+
+    def _create_secure_aio_channel(self, authority, options, policy):
+        options = self._keepalive_options(options)
+        creds = bosdyn.client.channel.create_secure_channel_creds(
+            self.cert, lambda: (self.app_token, self.user_token))
+        channel = bosdyn.client.channel.create_secure_aio_channel(
+            self.address, self._secure_channel_port, creds, authority, options=options)
+        self.logger.debug('Created %s aio channel to %s at port %i with authority %s', policy,
+                          self.address, self._secure_channel_port, authority)
         return channel
 
+    async def close_aio_channels(self):
+        """Close all grpc.aio channels, from the event loop on which they were used.
+
+        Clients from ensure_client() create new aio channels when they are next used, so they may
+        then be used from another event loop.
+        """
+        with self._channel_lock:
+            channels = list(self.aio_channels_by_authority.values())
+            channels.extend(self.dedicated_aio_channels_by_service.values())
+            for pool in self.pooled_aio_channels_by_authority.values():
+                channels.extend(pool)
+            self.aio_channels_by_authority = {}
+            self.dedicated_aio_channels_by_service = {}
+            self.pooled_aio_channels_by_authority = {}
+        for client in self._aio_channel_clients:
+            client.aio_channel = None
+        for channel in channels:
+            await channel.close()
+
+    def _update_message_length_options(self, options):
+        """Add the max send/receive message lengths to the channel options, if not present."""
+        if 'grpc.max_receive_message_length' not in [option[0] for option in options]:
+            options.append(('grpc.max_receive_message_length', self.max_receive_message_length))
+        if 'grpc.max_send_message_length' not in [option[0] for option in options]:
+            options.append(('grpc.max_send_message_length', self.max_send_message_length))
+
 
     def authenticate(
             self,
@@ -26,6 +26,8 @@ class RobotIdClient(BaseClient):
     default_service_name = 'robot-id'
     # gRPC service proto definition implemented by this service
     service_type = 'bosdyn.api.RobotIdService'
+    # Rpcs which may be coalesced, see BaseClient.coalesce_read_only_rpcs().
+    read_only_rpcs = ('GetRobotId',)
 
     def __init__(self):
         super(RobotIdClient, self).__init__(robot_id_service_pb2_grpc.RobotIdServiceStub)
@@ -43,6 +45,14 @@ class RobotIdClient(BaseClient):
                                error_from_response=common_header_errors, copy_request=False,
                                **kwargs)
 
+    async def get_id_aio(self, **kwargs):
+        """Coroutine returning the results of "get_id". See "get_id" for further docs."""
+        req = robot_id_pb2.RobotIdRequest()
+        return await self.call_aio(self.aio_stub.GetRobotId, req,
+                                   value_from_response=_get_entry_value,
+                                   error_from_response=common_header_errors, copy_request=False,
+                                   **kwargs)
+
 
 def version_tuple(version):
     """Return the version as a tuple for easy comparisons"""
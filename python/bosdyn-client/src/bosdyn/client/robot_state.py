@@ -6,14 +6,24 @@
 
 """For clients to use the robot state service."""
 
+import collections
+import logging
+import threading
+import time
+
 from bosdyn.api import robot_state_pb2, robot_state_service_pb2_grpc
-from bosdyn.client.common import BaseClient, common_header_errors
+from bosdyn.client.common import BaseClient, _is_repeated, common_header_errors
+from bosdyn.client.exceptions import ResponseError, RpcError
+
+_LOGGER = logging.getLogger(__name__)
 
 
 class RobotStateClient(BaseClient):
     """Client for the RobotState service."""
     default_service_name = 'robot-state'
     service_type = 'bosdyn.api.RobotStateService'
+    read_only_rpcs = ('GetRobotState', 'GetRobotMetrics', 'GetRobotHardwareConfiguration',
+                      'GetRobotLinkModel')
 
     def __init__(self):
         super(RobotStateClient, self).__init__(robot_state_service_pb2_grpc.RobotStateServiceStub)
@@ -37,6 +47,12 @@ class RobotStateClient(BaseClient):
         return self.call_async(self._stub.GetRobotState, req, _get_robot_state_value,
                                common_header_errors, copy_request=False, **kwargs)
 
+    async def get_robot_state_aio(self, **kwargs):
+        """Asyncio version of get_robot_state()"""
+        req = self._get_robot_state_request()
+        return await self.call_aio(self.aio_stub.GetRobotState, req, _get_robot_state_value,
+                                   common_header_errors, copy_request=False, **kwargs)
+
     def get_robot_metrics(self, **kwargs):
         """Obtain robot metrics, such as distance traveled or time powered on.
 
@@ -56,6 +72,12 @@ class RobotStateClient(BaseClient):
         return self.call_async(self._stub.GetRobotMetrics, req, _get_robot_metrics_value,
                                common_header_errors, copy_request=False, **kwargs)
 
+    async def get_robot_metrics_aio(self, **kwargs):
+        """Asyncio version of get_robot_metrics()"""
+        req = self._get_robot_metrics_request()
+        return await self.call_aio(self.aio_stub.GetRobotMetrics, req, _get_robot_metrics_value,
+                                   common_header_errors, copy_request=False, **kwargs)
+
     def get_robot_hardware_configuration(self, **kwargs):
         """Obtain current hardware configuration of robot.
 
@@ -77,6 +99,13 @@ class RobotStateClient(BaseClient):
                                _get_robot_hardware_configuration_value, common_header_errors,
                                copy_request=False, **kwargs)
 
+    async def get_robot_hardware_configuration_aio(self, **kwargs):
+        """Asyncio version of get_robot_hardware_configuration()"""
+        req = self._get_robot_hardware_configuration_request()
+        return await self.call_aio(self.aio_stub.GetRobotHardwareConfiguration, req,
+                                   _get_robot_hardware_configuration_value, common_header_errors,
+                                   copy_request=False, **kwargs)
+
     def get_robot_link_model(self, link_name, **kwargs):
         """Obtain link model OBJ for a specific link.
 
@@ -99,6 +128,13 @@ class RobotStateClient(BaseClient):
         return self.call_async(self._stub.GetRobotLinkModel, req, _get_robot_link_model_value,
                                common_header_errors, copy_request=False, **kwargs)
 
+    async def get_robot_link_model_aio(self, link_name, **kwargs):
+        """Asyncio version of get_robot_link_model()"""
+        req = self._get_robot_link_model_request(link_name)
+        return await self.call_aio(self.aio_stub.GetRobotLinkModel, req,
+                                   _get_robot_link_model_value, common_header_errors,
+                                   copy_request=False, **kwargs)
+
     def get_hardware_config_with_link_info(self):
         """Convenience function which first requests a robot's hardware configuration followed by
         requests to get link models for all robot links.
@@ -160,3 +196,187 @@ def has_arm(state_client, timeout=None):
     """
     state = state_client.get_robot_state(timeout=timeout)
     return state.HasField("manipulator_state")
+
+
+def _get_field(message, field_path):
+    for field_name in field_path.split('.'):
+        message = getattr(message, field_name)
+    return message
+
+
+def _check_field_path(field_path):
+    """Raise ValueError unless field_path is the path of a field of a RobotState."""
+    descriptor = robot_state_pb2.RobotState.DESCRIPTOR
+    field_names = field_path.split('.')
+    for index, field_name in enumerate(field_names):
+        field = None if descriptor is None else descriptor.fields_by_name.get(field_name)
+        if field is None:
+            raise ValueError('"{}" is not a RobotState field path.'.format(field_path))
+        if index < len(field_names) - 1 and _is_repeated(field):
+            raise ValueError('RobotState field path "{}" goes through repeated field "{}".'.format(
+                field_path, field_name))
+        descriptor = field.message_type
+
+
+class RobotStateCache(object):
+    """Shares the robot state between many consumers, querying it with one periodic rpc.
+
+    A background thread starts a GetRobotState rpc every period_sec, unless the previous one is
+    still in flight.  The cache keeps the latest robot state and the most recent states, and calls
+    subscribers when fields of the state change.
+
+    Args:
+        robot_state_client: RobotStateClient to query the robot state with.
+        period_sec: Time between queries.
+        history_len: Number of recent states to keep.
+        logger: Logger for errors, by default this module's logger.
+    """
+
+    # Field paths of RobotState commonly subscribed to.
+    BATTERY_FIELDS = ('battery_states', 'power_state.locomotion_charge_percentage')
+    KINEMATIC_FIELDS = ('kinematic_state',)
+    BEHAVIOR_FAULT_FIELDS = ('behavior_fault_state',)
+
+    def __init__(self, robot_state_client, period_sec=0.1, history_len=100, logger=None):
+        self._client = robot_state_client
+        self.period_sec = period_sec
+        self._logger = logger or _LOGGER
+        self._lock = threading.Lock()
+        self._locked_history = collections.deque(maxlen=history_len)
+        self._locked_subscribers = {}  # {subscription id -> (callback, field paths or None)}
+        self._locked_next_subscription_id = 0
+        self._locked_future = None
+        self._state_received = threading.Condition(self._lock)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def __del__(self):
+        self.stop()
+
+    def start(self):
+        """Start querying the robot state."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._query_thread)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop querying the robot state.  The rpc in flight, if any, still updates the cache."""
+        if self._thread:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def robot_state(self):
+        """The latest robot state (bosdyn.api.RobotState), or None if none was received yet."""
+        with self._lock:
+            return self._locked_history[-1] if self._locked_history else None
+
+    def history(self):
+        """Return the most recent robot states, oldest first."""
+        with self._lock:
+            return list(self._locked_history)
+
+    def wait_for_state(self, timeout_sec=None):
+        """Wait until a robot state is received.
+
+        Args:
+            timeout_sec: Time to wait, or None to wait indefinitely.
+
+        Returns:
+            The latest robot state, or None if none was received in time.
+        """
+        with self._state_received:
+            self._state_received.wait_for(lambda: self._locked_history, timeout_sec)
+            return self._locked_history[-1] if self._locked_history else None
+
+    def subscribe(self, callback, fields=None):
+        """Call a function when fields of the robot state change.
+
+        The callback is called as callback(robot_state, previous_robot_state) from the thread
+        receiving the robot state, so it should return quickly.  previous_robot_state is None
+        for the first robot state.
+
+        Args:
+            callback: Function to call.
+            fields: Path or paths of the RobotState fields to watch, such as
+                'behavior_fault_state' or 'power_state.locomotion_charge_percentage', or None to
+                call it for every state.
+
+        Returns:
+            Subscription id, for unsubscribe().
+
+        Raises:
+            ValueError: fields is empty, or a path is not a field of RobotState.
+        """
+        if fields is not None:
+            fields = (fields,) if isinstance(fields, str) else tuple(fields)
+            if not fields:
+                raise ValueError('fields must not be empty; use None for every state.')
+            for field_path in fields:
+                _check_field_path(field_path)
+        with self._lock:
+            subscription_id = self._locked_next_subscription_id
+            self._locked_next_subscription_id += 1
+            self._locked_subscribers[subscription_id] = (callback, fields)
+        return subscription_id
+
+    def unsubscribe(self, subscription_id):
+        """Stop calling the callback of a subscription."""
+        with self._lock:
+            self._locked_subscribers.pop(subscription_id, None)
+
+    def update(self, robot_state):
+        """Add a robot state to the cache and notify the subscribers.
+
+        Called with each queried robot state; may also be called with states received otherwise.
+        """
+        with self._lock:
+            previous = self._locked_history[-1] if self._locked_history else None
+            self._locked_history.append(robot_state)
+            subscribers = list(self._locked_subscribers.values())
+            self._state_received.notify_all()
+        for callback, fields in subscribers:
+            try:
+                if previous is not None and fields is not None and all(
+                        _get_field(robot_state, field) == _get_field(previous, field)
+                        for field in fields):
+                    continue
+                callback(robot_state, previous)
+            except Exception:  # pylint: disable=broad-except
+                self._logger.exception('Error in robot state subscriber %s', callback)
+
+    def _query_thread(self):
+        next_query_time = time.monotonic()
+        while not self._stop_event.is_set():
+            with self._lock:
+                start_query = self._locked_future is None
+            if start_query:
+                self._start_query()
+            # Skip the queries which were due while the previous query was in flight.
+            next_query_time = max(next_query_time + self.period_sec, time.monotonic())
+            self._stop_event.wait(next_query_time - time.monotonic())
+
+    def _start_query(self):
+        try:
+            future = self._client.get_robot_state_async()
+        except (RpcError, ResponseError) as err:
+            self._logger.exception('Failure getting robot state: %s', err)
+            return
+        with self._lock:
+            self._locked_future = future
+        future.add_done_callback(self._on_query_done)
+
+    def _on_query_done(self, future):
+        try:
+            robot_state = future.result()
+        except Exception as err:  # pylint: disable=broad-except
+            self._logger.error('Failure getting robot state: %s', err)
+            robot_state = None
+        with self._lock:
+            self._locked_future = None
+        if robot_state is not None:
+            self.update(robot_state)
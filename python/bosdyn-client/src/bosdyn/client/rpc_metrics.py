@@ -0,0 +1,381 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Client-side latency and throughput metrics for rpcs.
+
+RpcMetrics is opt-in: its processors are added to the processors of a robot or client, after the
+AddRequestHeader processor which sets the request timestamp.
+
+    metrics = RpcMetrics()
+    metrics.add_processors(robot)  # Before creating clients with robot.ensure_client().
+    ...
+    print(metrics.format_summary())
+
+Rpcs are named after their request message type, without its 'Request' suffix (e.g. 'GetImage'
+for GetImageRequest).  The latency of an rpc is measured from when its request is processed until
+its first response is processed.  If the service sets the request_received_timestamp and
+response_timestamp fields of the response header, the latency is split into the time spent in
+the service and the time spent on the network (including serialization and queuing).
+"""
+
+import bisect
+import copy
+import logging
+import threading
+import time
+
+from bosdyn.api import header_pb2
+from bosdyn.util import timestamp_to_nsec  # bosdyn-core
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets.  The last bucket has no upper bound.
+DEFAULT_LATENCY_BUCKETS_SEC = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0,
+                               5.0, 10.0)
+
+# Requests with no response after this long are no longer counted as in flight.
+DEFAULT_MAX_IN_FLIGHT_SEC = 120.0
+
+# Oldest in-flight requests are dropped when there are more than this many.
+_MAX_PENDING_REQUESTS = 4096
+
+
+def _rpc_name(message, suffix):
+    name = message.DESCRIPTOR.name
+    if name.endswith(suffix):
+        return name[:-len(suffix)]
+    return name
+
+
+def _header(message, header_type):
+    header = getattr(message, 'header', None)
+    if isinstance(header, header_type):
+        return header
+    return None
+
+
+class RpcStats(object):
+    """Statistics of one rpc, as returned by RpcMetrics.
+
+    Attributes:
+     num_requests:          number of request messages sent.
+     num_responses:         number of response messages received.
+     num_errors:            number of failed rpcs and of responses with a header error.
+     num_in_flight:         number of requests without a response yet.
+     request_bytes:         total serialized size of the request messages.
+     response_bytes:        total serialized size of the response messages.
+     latency_buckets_sec:   upper bounds of the latency histogram buckets.
+     latency_counts:        latency histogram, with one more bucket than latency_buckets_sec.
+     num_latencies:         number of rpcs whose latency was measured.
+     total_latency_sec:     sum of the measured latencies.
+     max_latency_sec:       largest measured latency.
+     num_server_times:      number of rpcs whose service and network times were measured.
+     total_server_sec:      sum of the times spent in the service.
+     total_network_sec:     sum of the latencies minus the times spent in the service.
+    """
+
+    def __init__(self, latency_buckets_sec):
+        self.num_requests = 0
+        self.num_responses = 0
+        self.num_errors = 0
+        self.num_in_flight = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.latency_buckets_sec = latency_buckets_sec
+        self.latency_counts = [0] * (len(latency_buckets_sec) + 1)
+        self.num_latencies = 0
+        self.total_latency_sec = 0.0
+        self.max_latency_sec = 0.0
+        self.num_server_times = 0
+        self.total_server_sec = 0.0
+        self.total_network_sec = 0.0
+
+    def _add_latency(self, latency_sec):
+        self.latency_counts[bisect.bisect_left(self.latency_buckets_sec, latency_sec)] += 1
+        self.num_latencies += 1
+        self.total_latency_sec += latency_sec
+        self.max_latency_sec = max(self.max_latency_sec, latency_sec)
+
+    @property
+    def mean_latency_sec(self):
+        """Mean measured latency, or None if no latency was measured."""
+        if not self.num_latencies:
+            return None
+        return self.total_latency_sec / self.num_latencies
+
+    @property
+    def mean_server_sec(self):
+        """Mean time spent in the service, or None if it was not measured."""
+        if not self.num_server_times:
+            return None
+        return self.total_server_sec / self.num_server_times
+
+    @property
+    def mean_network_sec(self):
+        """Mean latency minus the time spent in the service, or None if it was not measured."""
+        if not self.num_server_times:
+            return None
+        return self.total_network_sec / self.num_server_times
+
+    def latency_percentile_sec(self, percentile):
+        """Estimate a latency percentile from the histogram.
+
+        Args:
+         percentile:  percentile in [0, 100].
+
+        Returns: upper bound of the histogram bucket holding the percentile (or the largest
+         latency for the last bucket), or None if no latency was measured.
+        """
+        if not self.num_latencies:
+            return None
+        rank = percentile / 100.0 * self.num_latencies
+        num_below = 0
+        for bucket_sec, count in zip(self.latency_buckets_sec, self.latency_counts):
+            num_below += count
+            if num_below >= rank and num_below > 0:
+                return min(bucket_sec, self.max_latency_sec)
+        return self.max_latency_sec
+
+
+class RpcMetrics(object):
+    """Collects latency, payload size, error and in-flight statistics of rpcs.
+
+    Thread-safe: the processors may be shared by clients used from several threads.
+
+    Args:
+     latency_buckets_sec:  increasing upper bounds (seconds) of the latency histogram buckets.
+     max_in_flight_sec:    requests with no response after this long are no longer counted as
+                           in flight, e.g. the requests of a streaming rpc.
+    """
+
+    def __init__(self, latency_buckets_sec=DEFAULT_LATENCY_BUCKETS_SEC,
+                 max_in_flight_sec=DEFAULT_MAX_IN_FLIGHT_SEC):
+        self.latency_buckets_sec = tuple(latency_buckets_sec)
+        self.max_in_flight_sec = max_in_flight_sec
+        self.request_processor = RpcMetricsRequestProcessor(self)
+        self.response_processor = RpcMetricsResponseProcessor(self)
+        self._lock = threading.Lock()
+        self._locked_stats = {}  # {rpc name -> RpcStats}
+        # {(client name, request timestamp nsec) -> (rpc name, time.perf_counter() of request)}
+        self._locked_pending = {}
+
+    def add_processors(self, processor_owner):
+        """Append the metrics processors to the processors of a Robot, Sdk or client."""
+        processor_owner.request_processors.append(self.request_processor)
+        processor_owner.response_processors.append(self.response_processor)
+
+    def rpc_names(self):
+        """Return the names of the rpcs with statistics."""
+        with self._lock:
+            return sorted(self._locked_stats)
+
+    def get_stats(self, rpc_name):
+        """Return a copy of the RpcStats of an rpc, or None if it has no statistics."""
+        with self._lock:
+            self._locked_expire_pending(time.perf_counter())
+            stats = self._locked_stats.get(rpc_name)
+            return copy.deepcopy(stats)
+
+    def snapshot(self):
+        """Return a copy of the statistics of all rpcs, as {rpc name -> RpcStats}."""
+        with self._lock:
+            self._locked_expire_pending(time.perf_counter())
+            return copy.deepcopy(self._locked_stats)
+
+    def reset(self):
+        """Clear all statistics.  Requests in flight are still counted as in flight."""
+        with self._lock:
+            in_flight = {name: stats.num_in_flight for name, stats in self._locked_stats.items()}
+            self._locked_stats = {}
+            for name, num_in_flight in in_flight.items():
+                if num_in_flight:
+                    self._locked_get_stats(name).num_in_flight = num_in_flight
+
+    def format_summary(self):
+        """Return a table of the statistics of all rpcs (string)."""
+
+        def _msec(sec):
+            return '-' if sec is None else '{:.1f}'.format(sec * 1000)
+
+        lines = [
+            '{:<32} {:>7} {:>6} {:>6} {:>9} {:>9} {:>9} {:>9} {:>9} {:>12} {:>12}'.format(
+                'rpc', 'count', 'errors', 'active', 'mean ms', 'p99 ms', 'max ms', 'server ms',
+                'network ms', 'req bytes', 'resp bytes')
+        ]
+        for name, stats in sorted(self.snapshot().items()):
+            lines.append(
+                '{:<32} {:>7} {:>6} {:>6} {:>9} {:>9} {:>9} {:>9} {:>9} {:>12} {:>12}'.format(
+                    name, stats.num_requests, stats.num_errors, stats.num_in_flight,
+                    _msec(stats.mean_latency_sec), _msec(stats.latency_percentile_sec(99)),
+                    _msec(stats.max_latency_sec if stats.num_latencies else None),
+                    _msec(stats.mean_server_sec), _msec(stats.mean_network_sec),
+                    stats.request_bytes, stats.response_bytes))
+        return '\n'.join(lines)
+
+    def _locked_get_stats(self, rpc_name):
+        stats = self._locked_stats.get(rpc_name)
+        if stats is None:
+            stats = RpcStats(self.latency_buckets_sec)
+            self._locked_stats[rpc_name] = stats
+        return stats
+
+    def _locked_expire_pending(self, now):
+        expired = [
+            key for key, (_name, start) in self._locked_pending.items()
+            if now - start > self.max_in_flight_sec
+        ]
+        for key in expired:
+            self._locked_finish(key)
+
+    def _locked_finish(self, key):
+        """Remove a pending request, returning (rpc name, start time) or None."""
+        pending = self._locked_pending.pop(key, None)
+        if pending is not None:
+            stats = self._locked_get_stats(pending[0])
+            stats.num_in_flight = max(0, stats.num_in_flight - 1)
+        return pending
+
+    @staticmethod
+    def _pending_key(request_header):
+        if request_header is None or not request_header.HasField('request_timestamp'):
+            return None
+        return (request_header.client_name,
+                timestamp_to_nsec(request_header.request_timestamp))
+
+    def _on_request(self, request):
+        now = time.perf_counter()
+        rpc_name = _rpc_name(request, 'Request')
+        nbytes = request.ByteSize()
+        key = self._pending_key(_header(request, header_pb2.RequestHeader))
+        with self._lock:
+            stats = self._locked_get_stats(rpc_name)
+            stats.num_requests += 1
+            stats.request_bytes += nbytes
+            if key is None:
+                return
+            if key in self._locked_pending:
+                self._locked_finish(key)
+            stats.num_in_flight += 1
+            self._locked_pending[key] = (rpc_name, now)
+            if len(self._locked_pending) > _MAX_PENDING_REQUESTS:
+                # Dicts are in insertion order, so this is the oldest request.
+                self._locked_finish(next(iter(self._locked_pending)))
+
+    def _on_response(self, response):
+        now = time.perf_counter()
+        nbytes = response.ByteSize()
+        header = _header(response, header_pb2.ResponseHeader)
+        key = None if header is None else self._pending_key(header.request_header)
+        server_sec = None
+        if (header is not None and header.HasField('request_received_timestamp') and
+                header.HasField('response_timestamp')):
+            server_sec = (timestamp_to_nsec(header.response_timestamp) -
+                          timestamp_to_nsec(header.request_received_timestamp)) * 1e-9
+        with self._lock:
+            pending = None if key is None else self._locked_finish(key)
+            rpc_name = _rpc_name(response, 'Response') if pending is None else pending[0]
+            stats = self._locked_get_stats(rpc_name)
+            stats.num_responses += 1
+            stats.response_bytes += nbytes
+            if header is not None and header.error.code not in (header.error.CODE_UNSPECIFIED,
+                                                                header.error.CODE_OK):
+                stats.num_errors += 1
+            if pending is None:
+                return
+            latency_sec = now - pending[1]
+            stats._add_latency(latency_sec)
+            if server_sec is not None:
+                stats.num_server_times += 1
+                stats.total_server_sec += server_sec
+                stats.total_network_sec += latency_sec - server_sec
+
+    def _on_error(self, request):
+        header = None if request is None else _header(request, header_pb2.RequestHeader)
+        key = self._pending_key(header)
+        with self._lock:
+            pending = None if key is None else self._locked_finish(key)
+            if pending is not None:
+                rpc_name = pending[0]
+            elif request is not None:
+                rpc_name = _rpc_name(request, 'Request')
+            else:
+                return
+            self._locked_get_stats(rpc_name).num_errors += 1
+
+
+class RpcMetricsRequestProcessor(object):
+    """Request processor recording requests in an RpcMetrics."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def mutate(self, request):
+        """Record the request, without modifying it."""
+        self.metrics._on_request(request)  # pylint: disable=protected-access
+
+
+class RpcMetricsResponseProcessor(object):
+    """Response processor recording responses and failed rpcs in an RpcMetrics."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def mutate(self, response):
+        """Record the response, without modifying it."""
+        self.metrics._on_response(response)  # pylint: disable=protected-access
+
+    def on_rpc_error(self, request, error):  # pylint: disable=unused-argument
+        """Record an rpc which failed without a response.
+
+        Args:
+         request:  the request sent, or None if it is not known (e.g. for streaming rpcs).
+         error:    the exception raised for the rpc.
+        """
+        self.metrics._on_error(request)  # pylint: disable=protected-access
+
+
+class RpcMetricsLogger(object):
+    """Background thread logging the summary of an RpcMetrics periodically.
+
+    Args:
+     metrics:     RpcMetrics to log.
+     period_sec:  time between summaries.
+     logger:      logger to write the summaries to, at INFO level.
+     reset:       if True, reset the statistics after each summary.
+    """
+
+    def __init__(self, metrics, period_sec=60.0, logger=None, reset=False):
+        self.metrics = metrics
+        self.period_sec = period_sec
+        self.logger = logger or _LOGGER
+        self.reset = reset
+        self._event = threading.Event()  # Set to stop the thread.
+        self._thread = None
+
+    def __del__(self):
+        self.stop()
+
+    def start(self):
+        """Start the thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._event.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Shut down the thread if it is running."""
+        if self._thread:
+            self._event.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._event.wait(self.period_sec):
+            self.logger.info('rpc metrics:\n%s', self.metrics.format_summary())
+            if self.reset:
+                self.metrics.reset()
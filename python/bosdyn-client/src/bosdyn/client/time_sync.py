@@ -11,9 +11,12 @@ system clock of clients, and sends an estimate of this difference to the client.
 uses this information when it needs to send a timestamp to the robot in a request proto.
 Timestamps in request protos generally need to be specified relative to the robot's system clock.
 """
+import collections
+import queue
 import time
 from threading import Event, Lock, Thread
 
+import numpy as np
 from google.protobuf import duration_pb2
 
 from bosdyn.api import time_sync_pb2, time_sync_service_pb2_grpc
@@ -182,6 +185,8 @@ class TimeSyncEndpoint:
         self._locked_previous_round_trip = None
         self._locked_previous_response = None
         self._locked_clock_identifier = ""
+        # RobotTimeConverter for the skew of the previous response, created on first use.
+        self._locked_converter = None
 
     @property
     def response(self):
@@ -262,7 +267,7 @@ class TimeSyncEndpoint:
             counter += 1
         return self.has_established_time_sync
 
-    def _get_update(self):
+    def _get_update_args(self):
         round_trip = None
         clock_identifier = None
         with self._lock:
@@ -274,18 +279,13 @@ class TimeSyncEndpoint:
             if self._locked_clock_identifier:
                 round_trip = self._locked_previous_round_trip
                 clock_identifier = self._locked_clock_identifier
-        return self._client.get_time_sync_update(previous_round_trip=round_trip,
-                                                 clock_identifier=clock_identifier)
+        return dict(previous_round_trip=round_trip, clock_identifier=clock_identifier)
 
-    def get_new_estimate(self):
-        """Perform an update-cycle toward achieving time-synchronization.
-
-        Return:
-            Boolean true if valid timesync has been established.
-        """
-        response = self._get_update()
-        rx_time = now_nsec()
+    def _get_update(self, **kwargs):
+        return self._client.get_time_sync_update(**self._get_update_args(), **kwargs)
 
+    def _record_response(self, response, rx_time):
+        """Record a response received at local time rx_time (nsec), and return its round trip."""
         # Record the timing information for this GRPC call to pass to the next update
         round_trip = time_sync_pb2.TimeSyncRoundTrip()
         # pylint: disable=no-member
@@ -299,19 +299,45 @@ class TimeSyncEndpoint:
             # Store the response to get clock-skew estimate, etc.
             self._locked_previous_response = response
             self._locked_clock_identifier = response.clock_identifier
+            self._locked_converter = None
+        return round_trip
+
+    def get_new_estimate(self):
+        """Perform an update-cycle toward achieving time-synchronization.
 
+        Return:
+            Boolean true if valid timesync has been established.
+        """
+        response = self._get_update()
+        rx_time = now_nsec()
+        self._record_response(response, rx_time)
         return self.has_established_time_sync
 
     def get_robot_time_converter(self):
         """Get a RobotTimeConverter for current estimate for robot clock skew from local time.
 
+        The same converter is returned until there is a new estimate, so it may be requested
+        for each conversion.
+
         Returns:
           An instance of RobotTimeConvertor for the time-sync client.
 
         Raises:
           NotEstablishedError: If time sync has not yet been established.
         """
-        return RobotTimeConverter(timestamp_to_nsec(self.clock_skew))
+        with self._lock:
+            response = self._locked_previous_response
+            converter = self._locked_converter
+        if converter is not None:
+            return converter
+        # pylint: disable=no-member
+        if not response or response.state.status != time_sync_pb2.TimeSyncState.STATUS_OK:
+            raise NotEstablishedError
+        converter = RobotTimeConverter(timestamp_to_nsec(response.state.best_estimate.clock_skew))
+        with self._lock:
+            if self._locked_previous_response is response:
+                self._locked_converter = converter
+        return converter
 
     def robot_timestamp_from_local_secs(self, local_time_secs):
         """Convert a local time in seconds to a timestamp proto in robot time.
@@ -333,6 +359,163 @@ class TimeSyncEndpoint:
         return converter.robot_timestamp_from_local_secs(local_time_secs)
 
 
+# Clock skew estimate of a TimeSyncEstimator, in nanoseconds.
+#  skew_nsec:         robot clock minus local clock, at local time local_nsec.
+#  drift:             change of the skew per unit of local time.
+#  uncertainty_nsec:  bound on the error of skew_nsec.
+#  local_nsec:        local time of the estimate.
+SkewEstimate = collections.namedtuple('SkewEstimate',
+                                      ['skew_nsec', 'drift', 'uncertainty_nsec', 'local_nsec'])
+
+
+class TimeSyncEstimator:
+    """Estimates the robot clock skew and drift from pipelined time-sync round trips.
+
+    Unlike TimeSyncEndpoint.establish_timesync(), which makes its round trips one after the
+    other, collect() keeps several time-sync updates in flight.  Each round trip gives a sample
+    of the clock skew, whose error is at most half the round trip time (excluding the time spent
+    in the service).  The estimator keeps the samples of a sliding window, fits a line to the
+    skews of the samples with the smallest round trip times, and extrapolates it to estimate the
+    skew at any local time.
+
+    The round trips are also recorded in the TimeSyncEndpoint, which passes them on to the
+    time-sync service.  This object is thread-safe.
+
+    Args:
+        time_sync_endpoint: TimeSyncEndpoint used to make the time-sync updates.
+        window_size: Number of most recent samples to keep.
+        num_best: Number of samples with the smallest round trip times to fit the skew to.
+    """
+
+    def __init__(self, time_sync_endpoint, window_size=64, num_best=16):
+        self._endpoint = time_sync_endpoint
+        self._num_best = num_best
+        self._lock = Lock()
+        # (local time, skew, round trip time) of the samples, in nanoseconds.
+        self._locked_samples = collections.deque(maxlen=window_size)
+        self._locked_estimate = None  # SkewEstimate, or None if it must be computed.
+
+    def collect(self, num_samples=8, max_outstanding=4, timeout_sec=None):
+        """Make time-sync updates, keeping up to max_outstanding of them in flight.
+
+        Args:
+            num_samples: Number of time-sync updates to make.
+            max_outstanding: Maximum number of updates in flight.
+            timeout_sec: Timeout of each update, or None for the default timeout.
+
+        Returns:
+            Number of samples added (updates which failed are skipped).
+        """
+        kwargs = {} if timeout_sec is None else dict(timeout=timeout_sec)
+        num_added = 0
+        if not self._endpoint.clock_identifier and num_samples > 0:
+            # The first update assigns the clock identifier used by the others.
+            try:
+                response = self._endpoint._get_update(**kwargs)
+            except Error:
+                return 0
+            self.add_round_trip(self._endpoint._record_response(response, now_nsec()))
+            num_samples -= 1
+            num_added += 1
+
+        completed = queue.Queue()  # (future, local receive time) of the completed updates.
+
+        def _on_done(future):
+            completed.put((future, now_nsec()))
+
+        num_started = 0
+        num_completed = 0
+        sent_round_trip = None
+        while num_completed < num_samples:
+            while num_started < num_samples and num_started - num_completed < max_outstanding:
+                args = self._endpoint._get_update_args()
+                # Pass each round trip to the service once.
+                if args['previous_round_trip'] is sent_round_trip:
+                    args['previous_round_trip'] = None
+                sent_round_trip = args['previous_round_trip'] or sent_round_trip
+                future = self._endpoint._client.get_time_sync_update_async(**args, **kwargs)
+                future.add_done_callback(_on_done)
+                num_started += 1
+            future, rx_time = completed.get()
+            num_completed += 1
+            try:
+                response = future.result()
+            except Error:
+                continue
+            self.add_round_trip(self._endpoint._record_response(response, rx_time))
+            num_added += 1
+        return num_added
+
+    def add_round_trip(self, round_trip):
+        """Add the sample of a time-sync round trip (bosdyn.api.TimeSyncRoundTrip)."""
+        client_tx = timestamp_to_nsec(round_trip.client_tx)
+        server_rx = timestamp_to_nsec(round_trip.server_rx)
+        server_tx = timestamp_to_nsec(round_trip.server_tx)
+        client_rx = timestamp_to_nsec(round_trip.client_rx)
+        skew = ((server_rx - client_tx) + (server_tx - client_rx)) // 2
+        round_trip_time = (client_rx - client_tx) - (server_tx - server_rx)
+        with self._lock:
+            self._locked_samples.append(((client_tx + client_rx) // 2, skew, round_trip_time))
+            self._locked_estimate = None
+
+    def estimate(self, local_nsec=None):
+        """Estimate the clock skew at a local time.
+
+        Args:
+            local_nsec: Local time in nanoseconds, by default now.
+
+        Returns:
+            SkewEstimate.  Its uncertainty grows with the time from the samples.
+
+        Raises:
+            NotEstablishedError: No samples were collected.
+        """
+        with self._lock:
+            if self._locked_estimate is None:
+                self._locked_estimate = self._fit(list(self._locked_samples))
+            estimate, slope_error = self._locked_estimate
+        if local_nsec is None:
+            local_nsec = now_nsec()
+        elapsed_nsec = local_nsec - estimate.local_nsec
+        return SkewEstimate(
+            skew_nsec=estimate.skew_nsec + int(round(estimate.drift * elapsed_nsec)),
+            drift=estimate.drift,
+            uncertainty_nsec=estimate.uncertainty_nsec + int(abs(slope_error * elapsed_nsec)),
+            local_nsec=local_nsec)
+
+    def get_robot_time_converter(self):
+        """Get a RobotTimeConverter extrapolating the estimated clock skew with its drift.
+
+        Raises:
+            NotEstablishedError: No samples were collected.
+        """
+        estimate = self.estimate()
+        return RobotTimeConverter(estimate.skew_nsec, drift=estimate.drift,
+                                  reference_local_nsec=estimate.local_nsec)
+
+    def _fit(self, samples):
+        """Return (SkewEstimate at the time of the newest sample, standard error of the drift)."""
+        if not samples:
+            raise NotEstablishedError
+        samples = np.array(samples, dtype=np.int64)
+        best = samples[np.argsort(samples[:, 2], kind='stable')[:self._num_best]]
+        reference_nsec = int(samples[:, 0].max())
+        min_half_round_trip = int(best[:, 2].min()) // 2
+        # Fit in offsets from the reference time, to keep the precision of the float fit.
+        times = (best[:, 0] - reference_nsec).astype(np.float64)
+        skews = (best[:, 1] - best[-1, 1]).astype(np.float64)
+        if len(best) < 3 or np.ptp(times) == 0:
+            # Not enough samples to fit a drift: use the sample with the smallest round trip.
+            return SkewEstimate(int(best[0, 1]), 0.0, min_half_round_trip, reference_nsec), 0.0
+        drift, offset = np.polyfit(times, skews, 1)
+        residuals = skews - (drift * times + offset)
+        residual_variance = float(residuals.dot(residuals)) / (len(best) - 2)
+        slope_error = np.sqrt(residual_variance / float(((times - times.mean())**2).sum()))
+        uncertainty = min_half_round_trip + int(2 * np.sqrt(residual_variance))
+        return SkewEstimate(int(best[-1, 1] + round(offset)), float(drift), uncertainty,
+                            reference_nsec), float(slope_error)
+
+
 class TimeSyncThread:
     """Background thread for achieving and maintaining time-sync to the robot."""
 
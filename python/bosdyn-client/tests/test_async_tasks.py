@@ -0,0 +1,101 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for the async_tasks module."""
+import concurrent.futures
+import threading
+import time
+
+from bosdyn.client.async_tasks import AsyncPeriodicQuery, AsyncTaskScheduler, AsyncTasks
+from bosdyn.client.common import FutureWrapper
+from bosdyn.client.exceptions import RpcError
+
+
+def _error_from_response(response):
+    if response == 'failed':
+        return RpcError(None, 'failed')
+    return None
+
+
+class CountingQuery(AsyncPeriodicQuery):
+    """Query whose futures are completed by the test, or immediately."""
+
+    def __init__(self, period_sec, complete_immediately=True):
+        super(CountingQuery, self).__init__('counting', None, None, period_sec)
+        self.complete_immediately = complete_immediately
+        self.futures = []
+        self.results = []
+        self.errors = []
+        self.threads = set()
+
+    def _start_query(self):
+        future = concurrent.futures.Future()
+        self.futures.append(future)
+        if self.complete_immediately:
+            future.set_result(len(self.futures))
+        return FutureWrapper(future, None, _error_from_response)
+
+    def _handle_result(self, result):
+        self.threads.add(threading.current_thread())
+        self.results.append(result)
+
+    def _handle_error(self, exception):
+        self.errors.append(exception)
+
+
+def test_async_tasks_update():
+    query = CountingQuery(period_sec=0.01)
+    tasks = AsyncTasks([query])
+    tasks.update()
+    tasks.update()
+    assert query.results == [1]
+    assert query.proto is None
+
+
+def test_scheduler_period():
+    fast = CountingQuery(period_sec=0.01)
+    slow = CountingQuery(period_sec=0.1)
+    scheduler = AsyncTaskScheduler([fast, slow])
+    scheduler.start()
+    time.sleep(0.35)
+    scheduler.stop()
+    assert 15 <= len(fast.results) <= 36
+    assert 2 <= len(slow.results) <= 4
+    assert fast.threads == slow.threads and len(fast.threads) == 1
+    stats = scheduler.stats(fast)
+    assert stats.num_queries == len(fast.futures)
+    assert stats.num_overruns == 0
+    assert 0 <= stats.mean_jitter_sec <= stats.max_jitter_sec < 0.1
+
+
+def test_scheduler_overrun():
+    query = CountingQuery(period_sec=0.01, complete_immediately=False)
+    scheduler = AsyncTaskScheduler([query])
+    scheduler.start()
+    time.sleep(0.1)
+    # The query in flight blocks the next ones.
+    assert len(query.futures) == 1
+    assert scheduler.stats(query).num_overruns > 0
+    query.futures[0].set_result('failed')
+    time.sleep(0.05)
+    scheduler.stop()
+    assert len(query.errors) == 1
+    assert len(query.futures) > 1
+
+
+def test_scheduler_max_outstanding():
+    queries = [CountingQuery(period_sec=0.01, complete_immediately=False) for _ in range(3)]
+    scheduler = AsyncTaskScheduler(queries, max_outstanding=2)
+    scheduler.start()
+    time.sleep(0.1)
+    assert sorted(len(query.futures) for query in queries) == [0, 1, 1]
+    for query in queries:
+        query.complete_immediately = True
+        for future in query.futures:
+            future.set_result('done')
+    time.sleep(0.05)
+    scheduler.stop()
+    assert all(query.results for query in queries)
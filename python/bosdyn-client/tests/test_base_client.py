@@ -4,9 +4,31 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
+import asyncio
+import concurrent
+import logging
+import math
+import threading
+import time
 from functools import partial
 
-from bosdyn.client.common import BaseClient
+import grpc
+import pytest
+
+from bosdyn.api import (data_buffer_pb2, header_pb2, lease_pb2, robot_id_pb2,
+                        robot_id_service_pb2_grpc)
+from bosdyn.api.autowalk import autowalk_pb2, autowalk_service_pb2_grpc, walks_pb2
+from bosdyn.api.graph_nav import graph_nav_pb2, graph_nav_service_pb2_grpc, map_pb2
+from bosdyn.client.autowalk import AutowalkClient
+from bosdyn.client.common import (REQUEST_COPY_DEEP, REQUEST_COPY_PROCESSED_FIELDS, BaseClient,
+                                  _LogMessage, _restore_processed_fields, _save_processed_fields,
+                                  _strip_for_log)
+from bosdyn.client.exceptions import Error
+from bosdyn.client.graph_nav import GraphNavClient
+from bosdyn.client.processors import AddRequestHeader
+from bosdyn.client.robot_id import RobotIdClient
+
+from . import helpers
 
 
 def method_wrapper(func):
@@ -91,3 +113,276 @@ def test_base_client():
     response = client.call_async(client._stub.rpc_method, None,
                                  value_from_response=value_from_response, **kwargs)
     assert isinstance(response.result(), Response)
+
+
+class MockRobotIdServicer(robot_id_service_pb2_grpc.RobotIdServiceServicer):
+
+    def GetRobotId(self, request, context):
+        response = robot_id_pb2.RobotIdResponse()
+        helpers.add_common_header(response, request)
+        response.robot_id.serial_number = 'B12313'
+        return response
+
+
+class MockGraphNavServicer(graph_nav_service_pb2_grpc.GraphNavServiceServicer):
+
+    def __init__(self, waypoint_snapshot):
+        super(MockGraphNavServicer, self).__init__()
+        self._serialized = waypoint_snapshot.SerializeToString()
+
+    def DownloadWaypointSnapshot(self, request, context):
+        for start in range(0, len(self._serialized), 10):
+            response = graph_nav_pb2.DownloadWaypointSnapshotResponse(
+                status=graph_nav_pb2.DownloadWaypointSnapshotResponse.STATUS_OK)
+            helpers.add_common_header(response, request)
+            response.chunk.total_size = len(self._serialized)
+            response.chunk.data = self._serialized[start:start + 10]
+            yield response
+
+
+class MockAutowalkServicer(autowalk_service_pb2_grpc.AutowalkServiceServicer):
+
+    def CompileAutowalk(self, request_iterator, context):
+        data = b''.join(chunk.data for chunk in request_iterator)
+        request = autowalk_pb2.CompileAutowalkRequest()
+        request.ParseFromString(data)
+        response = autowalk_pb2.CompileAutowalkResponse(
+            status=autowalk_pb2.CompileAutowalkResponse.STATUS_OK)
+        helpers.add_common_header(response, request)
+        response.root.name = request.walk.mission_name
+        for chunk in BaseClient.chunk_message(response, 8):
+            yield chunk
+
+
+def _setup_aio(client, service, service_adder):
+    """Start the service, and point both the channel and aio channel of the client to it."""
+    server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=10))
+    service_adder(service, server)
+    port = server.add_insecure_port('localhost:0')
+    server.start()
+    client.channel = grpc.insecure_channel('localhost:{}'.format(port))
+    client.aio_channel_factory = lambda: grpc.aio.insecure_channel('localhost:{}'.format(port))
+    return server
+
+
+def test_unary_aio():
+    client = RobotIdClient()
+    server = _setup_aio(client, MockRobotIdServicer(),
+                        robot_id_service_pb2_grpc.add_RobotIdServiceServicer_to_server)
+
+    async def _run():
+        robot_ids = await asyncio.gather(*[client.get_id_aio() for _ in range(20)])
+        await client.aio_channel.close()
+        return robot_ids
+
+    robot_ids = asyncio.run(_run())
+    assert [robot_id.serial_number for robot_id in robot_ids] == ['B12313'] * 20
+    server.stop(None)
+
+
+def test_unary_stream_aio():
+    client = GraphNavClient()
+    waypoint_snapshot = map_pb2.WaypointSnapshot(id='snapshot', robot_id=robot_id_pb2.RobotId(
+        serial_number='B12313'))
+    server = _setup_aio(client, MockGraphNavServicer(waypoint_snapshot),
+                        graph_nav_service_pb2_grpc.add_GraphNavServiceServicer_to_server)
+
+    async def _run():
+        downloaded = await client.download_waypoint_snapshot_aio('snapshot')
+        responses = [
+            response async for response in client.call_aio_stream(
+                client.aio_stub.DownloadWaypointSnapshot,
+                graph_nav_pb2.DownloadWaypointSnapshotRequest(waypoint_snapshot_id='snapshot'))
+        ]
+        await client.aio_channel.close()
+        return downloaded, responses
+
+    downloaded, responses = asyncio.run(_run())
+    assert downloaded == waypoint_snapshot
+    assert len(responses) == math.ceil(waypoint_snapshot.ByteSize() / 10)
+    server.stop(None)
+
+
+def test_stream_stream_aio():
+    client = AutowalkClient()
+    server = _setup_aio(client, MockAutowalkServicer(),
+                        autowalk_service_pb2_grpc.add_AutowalkServiceServicer_to_server)
+    walk = walks_pb2.Walk(mission_name='aio mission')
+
+    async def _run():
+        response = await client.compile_autowalk_aio(walk, data_chunk_byte_size=4)
+        await client.aio_channel.close()
+        return response
+
+    response = asyncio.run(_run())
+    assert response.root.name == 'aio mission'
+    server.stop(None)
+
+
+def test_aio_channel_unset():
+    client = RobotIdClient()
+    client.channel = grpc.insecure_channel('localhost:0')
+    with pytest.raises(Error):
+        asyncio.run(client.get_id_aio())
+
+
+class RecordingRobotIdServicer(MockRobotIdServicer):
+
+    def __init__(self):
+        super(RecordingRobotIdServicer, self).__init__()
+        self.requests = []
+
+    def GetRobotId(self, request, context):
+        self.requests.append(request)
+        return super(RecordingRobotIdServicer, self).GetRobotId(request, context)
+
+
+@pytest.mark.parametrize('policy', [REQUEST_COPY_DEEP, REQUEST_COPY_PROCESSED_FIELDS])
+def test_request_copy_policy(policy):
+    client = RobotIdClient()
+    service = RecordingRobotIdServicer()
+    server = _setup_aio(client, service,
+                        robot_id_service_pb2_grpc.add_RobotIdServiceServicer_to_server)
+    client.request_processors.append(AddRequestHeader(lambda: 'test-client'))
+    client.request_copy_policy = policy
+
+    request = robot_id_pb2.RobotIdRequest()
+    request.header.disable_rpc_logging = True
+    client.call(client._stub.GetRobotId, request)
+    client.call_async(client._stub.GetRobotId, request).result()
+
+    async def _run():
+        await client.get_id_aio()
+        await client.call_aio(client.aio_stub.GetRobotId, request)
+        await client.aio_channel.close()
+
+    asyncio.run(_run())
+
+    # The processors changed the requests sent, but not the request passed in.
+    assert request.header.client_name == ''
+    assert request.header.disable_rpc_logging
+    assert [sent.header.client_name for sent in service.requests] == ['test-client'] * 4
+    assert not any(sent.header.disable_rpc_logging for sent in service.requests)
+
+    # With copy_request=False, the request passed in is modified.
+    client.call(client._stub.GetRobotId, request, copy_request=False)
+    assert request.header.client_name == 'test-client'
+    server.stop(None)
+
+
+def test_processed_fields_restored():
+    request = lease_pb2.RetainLeaseRequest()
+    request.header.client_name = 'original'
+    saved_fields = _save_processed_fields(request)
+    assert [name for name, _saved in saved_fields] == ['header', 'lease']
+    request.header.client_name = 'processed'
+    request.lease.resource = 'body'
+    _restore_processed_fields(request, saved_fields)
+    assert request == lease_pb2.RetainLeaseRequest(header=header_pb2.RequestHeader(
+        client_name='original'))
+
+
+def test_debug_log_formatting(caplog):
+    client = RobotIdClient()
+    server = _setup_aio(client, MockRobotIdServicer(),
+                        robot_id_service_pb2_grpc.add_RobotIdServiceServicer_to_server)
+    formatted = []
+
+    def _trim_for_log(message):
+        formatted.append(message)
+        return 'x' * 100
+
+    client.request_trim_for_log = _trim_for_log
+    client.response_trim_for_log = _trim_for_log
+
+    # Messages are not formatted unless they are logged.
+    caplog.set_level(logging.INFO, logger=client.logger.name)
+    client.get_id()
+    assert formatted == []
+
+    caplog.set_level(logging.DEBUG, logger=client.logger.name)
+    client.log_max_chars = 50
+    client.log_max_chars_by_method = {'GetRobotId': 10}
+    client.get_id()
+    assert len(formatted) == 2
+    assert 'x' * 10 + '... (90 more characters)' in caplog.text
+    assert 'x' * 11 not in caplog.text
+    server.stop(None)
+
+
+def test_log_message():
+    assert str(_LogMessage(str, 'abcdef')) == 'abcdef'
+    assert str(_LogMessage(str, 'abcdef', max_chars=6)) == 'abcdef'
+    assert str(_LogMessage(str, 'abcdef', max_chars=2)) == 'ab... (4 more characters)\n'
+
+    request = data_buffer_pb2.RecordDataBlobsRequest()
+    request.blob_data.add(channel='blobs', data=b'\0' * 1000)
+    stripped = _strip_for_log(request)
+    assert stripped.blob_data[0].channel == 'blobs'
+    assert not stripped.blob_data[0].data
+    assert len(request.blob_data[0].data) == 1000
+    response = robot_id_pb2.RobotIdResponse()
+    assert _strip_for_log(response) is response
+
+
+class SlowRobotIdServicer(MockRobotIdServicer):
+
+    def __init__(self, delay_sec):
+        super(SlowRobotIdServicer, self).__init__()
+        self.delay_sec = delay_sec
+        self.num_calls = 0
+
+    def GetRobotId(self, request, context):
+        self.num_calls += 1
+        time.sleep(self.delay_sec)
+        return super(SlowRobotIdServicer, self).GetRobotId(request, context)
+
+
+def test_coalesced_rpcs():
+    client = RobotIdClient()
+    service = SlowRobotIdServicer(0.2)
+    server = helpers.setup_client_and_service(
+        client, service, robot_id_service_pb2_grpc.add_RobotIdServiceServicer_to_server)
+
+    # Without coalescing, each call makes an rpc.
+    client.get_id_async()
+    client.get_id_async().result()
+    assert service.num_calls == 2
+
+    client.coalesce_read_only_rpcs()
+    assert client.coalesced_rpcs == {'GetRobotId': 0.0}
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(client.get_id())) for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    futures = [client.get_id_async() for _ in range(4)]
+    results.extend(future.result() for future in futures)
+    for thread in threads:
+        thread.join()
+    assert service.num_calls == 3
+    assert [result.serial_number for result in results] == ['B12313'] * 8
+
+    # Responses are not reused after they are received, unless they have a time to live.
+    client.get_id()
+    assert service.num_calls == 4
+    client.coalesce_read_only_rpcs(ttl_sec=10)
+    client.get_id()
+    client.get_id()
+    assert service.num_calls == 5
+    server.stop(None)
+
+
+def test_coalesced_rpcs_errors():
+    client = RobotIdClient()
+    client.coalesce_read_only_rpcs(ttl_sec=10)
+    server = helpers.setup_client_and_service(
+        client, MockRobotIdServicer(),
+        robot_id_service_pb2_grpc.add_RobotIdServiceServicer_to_server)
+    server.stop(None)
+    # Failed rpcs are not reused.
+    for _ in range(2):
+        with pytest.raises(Error):
+            client.get_id(timeout=1)
+    assert client._locked_coalesced_calls == {}
@@ -7,11 +7,14 @@
 """Unit tests for frame helpers"""
 
 import math
+import random
 
 import google.protobuf.text_format
+from google.protobuf import timestamp_pb2
 import pytest
 
 import bosdyn.api.geometry_pb2 as geom_protos
+from bosdyn.api import robot_state_pb2
 from bosdyn.client import frame_helpers, math_helpers
 
 
@@ -466,6 +469,148 @@ def test_frame_tree_math_big_tree():
     assert _do_poses_match(0, 0, 0, frame_helpers.get_a_tform_b(frame_tree, 'eta', 'eta'))
 
 
+
+def _random_snapshot(num_frames, seed=0):
+    """Create a random tree of frames 'f0' to 'f<num_frames-1>', rooted at 'f0'."""
+    rng = random.Random(seed)
+    snapshot = geom_protos.FrameTreeSnapshot()
+    snapshot.child_to_parent_edge_map['f0'].parent_frame_name = ''
+    for index in range(1, num_frames):
+        rot = math_helpers.Quat(*[rng.uniform(-1, 1) for _ in range(4)]).normalize()
+        pose = math_helpers.SE3Pose(rng.uniform(-5, 5), rng.uniform(-5, 5), rng.uniform(-5, 5),
+                                    rot)
+        edge = snapshot.child_to_parent_edge_map['f{}'.format(index)]
+        edge.parent_frame_name = 'f{}'.format(rng.randrange(index))
+        edge.parent_tform_child.CopyFrom(pose.to_proto())
+    return snapshot
+
+
+def test_frame_tree():
+    snapshot = _random_snapshot(15)
+    tree = frame_helpers.FrameTree(snapshot)
+    assert sorted(tree.frame_names) == sorted(frame_helpers.get_frame_names(snapshot))
+    assert tree.get_root_frame_name('f7') == 'f0'
+    for frame_a in tree.frame_names:
+        for frame_b in tree.frame_names:
+            expected = frame_helpers.get_a_tform_b(snapshot, frame_a, frame_b)
+            a_tform_b = tree.get_a_tform_b(frame_a, frame_b)
+            assert list(a_tform_b)[0:3] == pytest.approx(list(expected)[0:3])
+            assert a_tform_b.to_matrix() == pytest.approx(expected.to_matrix())
+            ancestor = tree.get_lowest_common_ancestor(frame_a, frame_b)
+            assert ancestor in tree
+            # The ancestor is on the path to the root of both frames.
+            for frame in (frame_a, frame_b):
+                while frame != ancestor:
+                    frame = snapshot.child_to_parent_edge_map[frame].parent_frame_name
+                    assert frame
+    # Lookups are memoized, but callers get their own copies to modify.
+    pose = tree.get_a_tform_b('f3', 'f9')
+    expected = list(pose)
+    assert tree.get_a_tform_b('f3', 'f9') is not pose
+    for modified in (pose, tree.get_a_tform_b('f3', 'f3'), tree.get_root_tform_frame('f3')):
+        modified.x += 1
+        modified.rot.w += 1
+    assert list(tree.get_a_tform_b('f3', 'f9')) == expected
+    assert _do_poses_match(0, 0, 0, tree.get_a_tform_b('f3', 'f3'))
+    assert tree.get_a_tform_b('f3', 'f3').rot.w == 1
+    assert tree.get_a_tform_b('f3', 'unknown') is None
+    assert tree.get_se2_a_tform_b('f3', 'f9') is None
+    assert tree.get_lowest_common_ancestor('f3', 'unknown') is None
+
+
+def test_frame_tree_invalid():
+    snapshot_text = """child_to_parent_edge_map {
+      key: "beta"
+      value: {
+        parent_frame_name: "alpha"
+      }
+    }
+    child_to_parent_edge_map {
+      key: "gamma"
+      value: {
+        parent_frame_name: "delta"
+      }
+    }
+    child_to_parent_edge_map {
+      key: "delta"
+      value: {
+        parent_frame_name: ""
+      }
+    }
+    child_to_parent_edge_map {
+      key: "alpha"
+      value: {
+        parent_frame_name: ""
+      }
+    }"""
+    snapshot = _create_snapshot(snapshot_text)
+    with pytest.raises(frame_helpers.ValidateFrameTreeDisjointError):
+        frame_helpers.FrameTree(snapshot)
+    tree = frame_helpers.FrameTree(snapshot, validate=False)
+    assert tree.get_a_tform_b('beta', 'gamma') is None
+    assert _do_poses_match(0, 0, 0, tree.get_a_tform_b('beta', 'alpha'))
+
+    snapshot.child_to_parent_edge_map['delta'].parent_frame_name = 'gamma'
+    with pytest.raises(frame_helpers.ValidateFrameTreeCycleError):
+        frame_helpers.FrameTree(snapshot, validate=False)
+    snapshot.child_to_parent_edge_map['delta'].parent_frame_name = 'epsilon'
+    with pytest.raises(frame_helpers.ValidateFrameTreeUnknownFrameError):
+        frame_helpers.FrameTree(snapshot, validate=False)
+
+
+def _odom_tform_body_snapshot(x, yaw):
+    snapshot = geom_protos.FrameTreeSnapshot()
+    snapshot.child_to_parent_edge_map['body'].parent_frame_name = ''
+    edge = snapshot.child_to_parent_edge_map['odom']
+    edge.parent_frame_name = 'body'
+    pose = math_helpers.SE3Pose(x, 0, 0, math_helpers.Quat.from_yaw(yaw))
+    edge.parent_tform_child.CopyFrom(pose.inverse().to_proto())
+    return snapshot
+
+
+def test_frame_tree_buffer():
+    buffer = frame_helpers.FrameTreeBuffer(max_snapshots=5)
+    assert buffer.get_a_tform_b('odom', 'body', 10.0) is None
+    # Add out of order.
+    for t in (12, 10, 11):
+        buffer.add(_odom_tform_body_snapshot(x=t - 10, yaw=(t - 10) * 0.1), float(t))
+    assert len(buffer) == 3
+
+    pose = buffer.get_a_tform_b('odom', 'body', 11.0)
+    assert (pose.x, pose.y, pose.z) == pytest.approx((1, 0, 0))
+    pose.x = 5
+    assert buffer.get_a_tform_b('odom', 'body', 11.0).x == pytest.approx(1)
+    assert pose.rot.to_yaw() == pytest.approx(0.1)
+    pose = buffer.get_a_tform_b('odom', 'body', 11.25)
+    assert (pose.x, pose.y, pose.z) == pytest.approx((1.25, 0, 0))
+    assert pose.rot.to_yaw() == pytest.approx(0.125)
+    assert buffer.get_a_tform_b('odom', 'unknown', 11.25) is None
+
+    # Times outside of the buffer.
+    assert buffer.get_a_tform_b('odom', 'body', 12.5) is None
+    pose = buffer.get_a_tform_b('odom', 'body', 12.5, max_extrapolation_sec=1)
+    assert pose.x == pytest.approx(2)
+    assert buffer.get_frame_tree(9.5) is None
+    assert buffer.get_frame_tree(9.5, max_time_diff_sec=1) is buffer.get_frame_tree(10)
+
+    # Timestamps and robot state.
+    robot_state = robot_state_pb2.RobotState()
+    robot_state.kinematic_state.transforms_snapshot.CopyFrom(_odom_tform_body_snapshot(3, 0.3))
+    robot_state.kinematic_state.acquisition_timestamp.FromNanoseconds(13 * 10**9)
+    buffer.add_robot_state(robot_state)
+    timestamp = timestamp_pb2.Timestamp()
+    timestamp.FromNanoseconds(12500000000)
+    assert buffer.get_a_tform_b('odom', 'body', timestamp).x == pytest.approx(2.5)
+
+    # Eviction.
+    for t in (14, 15, 16):
+        buffer.add(_odom_tform_body_snapshot(t - 10, 0), float(t))
+    assert len(buffer) == 5
+    assert buffer.time_range_nsec == (12 * 10**9, 16 * 10**9)
+    buffer.max_age_sec = 1.5
+    buffer.add(_odom_tform_body_snapshot(7, 0), 17.0)
+    assert buffer.time_range_nsec == (16 * 10**9, 17 * 10**9)
+
 def test_get_a_tform_b_se2():
     snapshot_text = """
     child_to_parent_edge_map {
@@ -9,11 +9,13 @@ import logging
 import time
 
 import grpc
+import numpy
 import pytest
 
 import bosdyn.api.image_pb2 as image_protos
 import bosdyn.api.image_service_pb2_grpc as image_service
 import bosdyn.client.image
+from bosdyn.client import math_helpers
 from bosdyn.client.exceptions import TimedOutError
 
 from . import helpers
@@ -193,3 +195,101 @@ def test_get_image_source_data_error():
                                      image_responses=[image_response])
     with pytest.raises(bosdyn.client.image.ImageDataError):
         res = client.get_image_from_sources(image_sources=['foo'])
+
+
+def _depth_image_response(rows=6, cols=8, depth_scale=1000.0, fx=10.0, fy=12.0, cx=3.5, cy=2.5,
+                          seed=0):
+    rng = numpy.random.default_rng(seed)
+    depth = rng.integers(0, 4000, size=(rows, cols), dtype=numpy.uint16)
+    depth[0, 0] = 0
+    depth[1, 1] = numpy.iinfo(numpy.uint16).max
+    response = image_protos.ImageResponse()
+    response.source.image_type = image_protos.ImageSource.IMAGE_TYPE_DEPTH
+    response.source.rows = rows
+    response.source.cols = cols
+    response.source.depth_scale = depth_scale
+    response.source.pinhole.intrinsics.focal_length.x = fx
+    response.source.pinhole.intrinsics.focal_length.y = fy
+    response.source.pinhole.intrinsics.principal_point.x = cx
+    response.source.pinhole.intrinsics.principal_point.y = cy
+    response.shot.image.pixel_format = image_protos.Image.PIXEL_FORMAT_DEPTH_U16
+    response.shot.image.rows = rows
+    response.shot.image.cols = cols
+    response.shot.image.data = depth.tobytes()
+    response.shot.frame_name_image_sensor = 'sensor'
+    return response, depth
+
+
+def _reference_pointcloud(response, depth, min_dist=0, max_dist=1000):
+    """The point cloud computed pixel by pixel with pixel_to_camera_space."""
+    scale = response.source.depth_scale
+    points = []
+    for row in range(depth.shape[0]):
+        for col in range(depth.shape[1]):
+            value = int(depth[row, col])
+            if 0 < value < numpy.iinfo(numpy.uint16).max and min_dist <= value / scale <= max_dist:
+                points.append(
+                    bosdyn.client.image.pixel_to_camera_space(response, col, row, value / scale))
+    return numpy.array(points).reshape(-1, 3)
+
+
+def test_depth_image_to_pointcloud():
+    response, depth = _depth_image_response()
+    expected = _reference_pointcloud(response, depth)
+    cloud = bosdyn.client.image.depth_image_to_pointcloud(response)
+    assert cloud == pytest.approx(expected)
+    assert bosdyn.client.image.depth_image_to_pointcloud(response, 1.0, 3.0) == pytest.approx(
+        _reference_pointcloud(response, depth, 1.0, 3.0))
+    # The projector is reused for the same camera.
+    assert (bosdyn.client.image.get_depth_projector(response) is
+            bosdyn.client.image.get_depth_projector(response))
+
+    response.source.ClearField('pinhole')
+    with pytest.raises(ValueError):
+        bosdyn.client.image.depth_image_to_pointcloud(response)
+
+
+def test_depth_projector():
+    response, depth = _depth_image_response()
+    projector = bosdyn.client.image.DepthProjector.from_image_response(response, stride=2)
+    strided = response.__deepcopy__()
+    strided.source.rows = strided.shot.image.rows = 3
+    strided.source.cols = strided.shot.image.cols = 4
+    strided.source.pinhole.intrinsics.focal_length.x = 5.0
+    strided.source.pinhole.intrinsics.focal_length.y = 6.0
+    strided.source.pinhole.intrinsics.principal_point.x = 1.75
+    strided.source.pinhole.intrinsics.principal_point.y = 1.25
+    expected = _reference_pointcloud(strided, depth[::2, ::2])
+    assert projector.project(response) == pytest.approx(expected)
+    assert projector.project(depth) == pytest.approx(expected)
+
+    # Output buffers, and transforms out of the sensor frame.
+    out = numpy.zeros((projector.max_points, 3))
+    pose = math_helpers.SE3Pose(1, 2, 3, math_helpers.Quat.from_yaw(0.5))
+    cloud = projector.project(depth, transform=pose, out=out)
+    assert numpy.shares_memory(cloud, out)
+    assert cloud == pytest.approx(pose.transform_cloud(expected))
+    with pytest.raises(ValueError):
+        projector.project(depth, out=numpy.zeros((2, 3)))
+    with pytest.raises(ValueError):
+        projector.project(depth[1:])
+
+
+def test_depth_images_to_pointcloud():
+    responses = []
+    expected = []
+    for index, x in enumerate((1.0, -1.0)):
+        response, depth = _depth_image_response(seed=index)
+        edge = response.shot.transforms_snapshot.child_to_parent_edge_map['sensor']
+        edge.parent_frame_name = 'body'
+        edge.parent_tform_child.position.x = x
+        edge.parent_tform_child.rotation.w = 1
+        response.shot.transforms_snapshot.child_to_parent_edge_map['body'].parent_frame_name = ''
+        responses.append(response)
+        expected.append(_reference_pointcloud(response, depth) + (x, 0, 0))
+    cloud = bosdyn.client.image.depth_images_to_pointcloud(responses, frame_name='body')
+    assert cloud == pytest.approx(numpy.vstack(expected))
+    with pytest.raises(ValueError):
+        bosdyn.client.image.depth_images_to_pointcloud(responses)
+    with pytest.raises(ValueError):
+        bosdyn.client.image.depth_images_to_pointcloud(responses, frame_name='odom')
@@ -964,3 +964,105 @@ def test_se3_vec3_mult_exceptions():
         " " * vec
     with pytest.raises(TypeError):
         se3 * ""
+
+
+def _random_se3_poses(num, seed=0):
+    rng = random.Random(seed)
+    poses = []
+    for _ in range(num):
+        rot = Quat(*[rng.uniform(-1, 1) for _ in range(4)]).normalize()
+        poses.append(SE3Pose(rng.uniform(-5, 5), rng.uniform(-5, 5), rng.uniform(-5, 5), rot))
+    return poses
+
+
+def _assert_se3_arrays_close(array, poses):
+    assert len(array) == len(poses)
+    for pose, expected in zip(array, poses):
+        # q and -q are the same rotation.
+        sign = 1.0 if pose.rot.w * expected.rot.w + pose.rot.z * expected.rot.z >= 0 else -1.0
+        assert list(pose)[0:3] == pytest.approx(list(expected)[0:3])
+        assert [sign * v for v in list(pose)[3:]] == pytest.approx(list(expected)[3:])
+
+
+def test_se3_pose_array():
+    a_poses = _random_se3_poses(20, seed=1)
+    b_poses = _random_se3_poses(20, seed=2)
+    a = SE3PoseArray.from_poses(a_poses)
+    b = SE3PoseArray.from_proto([pose.to_proto() for pose in b_poses])
+    assert a.data.shape == (20, 7)
+    _assert_se3_arrays_close(b, b_poses)
+    _assert_se3_arrays_close(SE3PoseArray.from_proto(b.to_proto()), b_poses)
+    identity = SE3PoseArray.from_proto([geometry_pb2.SE3Pose()])
+    _assert_se3_arrays_close(identity, [SE3Pose.from_identity()])
+
+    _assert_se3_arrays_close(a * b, [pa * pb for pa, pb in zip(a_poses, b_poses)])
+    _assert_se3_arrays_close(a.inverse(), [pose.inverse() for pose in a_poses])
+    _assert_se3_arrays_close(a * a.inverse(), [SE3Pose.from_identity()] * 20)
+    # Scalar poses broadcast against arrays.
+    _assert_se3_arrays_close(a * b_poses[0], [pose * b_poses[0] for pose in a_poses])
+    _assert_se3_arrays_close(b_poses[0] * a, [b_poses[0] * pose for pose in a_poses])
+    _assert_se3_arrays_close(a[2:4], a_poses[2:4])
+
+    points = numpy.array([[1.0, 2.0, 3.0]] * 20)
+    expected = [pose.transform_point(1.0, 2.0, 3.0) for pose in a_poses]
+    assert a.transform_points(points) == pytest.approx(numpy.array(expected))
+    assert a.transform_points((1.0, 2.0, 3.0)) == pytest.approx(numpy.array(expected))
+
+    matrices = a.to_matrix()
+    assert matrices.shape == (20, 4, 4)
+    assert matrices[5] == pytest.approx(a_poses[5].to_matrix())
+    _assert_se3_arrays_close(SE3PoseArray.from_matrix(matrices), a_poses)
+    # Matrices which need each of the branches of the quaternion conversion.
+    rotations = [Quat(), Quat(0, 1, 0, 0), Quat(0, 0, 1, 0), Quat(0, 0, 0, 1)]
+    quats = QuatArray.from_matrix(QuatArray.from_quats(rotations).to_matrix())
+    for quat, expected in zip(quats, rotations):
+        assert quat.to_matrix() == pytest.approx(expected.to_matrix())
+
+    with pytest.raises(TypeError):
+        a * 'spam'
+
+
+def test_se3_pose_array_interp():
+    a_poses = _random_se3_poses(10, seed=3)
+    b_poses = _random_se3_poses(10, seed=4)
+    # Include poses too close together for slerp.
+    b_poses[0] = a_poses[0]
+    fractions = numpy.linspace(0, 1, 10)
+    result = SE3PoseArray.interp(SE3PoseArray.from_poses(a_poses),
+                                 SE3PoseArray.from_poses(b_poses), fractions)
+    _assert_se3_arrays_close(
+        result, [SE3Pose.interp(a, b, f) for a, b, f in zip(a_poses, b_poses, fractions)])
+    result = SE3PoseArray.interp(a_poses[0], SE3PoseArray.from_poses(b_poses), 0.25)
+    _assert_se3_arrays_close(result, [SE3Pose.interp(a_poses[0], b, 0.25) for b in b_poses])
+
+
+def test_se2_pose_array():
+    rng = random.Random(5)
+    a_poses, b_poses = [[
+        SE2Pose(rng.uniform(-5, 5), rng.uniform(-5, 5), rng.uniform(-3, 3)) for _ in range(20)
+    ] for _ in range(2)]
+    a = SE2PoseArray.from_poses(a_poses)
+    b = SE2PoseArray.from_proto([pose.to_proto() for pose in b_poses])
+
+    def _assert_close(array, poses):
+        assert len(array) == len(poses)
+        for pose, expected in zip(array, poses):
+            assert (pose.x, pose.y) == pytest.approx((expected.x, expected.y))
+            assert angle_diff(pose.angle, expected.angle) == pytest.approx(0)
+
+    _assert_close(a * b, [pa * pb for pa, pb in zip(a_poses, b_poses)])
+    _assert_close(a_poses[0] * b, [a_poses[0] * pb for pb in b_poses])
+    _assert_close(a.inverse(), [pose.inverse() for pose in a_poses])
+    _assert_close(SE2PoseArray.from_matrix(a.to_matrix()), a_poses)
+    assert a.to_matrix()[3] == pytest.approx(a_poses[3].to_matrix())
+    assert a.transform_points((1.0, 2.0)) == pytest.approx(
+        numpy.array([[(pose * Vec2(1.0, 2.0)).x, (pose * Vec2(1.0, 2.0)).y] for pose in a_poses]))
+
+    se3_poses = _random_se3_poses(20, seed=6)
+    _assert_close(SE2PoseArray.flatten(SE3PoseArray.from_poses(se3_poses)),
+                  [SE2Pose.flatten(pose) for pose in se3_poses])
+    _assert_se3_arrays_close(a.get_closest_se3_transform(height_z=1.0),
+                             [pose.get_closest_se3_transform(height_z=1.0) for pose in a_poses])
+
+    half = SE2PoseArray.interp(SE2Pose(0, 0, 3.0), SE2Pose(2, 0, -3.0), 0.5)
+    _assert_close(half, [SE2Pose(1, 0, math.pi)])
@@ -0,0 +1,100 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for the point cloud encodings."""
+import struct
+
+import numpy
+import pytest
+
+from bosdyn.api import point_cloud_pb2
+from bosdyn.client.point_cloud import decode_point_cloud, encode_point_cloud
+
+PointCloud = point_cloud_pb2.PointCloud
+
+
+def _random_points(num_points, bound=10.0, seed=0):
+    rng = numpy.random.default_rng(seed)
+    return rng.uniform(-bound, bound, (num_points, 3)).astype(numpy.float32)
+
+
+def test_xyz_32f():
+    points = _random_points(100)
+    point_cloud = encode_point_cloud(points)
+    assert point_cloud.num_points == 100
+    assert point_cloud.encoding_parameters.bytes_per_point == 12
+    assert point_cloud.data == struct.pack('<300f', *points.ravel())
+    decoded = decode_point_cloud(point_cloud)
+    assert decoded.dtype == numpy.float32
+    assert numpy.array_equal(decoded, points)
+
+
+def _naive_decode_sc(point_cloud):
+    """Decode one point at a time, as in point_cloud.proto."""
+    params = point_cloud.encoding_parameters
+    f = params.scale_factor
+    extra_format = '<B' if point_cloud.encoding == PointCloud.ENCODING_XYZ_4SC else '<H'
+    points = []
+    for index in range(point_cloud.num_points):
+        offset = index * params.bytes_per_point
+        p1 = struct.unpack_from('<3b', point_cloud.data, offset)
+        (x,) = struct.unpack_from(extra_format, point_cloud.data, offset + 3)
+        p2 = [x % f - f / 2.0, (x // f) % f - f / 2.0, (x // (f * f)) % f - f / 2.0]
+        points.append([(p1[i] * f + p2[i]) / (params.remapping_constant * f) * m
+                       for i, m in enumerate((params.max_x, params.max_y, params.max_z))])
+    return numpy.array(points)
+
+
+@pytest.mark.parametrize('encoding, bytes_per_point', [(PointCloud.ENCODING_XYZ_4SC, 4),
+                                                       (PointCloud.ENCODING_XYZ_5SC, 5)])
+@pytest.mark.parametrize('scale_factor', [None, 1, 5])
+def test_xyz_sc(encoding, bytes_per_point, scale_factor):
+    points = _random_points(1000)
+    points[0] = (10, -10, 10)
+    point_cloud = encode_point_cloud(points, encoding, max_bounds=(10, 10, 10),
+                                     scale_factor=scale_factor)
+    params = point_cloud.encoding_parameters
+    assert params.bytes_per_point == bytes_per_point
+    assert len(point_cloud.data) == 1000 * bytes_per_point
+    assert params.remapping_constant == 127
+
+    decoded = decode_point_cloud(point_cloud)
+    assert decoded.dtype == numpy.float32
+    assert decoded == pytest.approx(_naive_decode_sc(point_cloud), abs=1e-5)
+    # Points are rounded to the nearest encodable value.
+    resolution = 10.0 / (127 * params.scale_factor)
+    assert numpy.max(numpy.abs(decoded - points)) <= 0.5 * resolution + 1e-5
+
+
+def test_encoding_errors():
+    points = _random_points(10)
+    with pytest.raises(ValueError):
+        encode_point_cloud(points, PointCloud.ENCODING_UNKNOWN)
+    with pytest.raises(ValueError):
+        encode_point_cloud(points, PointCloud.ENCODING_XYZ_4SC, scale_factor=7)
+    with pytest.raises(ValueError):
+        encode_point_cloud(points, PointCloud.ENCODING_XYZ_4SC, max_bounds=(1, 1, 1))
+    for remapping_constant in (0, -1, 200):
+        with pytest.raises(ValueError):
+            encode_point_cloud(points, PointCloud.ENCODING_XYZ_4SC,
+                               remapping_constant=remapping_constant)
+    point_cloud = encode_point_cloud(points, PointCloud.ENCODING_XYZ_4SC, max_bounds=(10, 10, 10),
+                                     remapping_constant=100)
+    assert decode_point_cloud(point_cloud) == pytest.approx(points, abs=10.0 / (100 * 6))
+    # The default bounds fit the points.
+    point_cloud = encode_point_cloud(points, PointCloud.ENCODING_XYZ_5SC)
+    assert decode_point_cloud(point_cloud) == pytest.approx(points, abs=0.01)
+
+    for remapping_constant in (0, -1):
+        point_cloud.encoding_parameters.remapping_constant = remapping_constant
+        with pytest.raises(ValueError):
+            decode_point_cloud(point_cloud)
+    point_cloud.encoding_parameters.remapping_constant = 127
+    point_cloud.num_points += 1
+    with pytest.raises(ValueError):
+        decode_point_cloud(point_cloud)
+    with pytest.raises(ValueError):
+        decode_point_cloud(PointCloud(encoding=PointCloud.ENCODING_UNKNOWN))
@@ -0,0 +1,154 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for the robot_state client and cache."""
+import asyncio
+import concurrent.futures
+import threading
+import time
+from unittest import mock
+
+import grpc
+import pytest
+
+import bosdyn.api.robot_state_pb2 as robot_state_protos
+import bosdyn.api.robot_state_service_pb2_grpc as robot_state_service
+import bosdyn.client
+from bosdyn.client.robot_state import RobotStateCache, RobotStateClient
+
+from . import helpers
+
+
+class MockRobotStateServicer(robot_state_service.RobotStateServiceServicer):
+
+    def __init__(self):
+        super(MockRobotStateServicer, self).__init__()
+        self.num_calls = 0
+
+    def GetRobotState(self, request, context):
+        self.num_calls += 1
+        response = robot_state_protos.RobotStateResponse()
+        helpers.add_common_header(response, request)
+        # The battery drains every other query.
+        charge = 100 - self.num_calls // 2
+        response.robot_state.power_state.locomotion_charge_percentage.value = charge
+        response.robot_state.kinematic_state.acquisition_timestamp.seconds = self.num_calls
+        return response
+
+
+def _setup():
+    client = RobotStateClient()
+    service = MockRobotStateServicer()
+    server = helpers.setup_client_and_service(
+        client, service, robot_state_service.add_RobotStateServiceServicer_to_server)
+    return client, service, server
+
+
+def test_robot_state_cache():
+    client, service, server = _setup()
+    cache = RobotStateCache(client, period_sec=0.01, history_len=5)
+    assert cache.robot_state is None
+
+    all_states = []
+    charge_changes = []
+    done = threading.Event()
+
+    def _on_state(state, previous):
+        all_states.append(state)
+        if len(all_states) >= 10:
+            done.set()
+
+    cache.subscribe(_on_state)
+    charge_id = cache.subscribe(
+        lambda state, previous: charge_changes.append(
+            (state.power_state.locomotion_charge_percentage.value,
+             previous and previous.power_state.locomotion_charge_percentage.value)),
+        fields=['power_state.locomotion_charge_percentage'])
+    cache.start()
+    assert cache.wait_for_state(timeout_sec=5) is not None
+    assert done.wait(timeout=5)
+    cache.unsubscribe(charge_id)
+    cache.stop()
+    # Let the last rpc complete.
+    time.sleep(0.1)
+    server.stop(None)
+
+    # One rpc per state, for all the subscribers.
+    assert service.num_calls == len(all_states)
+    history = cache.history()
+    assert len(history) == 5
+    assert history[-1] == cache.robot_state
+    timestamps = [state.kinematic_state.acquisition_timestamp.seconds for state in history]
+    assert timestamps == sorted(timestamps)
+
+    # The charge subscriber is only called when the charge changes.
+    assert charge_changes[0] == (100, None)
+    for charge, previous_charge in charge_changes[1:]:
+        assert charge == previous_charge - 1
+    assert len(charge_changes) < len(all_states)
+
+
+def test_robot_state_cache_update():
+    cache = RobotStateCache(robot_state_client=None)
+    changes = []
+    cache.subscribe(lambda state, previous: changes.append(state),
+                    fields=RobotStateCache.BEHAVIOR_FAULT_FIELDS)
+    state = robot_state_protos.RobotState()
+    cache.update(state)
+    cache.update(state)
+    faulted = robot_state_protos.RobotState()
+    faulted.behavior_fault_state.faults.add(behavior_fault_id=1)
+    cache.update(faulted)
+    assert changes == [state, faulted]
+    assert cache.history() == [state, state, faulted]
+
+
+def test_robot_state_cache_subscribe_fields():
+    cache = RobotStateCache(robot_state_client=None)
+    for fields in ([], ['power_state.battery'], 'power_state.bogus',
+                   ['battery_states.charge_percentage'], ['power_state.shore_power_state.value']):
+        with pytest.raises(ValueError):
+            cache.subscribe(lambda state, previous: None, fields=fields)
+
+    changes = []
+
+    def _bad_callback(state, previous):
+        raise RuntimeError('bad callback')
+
+    cache.subscribe(_bad_callback)
+    cache.subscribe(lambda state, previous: changes.append(state), fields='power_state')
+    state = robot_state_protos.RobotState()
+    charged = robot_state_protos.RobotState()
+    charged.power_state.locomotion_charge_percentage.value = 100
+    for robot_state in (state, state, charged):
+        cache.update(robot_state)
+    assert changes == [state, charged]
+
+
+def test_robot_state_aio_after_close():
+    server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=10))
+    robot_state_service.add_RobotStateServiceServicer_to_server(MockRobotStateServicer(), server)
+    port = server.add_insecure_port('localhost:0')
+    server.start()
+    sdk = bosdyn.client.create_standard_sdk('test-robot-state-aio')
+    robot = sdk.create_robot('localhost')
+    robot.authorities_by_name['robot-state'] = 'api.spot.robot'
+    client = robot.ensure_client('robot-state')
+
+    async def _get_charge():
+        robot_state = await client.get_robot_state_aio()
+        await robot.close_aio_channels()
+        return robot_state.power_state.locomotion_charge_percentage.value
+
+    def _insecure_aio_channel(address, _port, _creds, _authority, options=[]):
+        return grpc.aio.insecure_channel('{}:{}'.format(address, port), options)
+
+    with mock.patch('bosdyn.client.channel.create_secure_aio_channel', _insecure_aio_channel):
+        # Each event loop uses a new aio channel.
+        assert asyncio.run(_get_charge()) == 100
+        assert asyncio.run(_get_charge()) == 99
+        assert asyncio.run(_get_charge()) == 99
+    server.stop(None)
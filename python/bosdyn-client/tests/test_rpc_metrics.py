@@ -0,0 +1,137 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for the rpc_metrics module."""
+import time
+
+import pytest
+
+from bosdyn.api import header_pb2, robot_id_pb2, robot_id_service_pb2_grpc
+from bosdyn.client.common import REQUEST_COPY_PROCESSED_FIELDS
+from bosdyn.client.exceptions import InternalServerError, RpcError
+from bosdyn.client.processors import AddRequestHeader
+from bosdyn.client.robot_id import RobotIdClient
+from bosdyn.client.rpc_metrics import RpcMetrics, RpcStats
+from bosdyn.util import now_timestamp
+
+from . import helpers
+
+SERVER_SLEEP_SEC = 0.05
+
+
+class MockRobotIdServicer(robot_id_service_pb2_grpc.RobotIdServiceServicer):
+
+    def __init__(self, error_code=header_pb2.CommonError.CODE_OK):
+        super(MockRobotIdServicer, self).__init__()
+        self.error_code = error_code
+
+    def GetRobotId(self, request, context):
+        response = robot_id_pb2.RobotIdResponse()
+        helpers.add_common_header(response, request, error_code=self.error_code)
+        response.header.request_received_timestamp.CopyFrom(now_timestamp())
+        time.sleep(SERVER_SLEEP_SEC)
+        response.header.response_timestamp.CopyFrom(now_timestamp())
+        response.robot_id.serial_number = 'B12313'
+        return response
+
+
+def _setup(service):
+    client = RobotIdClient()
+    client.request_processors.append(AddRequestHeader(lambda: 'test-client'))
+    metrics = RpcMetrics()
+    metrics.add_processors(client)
+    server = helpers.setup_client_and_service(
+        client, service, robot_id_service_pb2_grpc.add_RobotIdServiceServicer_to_server)
+    return client, metrics, server
+
+
+def test_latency():
+    client, metrics, server = _setup(MockRobotIdServicer())
+    client.get_id()
+    client.get_id_async().result()
+    server.stop(None)
+
+    assert metrics.rpc_names() == ['RobotId']
+    stats = metrics.get_stats('RobotId')
+    assert stats.num_requests == 2
+    assert stats.num_responses == 2
+    assert stats.num_errors == 0
+    assert stats.num_in_flight == 0
+    assert stats.request_bytes > 0
+    assert stats.response_bytes > stats.request_bytes
+    assert stats.num_latencies == 2
+    assert sum(stats.latency_counts) == 2
+    assert stats.mean_latency_sec >= SERVER_SLEEP_SEC
+    assert stats.mean_server_sec >= SERVER_SLEEP_SEC
+    assert stats.mean_server_sec + stats.mean_network_sec == pytest.approx(
+        stats.mean_latency_sec)
+    assert SERVER_SLEEP_SEC <= stats.latency_percentile_sec(50) <= stats.max_latency_sec
+    assert 'RobotId' in metrics.format_summary()
+
+    metrics.reset()
+    assert metrics.rpc_names() == []
+
+
+def test_errors():
+    client, metrics, server = _setup(
+        MockRobotIdServicer(error_code=header_pb2.CommonError.CODE_INTERNAL_SERVER_ERROR))
+    with pytest.raises(InternalServerError):
+        client.get_id()
+    server.stop(None)
+    with pytest.raises(RpcError):
+        client.get_id(timeout=1)
+    future = client.get_id_async(timeout=1)
+    with pytest.raises(RpcError):
+        future.result()
+    # Wait for the done callbacks.
+    time.sleep(0.1)
+
+    stats = metrics.get_stats('RobotId')
+    assert stats.num_requests == 3
+    assert stats.num_responses == 1
+    assert stats.num_errors == 3
+    assert stats.num_in_flight == 0
+    assert stats.num_latencies == 1
+
+
+def test_async_error_processed_fields():
+    client, metrics, server = _setup(MockRobotIdServicer())
+    client.request_copy_policy = REQUEST_COPY_PROCESSED_FIELDS
+    server.stop(None)
+    request = robot_id_pb2.RobotIdRequest()
+    future = client.call_async(client._stub.GetRobotId, request, timeout=1)
+    with pytest.raises(RpcError):
+        future.result()
+    # Wait for the done callbacks.
+    time.sleep(0.1)
+
+    # The request passed in was restored, but the failed rpc is no longer in flight.
+    assert not request.HasField('header')
+    stats = metrics.get_stats('RobotId')
+    assert stats.num_requests == 1
+    assert stats.num_errors == 1
+    assert stats.num_in_flight == 0
+
+
+def test_in_flight():
+    metrics = RpcMetrics(max_in_flight_sec=0.01)
+    request = robot_id_pb2.RobotIdRequest()
+    AddRequestHeader(lambda: 'test-client').mutate(request)
+    metrics.request_processor.mutate(request)
+    assert metrics.get_stats('RobotId').num_in_flight == 1
+    time.sleep(0.02)
+    assert metrics.get_stats('RobotId').num_in_flight == 0
+
+
+def test_latency_percentile():
+    stats = RpcStats((0.01, 0.1))
+    assert stats.latency_percentile_sec(50) is None
+    for latency_sec in (0.005, 0.05, 0.06, 0.5):
+        stats._add_latency(latency_sec)
+    assert stats.latency_counts == [1, 2, 1]
+    assert stats.latency_percentile_sec(25) == 0.01
+    assert stats.latency_percentile_sec(50) == 0.1
+    assert stats.latency_percentile_sec(100) == 0.5
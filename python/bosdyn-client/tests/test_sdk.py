@@ -4,6 +4,8 @@
 # is subject to the terms and conditions of the Boston Dynamics Software
 # Development Kit License (20191101-BDSDK-SL).
 
+import asyncio
+import threading
 import unittest
 
 import pkg_resources
@@ -106,6 +108,68 @@ Spam, Spam, Spam, Spam!
         client = robot.ensure_client(service_name,
                                      channel=robot.ensure_secure_channel('the-knights-of-ni'))
 
+    def test_channel_policies(self):
+        sdk = self._create_sdk()
+        robot = self._create_robot(sdk, 'test-robot')
+        robot.channel_keepalive_time_ms = 10000
+        for service_name in ('mock', 'estop', 'image', 'other'):
+            robot.service_type_by_name[service_name] = ServiceClientMock.service_type
+            robot.authorities_by_name[service_name] = 'the-knights-of-ni'
+        robot.service_client_factories_by_type[ServiceClientMock.service_type] = ServiceClientMock
+        robot.set_channel_policy(bosdyn.client.robot.CHANNEL_POLICY_DEDICATED, ['estop'])
+        robot.set_channel_policy(bosdyn.client.robot.CHANNEL_POLICY_POOLED, ['image', 'other'])
+        with self.assertRaises(ValueError):
+            robot.set_channel_policy('spam', ['mock'])
+
+        shared = robot.ensure_channel('mock')
+        self.assertIs(shared, robot.ensure_secure_channel('the-knights-of-ni'))
+        dedicated = robot.ensure_client('estop').channel
+        self.assertIsNot(dedicated, shared)
+        self.assertIs(dedicated, robot.ensure_channel('estop'))
+        pooled = [robot.ensure_channel('image') for _ in range(3)]
+        pooled.append(robot.ensure_channel('other'))
+        self.assertEqual(pooled, [pooled[0], pooled[1], pooled[0], pooled[1]])
+        self.assertNotIn(shared, pooled)
+        self.assertNotIn(dedicated, pooled)
+
+        stats = {(s.policy, s.key): s for s in robot.channel_stats()}
+        self.assertEqual(len(stats), 4)
+        self.assertEqual(stats[('shared', None)].num_clients, 1)
+        self.assertEqual(stats[('dedicated', 'estop')].num_clients, 2)
+        self.assertEqual(stats[('pooled', 0)].num_clients, 2)
+        self.assertEqual(stats[('pooled', 1)].num_clients, 2)
+
+        async def _aio_channels():
+            channels = [robot.ensure_aio_channel(name) for name in ('mock', 'estop', 'estop')]
+            channels.extend(robot.ensure_aio_channel('image') for _ in range(3))
+            await robot.close_aio_channels()
+            return channels
+
+        # aio channels follow the same policies.
+        aio_shared, aio_dedicated, aio_dedicated2, *aio_pooled = asyncio.run(_aio_channels())
+        self.assertIsNot(aio_dedicated, aio_shared)
+        self.assertIs(aio_dedicated, aio_dedicated2)
+        self.assertEqual(aio_pooled, [aio_pooled[0], aio_pooled[1], aio_pooled[0]])
+        self.assertIsNot(aio_pooled[0], aio_pooled[1])
+        self.assertNotIn(aio_shared, aio_pooled)
+        self.assertEqual(robot.pooled_aio_channels_by_authority, {})
+
+        # The options passed in are not modified with the keepalive options.
+        options = []
+        robot.ensure_secure_channel('the-bridge-of-death', options=options)
+        self.assertNotIn('grpc.keepalive_time_ms', [option[0] for option in options])
+
+        # Concurrent first calls do not create more channels than the pool size.
+        threads = [
+            threading.Thread(target=robot.ensure_pooled_channel, args=('castle-anthrax',))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(robot.pooled_channels_by_authority['castle-anthrax']), 2)
+
     def test_load_robot_cert(self):
         sdk = bosdyn.client.Sdk()
         sdk.load_robot_cert()
@@ -0,0 +1,130 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Unit tests for the time_sync client."""
+import threading
+
+import pytest
+
+from bosdyn.api import time_sync_pb2, time_sync_service_pb2_grpc
+from bosdyn.client.processors import AddRequestHeader
+from bosdyn.client.time_sync import (NotEstablishedError, TimeSyncClient, TimeSyncEndpoint,
+                                     TimeSyncEstimator)
+from bosdyn.util import now_nsec, set_timestamp_from_nsec
+
+from . import helpers
+
+SKEW_NSEC = 12345678901
+
+
+class MockTimeSyncServicer(time_sync_service_pb2_grpc.TimeSyncServiceServicer):
+    """Time-sync service whose clock is ahead of the local clock by SKEW_NSEC."""
+
+    def __init__(self):
+        super(MockTimeSyncServicer, self).__init__()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = []
+
+    def TimeSyncUpdate(self, request, context):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.requests.append(request)
+        response = time_sync_pb2.TimeSyncUpdateResponse()
+        helpers.add_common_header(response, request)
+        set_timestamp_from_nsec(response.header.request_received_timestamp,
+                                now_nsec() + SKEW_NSEC)
+        response.clock_identifier = 'clock'
+        response.state.status = time_sync_pb2.TimeSyncState.STATUS_OK
+        # Let the other requests in flight arrive.
+        threading.Event().wait(0.01)
+        with self._lock:
+            self.in_flight -= 1
+        set_timestamp_from_nsec(response.header.response_timestamp, now_nsec() + SKEW_NSEC)
+        return response
+
+
+def _round_trip(client_tx, skew, round_trip_time, server_time=1000):
+    round_trip = time_sync_pb2.TimeSyncRoundTrip()
+    set_timestamp_from_nsec(round_trip.client_tx, client_tx)
+    set_timestamp_from_nsec(round_trip.server_rx, client_tx + skew + round_trip_time // 2)
+    set_timestamp_from_nsec(round_trip.server_tx,
+                            client_tx + skew + round_trip_time // 2 + server_time)
+    set_timestamp_from_nsec(round_trip.client_rx, client_tx + round_trip_time + server_time)
+    return round_trip
+
+
+def test_estimator_collect():
+    client = TimeSyncClient()
+    client.request_processors.append(AddRequestHeader(lambda: 'test-client'))
+    service = MockTimeSyncServicer()
+    server = helpers.setup_client_and_service(
+        client, service, time_sync_service_pb2_grpc.add_TimeSyncServiceServicer_to_server)
+    endpoint = TimeSyncEndpoint(client)
+    estimator = TimeSyncEstimator(endpoint)
+    with pytest.raises(NotEstablishedError):
+        estimator.estimate()
+
+    assert estimator.collect(num_samples=12, max_outstanding=4) == 12
+    server.stop(None)
+    assert endpoint.clock_identifier == 'clock'
+    assert service.max_in_flight > 1
+    # Each round trip is passed to the service at most once.
+    round_trips = [
+        request.previous_round_trip.SerializeToString()
+        for request in service.requests
+        if request.HasField('previous_round_trip')
+    ]
+    assert len(round_trips) == len(set(round_trips))
+
+    estimate = estimator.estimate()
+    assert abs(estimate.skew_nsec - SKEW_NSEC) <= estimate.uncertainty_nsec
+    converter = estimator.get_robot_time_converter()
+    local_nsec = now_nsec()
+    assert abs(converter.clock_skew_nsec(local_nsec) - SKEW_NSEC) <= estimate.uncertainty_nsec
+
+
+def test_estimator_drift():
+    estimator = TimeSyncEstimator(time_sync_endpoint=None, window_size=20, num_best=10)
+    start = 1000 * 10**9
+    drift = 2e-6
+    for i in range(20):
+        client_tx = start + i * 10**8
+        skew = SKEW_NSEC + int(drift * (client_tx - start))
+        # Every other round trip is slow, with an asymmetric delay.
+        if i % 2:
+            round_trip = _round_trip(client_tx, skew + 3 * 10**6, 10 * 10**6)
+        else:
+            round_trip = _round_trip(client_tx, skew, 2 * 10**5)
+        estimator.add_round_trip(round_trip)
+
+    later = start + 30 * 10**8
+    estimate = estimator.estimate(later)
+    assert estimate.drift == pytest.approx(drift, rel=0.01)
+    assert abs(estimate.skew_nsec - (SKEW_NSEC + drift * (later - start))) < 2 * 10**3
+    assert estimate.uncertainty_nsec >= 10**5
+    assert estimate.uncertainty_nsec < 10**6
+    assert estimator.estimate(later + 10**10).uncertainty_nsec >= estimate.uncertainty_nsec
+
+
+def test_endpoint_converter_cached():
+    client = TimeSyncClient()
+    client.request_processors.append(AddRequestHeader(lambda: 'test-client'))
+    server = helpers.setup_client_and_service(
+        client, MockTimeSyncServicer(),
+        time_sync_service_pb2_grpc.add_TimeSyncServiceServicer_to_server)
+    endpoint = TimeSyncEndpoint(client)
+    with pytest.raises(NotEstablishedError):
+        endpoint.get_robot_time_converter()
+    endpoint.get_new_estimate()
+    converter = endpoint.get_robot_time_converter()
+    assert endpoint.get_robot_time_converter() is converter
+    # A new estimate replaces the converter.
+    endpoint.get_new_estimate()
+    server.stop(None)
+    assert endpoint.get_robot_time_converter() is not converter
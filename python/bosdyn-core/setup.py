@@ -34,7 +34,7 @@ setuptools.setup(
     },
     packages=setuptools.find_packages('src'),
     package_dir={'': 'src'},
-    install_requires=['bosdyn-api=={}'.format(SDK_VERSION), 'Deprecated~=1.2.10'],
+    install_requires=['bosdyn-api=={}'.format(SDK_VERSION), 'Deprecated~=1.2.10', 'numpy'],
     classifiers=[
         "Programming Language :: Python :: 3.6",
         "License :: Other/Proprietary License",
@@ -9,8 +9,14 @@
 # Importing symbols to use directly via "bosdyn.bddf" namespace.
 
 # pylint: disable=unused-import
-from .common import (LOGGER, PROTOBUF_CONTENT_TYPE, AddSeriesError, ChecksumError, DataError,
+# Export fields of a channel of Protobuf data into columns of numpy arrays.
+from .column_exporter import ProtobufColumnExporter, load_columns, save_columns
+from .common import (CHECKSUM_VERIFY_LAZY, CHECKSUM_VERIFY_NONE, CHECKSUM_VERIFY_STRICT, LOGGER,
+                     PROTOBUF_CONTENT_TYPE, AddSeriesError, ChecksumError, DataError,
                      DataFormatError, ParseError, SeriesNotUniqueError)
+# Compression of the data blocks of a series.
+from .compression import (COMPRESSION_ANNOTATION, COMPRESSION_LZMA, COMPRESSION_ZLIB,
+                          COMPRESSION_ZSTD, available_codecs)
 # Class for reading data from a file-like object which is seekable.
 from .data_reader import DataReader
 # Class for writing data to a file.
@@ -21,6 +27,10 @@ from .grpc_reader import GrpcReader
 from .grpc_service_writer import GrpcServiceWriter
 # A class for reading message data from a DataFile.
 from .message_reader import MessageReader
+# Sidecar file caching the index of a bddf file.
+from .index_cache import IndexCache
+# Class for reading the same series of data from a set of bddf files.
+from .multi_file_reader import MultiFileReader
 # Class for reading a series of POD data from a DataFile.
 from .pod_series_reader import PodSeriesReader
 # Class which assists with writing POD data values into a series, within a DataWriter.
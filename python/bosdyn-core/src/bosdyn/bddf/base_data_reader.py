@@ -9,24 +9,29 @@ import struct
 
 import bosdyn.api.bddf_pb2 as bddf
 
-from .common import (BLOCK_HEADER_SIZE_MASK, BLOCK_HEADER_TYPE_MASK, DATA_BLOCK_TYPE,
-                     DESCRIPTOR_BLOCK_TYPE, END_BLOCK_TYPE, LOGGER, MAGIC, SHA1_DIGEST_NBYTES,
-                     ChecksumError, DataFormatError, ParseError)
+from .common import (BLOCK_HEADER_SIZE_MASK, BLOCK_HEADER_TYPE_MASK, CHECKSUM_VERIFY_MODES,
+                     CHECKSUM_VERIFY_NONE, DATA_BLOCK_TYPE, DESCRIPTOR_BLOCK_TYPE, END_BLOCK_TYPE,
+                     LOGGER, MAGIC, SHA1_DIGEST_NBYTES, ChecksumError, DataFormatError, ParseError)
 
 
 class BaseDataReader:  # pylint: disable=too-many-instance-attributes
     """Shared parent class for DataReader and StreamedDataReader."""
 
-    def __init__(self, infile=None, filename=None):
+    def __init__(self, infile=None, filename=None, checksum_mode=CHECKSUM_VERIFY_NONE):
         """
-        At least one of the following arguments must be specified.
+        At least one of infile or filename must be specified.
 
         Args:
-         infile:      binary file-like object for reading (e.g., from open(fname, "rb")).
-         filename:    path of input file, if applicable.
+         infile:         binary file-like object for reading (e.g., from open(fname, "rb")).
+         filename:       path of input file, if applicable.
+         checksum_mode:  how to verify the file checksum: CHECKSUM_VERIFY_NONE,
+                          CHECKSUM_VERIFY_LAZY or CHECKSUM_VERIFY_STRICT.
         """
         self._file = infile
         self._filename = filename
+        if checksum_mode not in CHECKSUM_VERIFY_MODES:
+            raise ValueError("Unknown checksum_mode {}".format(checksum_mode))
+        self._checksum_mode = checksum_mode
         if not self._file:
             if not self._filename:
                 raise ValueError("One of infile or filename must be specified")
@@ -75,6 +80,25 @@ class BaseDataReader:  # pylint: disable=too-many-instance-attributes
         """Override to compute checksum on reading, in stream-readers."""
         return self._read_checksum
 
+    @property
+    def checksum_mode(self):
+        """How the file checksum is verified (one of the CHECKSUM_VERIFY_* modes)."""
+        return self._checksum_mode
+
+    @property
+    def has_checksum(self):
+        """Returns True if the file format includes a SHA1 checksum."""
+        # pylint: disable=no-member
+        return (self._file_descriptor.checksum_type ==
+                bddf.FileFormatDescriptor.CHECKSUM_TYPE_SHA1)
+
+    @staticmethod
+    def _check_checksum(checksum, computed_checksum):
+        if checksum != computed_checksum:
+            raise ChecksumError("File checksum 0x{} does not match computed value 0x{}".format(
+                ''.join('{:02X}'.format(x) for x in checksum),
+                ''.join('{:02X}'.format(x) for x in computed_checksum)))
+
     def _computed_checksum(self):  # pylint: disable=no-self-use
         """Override to compute checksum on reading, in stream-readers."""
         return None
@@ -92,6 +116,10 @@ class BaseDataReader:  # pylint: disable=too-many-instance-attributes
     def __enter__(self):
         return self
 
+    def close(self):
+        """Close the file.  The reader is also closed when used as a context manager."""
+        self._close()
+
     def _close(self):
         if not self._file:
             return
@@ -159,14 +187,10 @@ class BaseDataReader:  # pylint: disable=too-many-instance-attributes
         if block_type == END_BLOCK_TYPE:
             self._index_offset = struct.unpack('<Q', self._read(8))[0]
             self._read_checksum = self._computed_checksum()  # pylint: disable=assignment-from-none
-            self._checksum = self._read(self._file_descriptor.checksum_num_bytes)
+            self._checksum = bytes(self._read(self._file_descriptor.checksum_num_bytes))
             self._eof = True
-            # pylint: disable=no-member
-            if (self._file_descriptor.checksum_type == bddf.FileFormatDescriptor.CHECKSUM_TYPE_SHA1
-                    and self._read_checksum is not None and self._checksum != self._read_checksum):
-                raise ChecksumError("File checksum 0x{} does not match computed value 0x{}".format(
-                    ''.join('{:02X}'.format(x) for x in self._checksum),
-                    ''.join('{:02X}'.format(x) for x in self._read_checksum)))
+            if self.has_checksum and self._read_checksum is not None:
+                self._check_checksum(self._checksum, self._read_checksum)
             raise EOFError("Normal end of bddf file")
         is_data_block = (block_type == DATA_BLOCK_TYPE)
         if not is_data_block:
@@ -6,7 +6,9 @@
 
 """BlockWriter writes basic data structures in the bddf file."""
 
+import queue
 import struct
+import threading
 from hashlib import sha1
 
 import bosdyn.api.bddf_pb2 as bddf
@@ -15,41 +17,133 @@ from .common import (BLOCK_HEADER_SIZE_MASK, DATA_BLOCK_TYPE, DESCRIPTOR_BLOCK_T
                      END_MAGIC, MAGIC, SHA1_DIGEST_NBYTES, DataFormatError)
 
 
-class BlockWriter:
-    """Writes data structures in the data file."""
-
-    def __init__(self, outfile):
+class BlockWriter:  # pylint: disable=too-many-instance-attributes
+    """Writes data structures in the data file.
+
+    Small writes may be combined in a buffer of buffer_size bytes before they are hashed and
+     written to the file.  If background is True, hashing and writing to the file happen on a
+     separate thread, fed by a queue holding at most max_queued_buffers buffers.
+    """
+
+    def __init__(self, outfile, buffer_size=0, background=False, max_queued_buffers=16):
+        """
+        Args:
+         outfile:             a file-like object for writing binary data.
+         buffer_size:         number of bytes to collect before hashing and writing them to
+                               the file (0 for no buffering).
+         background:          if True, hash and write to the file on a background thread.
+         max_queued_buffers:  maximum number of buffers waiting for the background thread
+                               before writes block.
+        """
         self._outfile = outfile
         self._hasher = sha1()
+        self._position = outfile.tell()
+        self._buffer_size = buffer_size
+        self._buffer = bytearray()
+        self._queue = None
+        self._thread = None
+        self._thread_error = None
+        if background:
+            self._queue = queue.Queue(maxsize=max_queued_buffers)
+            self._thread = threading.Thread(target=self._run_background_writer,
+                                            name='bddf-block-writer', daemon=True)
+            self._thread.start()
 
     def tell(self):
         """Return location from start of file."""
-        return self._outfile.tell()
+        return self._position
 
     def write_descriptor_block(self, block):
         """Write a DescriptorBlock to the file."""
         serialized = block.SerializeToString()
-        self._write_block_header(DESCRIPTOR_BLOCK_TYPE, len(serialized))
-        self._write(serialized)
+        self._write(self._block_header(DESCRIPTOR_BLOCK_TYPE, len(serialized)) + serialized)
 
     def write_data_block(self, desc_block, data):
         """Write a block of data to the file."""
         serialized_desc = desc_block.SerializeToString()
-        self._write_block_header(DATA_BLOCK_TYPE, len(data) + len(serialized_desc))
-        self._write(struct.pack('<I', len(serialized_desc)))
-        self._write(serialized_desc)
+        self._write(
+            self._block_header(DATA_BLOCK_TYPE, len(data) + len(serialized_desc)) +
+            struct.pack('<I', len(serialized_desc)) + serialized_desc)
         self._write(data)
 
+    def flush(self):
+        """Hash and write all buffered data to the file, waiting for the background thread."""
+        self._flush_buffer()
+        if self._queue is not None:
+            self._queue.join()
+            self._check_background_writer()
+        if hasattr(self._outfile, 'flush'):
+            self._outfile.flush()
+
     def _write(self, data):
-        self._hasher.update(data)
-        self._outfile.write(data)
+        self._position += len(data)
+        if len(data) >= self._buffer_size:
+            # Too large to be worth buffering.
+            self._flush_buffer()
+            self._output(data)
+            return
+        self._buffer += data
+        if len(self._buffer) >= self._buffer_size:
+            self._flush_buffer()
+
+    def _flush_buffer(self):
+        if not self._buffer:
+            return
+        # Hand off the buffer rather than copying it.
+        buffer, self._buffer = self._buffer, bytearray()
+        self._output(buffer, owned=True)
+
+    def _output(self, data, owned=False):
+        if self._queue is None:
+            self._hasher.update(data)
+            self._outfile.write(data)
+            return
+        self._check_background_writer()
+        if not owned and not isinstance(data, bytes):
+            # The caller may modify or release its data after we return.
+            data = bytes(data)
+        self._queue.put(data)
+
+    def _run_background_writer(self):
+        while True:
+            data = self._queue.get()
+            try:
+                if data is None:
+                    return
+                if self._thread_error is None:
+                    self._hasher.update(data)
+                    self._outfile.write(data)
+            except Exception as err:  # pylint: disable=broad-except
+                self._thread_error = err
+            finally:
+                self._queue.task_done()
+
+    def _check_background_writer(self):
+        if self._thread_error is not None:
+            raise self._thread_error
+
+    def _stop_background_writer(self):
+        if self._thread is None:
+            return
+        try:
+            self._flush_buffer()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            self._queue = None
+        self._check_background_writer()
 
     def close(self):
         """Close the file, if not already closed."""
         if self.closed:
             return
-        self._outfile.close()
-        self._outfile = None
+        try:
+            self._stop_background_writer()
+            self._flush_buffer()
+        finally:
+            self._outfile.close()
+            self._outfile = None
 
     @property
     def closed(self):
@@ -74,14 +168,18 @@ class BlockWriter:
 
     def write_file_end(self, index_offset):
         """Write the end of the data file."""
-        self._write_block_header(END_BLOCK_TYPE, 24)
-        self._write(struct.pack('<Q', index_offset))
+        self._write(self._block_header(END_BLOCK_TYPE, 24) + struct.pack('<Q', index_offset))
+        # The checksum covers everything before it, so all pending data must be hashed first.
+        self._stop_background_writer()
+        self._flush_buffer()
         self._outfile.write(self._hasher.digest())
         self._outfile.write(END_MAGIC)
+        self._position += SHA1_DIGEST_NBYTES + len(END_MAGIC)
 
-    def _write_block_header(self, block_type, block_len):
+    @staticmethod
+    def _block_header(block_type, block_len):
         if block_len > BLOCK_HEADER_SIZE_MASK:
             raise DataFormatError('block size ({}) is too big (> {})'.format(
                 block_len, BLOCK_HEADER_SIZE_MASK))
         block_descriptor = block_type << 56 | block_len  # mark this as a desc block
-        self._write(struct.pack('<Q', block_descriptor))
+        return struct.pack('<Q', block_descriptor)
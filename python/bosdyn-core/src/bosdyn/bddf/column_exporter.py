@@ -0,0 +1,351 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Export fields of a channel of Protobuf data from a DataFile into columns of numpy arrays."""
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from google.protobuf.descriptor import FieldDescriptor
+
+from .data_reader import DataReader
+from .protobuf_reader import ProtobufReader
+
+# Name of the column holding the timestamp of each message.
+TIMESTAMP_COLUMN = 'timestamp_nsec'
+
+# Name of the file listing the columns in a directory written by save_columns().
+COLUMNS_MANIFEST = 'columns.json'
+
+# Name of the array listing the columns in a .npz file written by save_columns().
+_NPZ_MANIFEST = 'columns_manifest'
+
+_PATH_ELEMENT_RE = re.compile(r'^(\w+)(?:\[(\*|\d+)\])?$')
+
+_CPPTYPE_TO_DTYPE = {
+    FieldDescriptor.CPPTYPE_INT32: np.int64,
+    FieldDescriptor.CPPTYPE_INT64: np.int64,
+    FieldDescriptor.CPPTYPE_UINT32: np.int64,
+    FieldDescriptor.CPPTYPE_UINT64: np.uint64,
+    FieldDescriptor.CPPTYPE_ENUM: np.int64,
+    FieldDescriptor.CPPTYPE_FLOAT: np.float32,
+    FieldDescriptor.CPPTYPE_DOUBLE: np.float64,
+    FieldDescriptor.CPPTYPE_BOOL: np.bool_,
+}
+
+
+def _is_repeated(field):
+    is_repeated = getattr(field, 'is_repeated', None)
+    if is_repeated is not None:
+        return is_repeated
+    return field.label == FieldDescriptor.LABEL_REPEATED
+
+
+def _fill_value(dtype):
+    """Value used where a message does not have a field."""
+    if dtype == str:
+        return ''
+    if np.issubdtype(dtype, np.floating):
+        return np.nan
+    return dtype(0)
+
+
+def _leaf_fields(message_descriptor, prefix=(), parent_types=()):
+    """Return [(field name path, FieldDescriptor)] for the numeric fields under a message.
+
+    Singular message fields are flattened recursively.  Repeated fields, and message fields
+     which would recurse into a message type already being flattened, are skipped.
+    """
+    parent_types = parent_types + (message_descriptor.full_name,)
+    leaves = []
+    for field in message_descriptor.fields:
+        if _is_repeated(field):
+            continue
+        if field.cpp_type == FieldDescriptor.CPPTYPE_MESSAGE:
+            if field.message_type.full_name not in parent_types:
+                leaves.extend(
+                    _leaf_fields(field.message_type, prefix + (field.name,), parent_types))
+        elif field.cpp_type in _CPPTYPE_TO_DTYPE:
+            leaves.append((prefix + (field.name,), field))
+    return leaves
+
+
+class _Column:  # pylint: disable=too-few-public-methods
+    """A single column, produced by a suffix of singular fields after a field path."""
+
+    def __init__(self, name, suffix, dtype):
+        self.name = name
+        self.suffix = suffix  # Names of singular fields from the end of the path to the value.
+        self.dtype = dtype
+
+    def value(self, item):
+        """Return the value of the column for a message or value at the end of the field path."""
+        if not self.suffix:
+            return item
+        for field_name in self.suffix[:-1]:
+            if not item.HasField(field_name):
+                return _fill_value(self.dtype)
+            item = getattr(item, field_name)
+        return getattr(item, self.suffix[-1])
+
+
+class _FieldPath:
+    """A compiled field path, like 'kinematic_state.joint_states[*].position'.
+
+    Each element of the path names a field.  Repeated fields must be followed by '[index]'
+     to select one element, or '[*]' to select all elements.  At most one '[*]' is allowed.
+    """
+
+    def __init__(self, message_descriptor, path):
+        self.path = path
+        self.elements = []  # [(field name, None | '*' | index int)]
+        self.is_vector = False
+        descriptor = message_descriptor
+        field = None
+        for element in path.split('.'):
+            if descriptor is None:
+                raise ValueError("Field path '{}' continues past a scalar field".format(path))
+            match = _PATH_ELEMENT_RE.match(element)
+            if not match:
+                raise ValueError("Bad element '{}' in field path '{}'".format(element, path))
+            field_name, selector = match.groups()
+            try:
+                field = descriptor.fields_by_name[field_name]
+            except KeyError:
+                raise ValueError("{} has no field '{}' (in field path '{}')".format(
+                    descriptor.full_name, field_name, path)) from None
+            if _is_repeated(field) != (selector is not None):
+                raise ValueError(
+                    "Repeated fields and only repeated fields need an index in field path "
+                    "'{}'".format(path))
+            if selector == '*':
+                if self.is_vector:
+                    raise ValueError("At most one '[*]' is allowed in field path '{}'".format(path))
+                self.is_vector = True
+            elif selector is not None:
+                selector = int(selector)
+            self.elements.append((field_name, selector))
+            descriptor = field.message_type
+
+        if descriptor is None:
+            if field.cpp_type == FieldDescriptor.CPPTYPE_STRING and field.type != field.TYPE_BYTES:
+                dtype = str
+            elif field.cpp_type in _CPPTYPE_TO_DTYPE:
+                dtype = _CPPTYPE_TO_DTYPE[field.cpp_type]
+            else:
+                raise ValueError(
+                    "Field path '{}' does not lead to a numeric or string value".format(path))
+            self.columns = [_Column(path, (), dtype)]
+        else:
+            self.columns = [
+                _Column('.'.join((path,) + suffix), suffix, _CPPTYPE_TO_DTYPE[leaf.cpp_type])
+                for suffix, leaf in _leaf_fields(descriptor)
+            ]
+            if not self.columns:
+                raise ValueError(
+                    "Field path '{}' leads to a message with no numeric fields".format(path))
+
+    def items(self, message):
+        """Return the list of messages or values selected by the path in a message."""
+        items = [message]
+        for field_name, selector in self.elements:
+            next_items = []
+            for item in items:
+                if selector is None:
+                    value = getattr(item, field_name)
+                    if hasattr(value, 'DESCRIPTOR') and not item.HasField(field_name):
+                        continue  # Unset sub-message.
+                    next_items.append(value)
+                elif selector == '*':
+                    next_items.extend(getattr(item, field_name))
+                else:
+                    values = getattr(item, field_name)
+                    if selector < len(values):
+                        next_items.append(values[selector])
+            items = next_items
+        return items
+
+
+class ProtobufColumnExporter:
+    """Flattens selected fields of Protobuf messages into columns of numpy arrays.
+
+    Field paths name fields by their protobuf field names, separated by '.', such as
+     'kinematic_state.acquisition_timestamp.seconds'.  An element of a repeated field is
+     selected with '[index]' (e.g., 'kinematic_state.joint_states[0].position'), and all
+     elements with '[*]' (e.g., 'kinematic_state.joint_states[*].position').
+
+    A path ending at a numeric or string field gives one column named by the path.  A path
+     ending at a message gives one column for each numeric field within it, including fields of
+     singular sub-messages, named by the path plus the names of those fields.  For example
+     'kinematic_state.velocity_of_body_in_odom' gives columns
+     'kinematic_state.velocity_of_body_in_odom.linear.x', etc....
+
+    Columns have one row per message.  Columns from paths with '[*]' are 2-dimensional, padded
+     to the length of the longest list of elements.  Missing values (from unset sub-messages or
+     padding) are NaN for floating-point columns, 0 for integer columns, False for bool
+     columns and '' for string columns.
+    """
+
+    def __init__(self, protobuf_type, field_paths):
+        """
+        Args:
+         protobuf_type:  class of the protobuf messages to export.
+         field_paths:    list of field paths (strings) selecting what to export.
+
+        Raises ValueError if a field path is not valid for the protobuf type.
+        """
+        self._protobuf_type = protobuf_type
+        self._field_paths = list(field_paths)
+        self._compiled_paths = [
+            _FieldPath(protobuf_type.DESCRIPTOR, field_path) for field_path in self._field_paths
+        ]
+
+    @property
+    def column_names(self):
+        """Return the names of the columns produced, in order."""
+        return [column.name for path in self._compiled_paths for column in path.columns]
+
+    def messages_to_columns(self, messages):
+        """Flatten a list of messages into columns.
+
+        Returns: dict of {column name -> numpy array with one row per message}
+        """
+        columns = {}
+        for path in self._compiled_paths:
+            rows = [path.items(message) for message in messages]
+            for column in path.columns:
+                fill = _fill_value(column.dtype)
+                if not path.is_vector:
+                    values = [column.value(items[0]) if items else fill for items in rows]
+                    columns[column.name] = np.array(values, dtype=column.dtype)
+                    continue
+                width = max((len(items) for items in rows), default=0)
+                values = [[column.value(item) for item in items] + [fill] * (width - len(items))
+                          for items in rows]
+                columns[column.name] = np.array(values, dtype=column.dtype).reshape(
+                    len(rows), width)
+        return columns
+
+    def export_channel(  # pylint: disable=too-many-arguments
+            self, filename, channel_name=None, start_nsec=None, end_nsec=None, max_workers=None,
+            chunk_size=1000):
+        """Flatten the messages of a channel in a bddf file into columns.
+
+        Messages are decoded by a pool of worker processes, each handling chunks of chunk_size
+         messages.
+
+        Args:
+         filename:     path of the bddf file.
+         channel_name: name of the channel, defaulting to the full name of the protobuf type.
+         start_nsec:   nsec since unix epoch of the start of the range (inclusive), or None.
+         end_nsec:     nsec since unix epoch of the end of the range (exclusive), or None.
+         max_workers:  maximum number of worker processes (default is the number of
+                        processors).  If 0, all decoding is done in the calling process.
+         chunk_size:   number of messages decoded per task.
+
+        Returns: dict of {column name -> numpy array}, including TIMESTAMP_COLUMN.
+        """
+        type_name = self._protobuf_type.DESCRIPTOR.full_name
+        with DataReader(filename=filename) as data_reader:
+            series_index = ProtobufReader(data_reader).series_index(channel_name or type_name,
+                                                                     message_type=type_name)
+            indexes = data_reader.block_indexes_in_range(series_index, start_nsec, end_nsec)
+        chunks = [indexes[start:start + chunk_size] for start in range(0, len(indexes), chunk_size)]
+        args = (filename, series_index, self._protobuf_type, self._field_paths)
+        if max_workers == 0 or len(chunks) <= 1:
+            results = [_export_chunk(*args, chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(_export_chunk, *args, chunk) for chunk in chunks]
+                results = [future.result() for future in futures]
+        if not results:
+            results = [(np.empty(0, dtype=np.int64), self.messages_to_columns([]))]
+        return _concatenate_chunks(results)
+
+
+def _export_chunk(filename, series_index, protobuf_type, field_paths, indexes):
+    """Decode and flatten some of the messages of a series, for use in a worker process.
+
+    Returns: timestamps (int64 array), dict of {column name -> numpy array}
+    """
+    exporter = ProtobufColumnExporter(protobuf_type, field_paths)
+    timestamps = np.empty(len(indexes), dtype=np.int64)
+    messages = []
+    with DataReader(filename=filename, use_mmap=True) as data_reader:
+        for row_idx, index_in_series in enumerate(indexes):
+            _desc, timestamps[row_idx], data = data_reader.read(series_index, int(index_in_series))
+            message = protobuf_type()
+            message.ParseFromString(data)
+            messages.append(message)
+    return timestamps, exporter.messages_to_columns(messages)
+
+
+def _concatenate_chunks(results):
+    columns = {TIMESTAMP_COLUMN: np.concatenate([timestamps for timestamps, _ in results])}
+    for name, first in results[0][1].items():
+        parts = [chunk_columns[name] for _, chunk_columns in results]
+        if first.ndim == 2:
+            # Pad all chunks to the same width.
+            width = max(part.shape[1] for part in parts)
+            fill = _fill_value(first.dtype.type if first.dtype.kind != 'U' else str)
+            parts = [
+                np.pad(part, ((0, 0), (0, width - part.shape[1])), constant_values=fill)
+                for part in parts
+            ]
+        columns[name] = np.concatenate(parts)
+    return columns
+
+
+def save_columns(columns, path):
+    """Save columns to disk.
+
+    If path ends with '.npz', the columns are saved in a single uncompressed .npz file.
+     Otherwise path is a directory which will hold one .npy file per column, which can be
+     memory-mapped by load_columns().  Either way, the columns are stored under generated names
+     listed in a manifest, so any column name may be used.
+
+    Args:
+     columns:  dict of {column name -> numpy array}
+     path:     path of the .npz file or directory to write.
+    """
+    array_names = ['column_{:04d}'.format(idx) for idx in range(len(columns))]
+    if path.endswith('.npz'):
+        arrays = dict(zip(array_names, columns.values()))
+        arrays[_NPZ_MANIFEST] = np.array(json.dumps(dict(zip(columns, array_names))))
+        np.savez(path, **arrays)
+        return
+    os.makedirs(path, exist_ok=True)
+    manifest = {}
+    for array_name, (name, array) in zip(array_names, columns.items()):
+        column_filename = array_name + '.npy'
+        np.save(os.path.join(path, column_filename), array)
+        manifest[name] = column_filename
+    with open(os.path.join(path, COLUMNS_MANIFEST), 'w', encoding='utf-8') as outfile:
+        json.dump(manifest, outfile, indent=1)
+
+
+def load_columns(path, mmap_mode='r'):
+    """Load columns saved by save_columns().
+
+    Args:
+     path:       path of the .npz file or directory to read.
+     mmap_mode:  numpy memory-map mode for columns stored in a directory (None to read them
+                  into memory).  Columns in .npz files are always read into memory.
+
+    Returns: dict of {column name -> numpy array}
+    """
+    if path.endswith('.npz'):
+        with np.load(path) as npz_file:
+            manifest = json.loads(str(npz_file[_NPZ_MANIFEST]))
+            return {name: npz_file[array_name] for name, array_name in manifest.items()}
+    with open(os.path.join(path, COLUMNS_MANIFEST), 'r', encoding='utf-8') as infile:
+        manifest = json.load(infile)
+    return {
+        name: np.load(os.path.join(path, column_filename), mmap_mode=mmap_mode)
+        for name, column_filename in manifest.items()
+    }
@@ -33,6 +33,12 @@ INDEX_OFFSET_OFFSET = len(MAGIC) + SHA1_DIGEST_NBYTES + 8
 
 LOGGER = logging.getLogger('bddf')
 
+# Checksum verification modes for data readers.
+CHECKSUM_VERIFY_NONE = 'none'  # Do not verify the file checksum.
+CHECKSUM_VERIFY_LAZY = 'lazy'  # Verify the file checksum in the background while reading.
+CHECKSUM_VERIFY_STRICT = 'strict'  # Verify the file checksum before reading data.
+CHECKSUM_VERIFY_MODES = (CHECKSUM_VERIFY_NONE, CHECKSUM_VERIFY_LAZY, CHECKSUM_VERIFY_STRICT)
+
 POD_TYPE_TO_STRUCT = {
     bddf.TYPE_INT8: 'b',
     bddf.TYPE_INT16: 'h',
@@ -60,6 +66,21 @@ POD_TYPE_TO_NUM_BYTES = {
 }
 
 
+# Little-endian numpy dtype strings, matching the packing in POD_TYPE_TO_STRUCT.
+POD_TYPE_TO_DTYPE = {
+    bddf.TYPE_INT8: '<i1',
+    bddf.TYPE_INT16: '<i2',
+    bddf.TYPE_INT32: '<i4',
+    bddf.TYPE_INT64: '<i8',
+    bddf.TYPE_UINT8: '<u1',
+    bddf.TYPE_UINT16: '<u2',
+    bddf.TYPE_UINT32: '<u4',
+    bddf.TYPE_UINT64: '<u8',
+    bddf.TYPE_FLOAT32: '<f4',
+    bddf.TYPE_FLOAT64: '<f8',
+}
+
+
 class DataError(Exception):
     """Errors related to the DataWriter/DataReader system."""
 
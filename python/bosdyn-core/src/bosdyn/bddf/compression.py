@@ -0,0 +1,86 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Compression of the data blocks of a series."""
+import lzma
+import zlib
+
+from .common import DataError, DataFormatError
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+_DECOMPRESSION_ERRORS = (zlib.error, lzma.LZMAError)
+if zstandard is not None:
+    _DECOMPRESSION_ERRORS += (zstandard.ZstdError,)
+
+# Series annotation naming the codec used to compress each data block of the series.
+COMPRESSION_ANNOTATION = 'bosdyn:compression'
+
+COMPRESSION_ZLIB = 'zlib'
+COMPRESSION_LZMA = 'lzma'
+COMPRESSION_ZSTD = 'zstd'  # Requires the 'zstandard' package.
+
+
+def available_codecs():
+    """Return the names of the compression codecs which can be used in this environment."""
+    codecs = [COMPRESSION_ZLIB, COMPRESSION_LZMA]
+    if zstandard is not None:
+        codecs.append(COMPRESSION_ZSTD)
+    return codecs
+
+
+def check_codec(codec):
+    """Raise DataFormatError if the codec cannot be used in this environment."""
+    if codec not in available_codecs():
+        raise DataFormatError("Compression codec '{}' is not available (available: {})".format(
+            codec, ', '.join(available_codecs())))
+
+
+def series_compression(series_descriptor):
+    """Return the compression codec of a series (string), or None if it is not compressed."""
+    return series_descriptor.annotations.get(COMPRESSION_ANNOTATION) or None
+
+
+def compress(codec, data, level=None):
+    """Compress a data block.
+
+    Args:
+     codec:  name of the compression codec.
+     data:   binary data to compress.
+     level:  codec-specific compression level, or None for the default level.
+
+    Returns: compressed data (bytes).
+
+    Raises DataFormatError if the codec is not available.
+    """
+    check_codec(codec)
+    if codec == COMPRESSION_ZLIB:
+        return zlib.compress(data, -1 if level is None else level)
+    if codec == COMPRESSION_LZMA:
+        return lzma.compress(data, preset=level)
+    return zstandard.ZstdCompressor(level=3 if level is None else level).compress(data)
+
+
+def decompress(codec, data):
+    """Decompress a data block compressed with compress().
+
+    Returns: decompressed data (bytes).
+
+    Raises DataError if the codec is not available or the data cannot be decompressed.
+    """
+    if codec not in available_codecs():
+        raise DataError("Compression codec '{}' is not available".format(codec))
+    try:
+        if codec == COMPRESSION_ZLIB:
+            return zlib.decompress(data)
+        if codec == COMPRESSION_LZMA:
+            return lzma.decompress(data)
+        return zstandard.ZstdDecompressor().decompress(data)
+    except _DECOMPRESSION_ERRORS as err:
+        raise DataError("Could not decompress {} data: {}".format(codec, err)) from err
@@ -5,31 +5,153 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Class for reading data from a file-like object which is seekable."""
+import io
+import mmap
 import os
 import struct
+import threading
+from hashlib import sha1
+
+import numpy as np
 
 from .base_data_reader import BaseDataReader
-from .common import END_MAGIC, INDEX_OFFSET_OFFSET, MAGIC, ParseError
+from .common import (CHECKSUM_VERIFY_LAZY, CHECKSUM_VERIFY_NONE, CHECKSUM_VERIFY_STRICT,
+                     END_MAGIC, INDEX_OFFSET_OFFSET, LOGGER, MAGIC, SHA1_DIGEST_NBYTES,
+                     ParseError)
+from .compression import decompress, series_compression
+from .index_cache import IndexCache
+
+# Number of bytes to hash at a time when verifying the checksum of a file.
+CHECKSUM_CHUNK_NBYTES = 8 * 1024 * 1024
 
 
 class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attributes
     """Class for reading data from a file-like object which is seekable.
 
     Methods raise ParseError if there is a problem with the format of the file.
+
+    If use_mmap is True, the file is memory-mapped and blocks are parsed directly out of the
+     mapping.  In that mode read() returns message data as a memoryview into the mapping rather
+     than as a bytes copy.  Those views remain valid for as long as they are referenced, even
+     after the reader is closed.
+
+    If use_index_cache is True, the index of the file is loaded from a sidecar file next to
+     the data file (see IndexCache), and the sidecar is written if it is missing or out of date.
+
+    The checksum_mode selects how the checksum at the end of the file is verified:
+     CHECKSUM_VERIFY_NONE:    only when verify_checksum() is called.
+     CHECKSUM_VERIFY_LAZY:    on a background thread, starting when the reader is created.
+                               verify_checksum() waits for the result.
+     CHECKSUM_VERIFY_STRICT:  before the constructor returns, raising ChecksumError on mismatch.
     """
 
-    def __init__(self, infile=None, filename=None):
+    def __init__(  # pylint: disable=too-many-arguments
+            self, infile=None, filename=None, use_mmap=False, use_index_cache=False,
+            checksum_mode=CHECKSUM_VERIFY_NONE):
         """
         At least one of the following arguments must be specified.
 
         Args:
          infile:      binary file-like object for reading (e.g., from open(fname, "rb")).
          filename:    path of input file, if applicable.
+         use_mmap:    if True, memory-map the file instead of issuing seek()/read() calls.
+                       infile, if specified, must be backed by a real file (have a fileno()).
+         use_index_cache: if True, use a sidecar index cache file.  Requires filename.
+         checksum_mode:  how to verify the file checksum (one of the CHECKSUM_VERIFY_* modes).
         """
-        super(DataReader, self).__init__(infile, filename)
+        self._index_cache = None
+        self._checksum_thread = None
+        self._checksum_error = None  # Exception raised while computing the checksum.
+        self._checksum_cancel = threading.Event()
+        self._mmap = None
+        self._view = None  # memoryview of self._mmap, when use_mmap is True.
+        self._offset = 0  # Read position within self._view.
+        super(DataReader, self).__init__(infile, filename, checksum_mode=checksum_mode)
+        if use_index_cache and not filename:
+            raise ValueError("filename must be specified to use an index cache")
+        if use_mmap:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap)
+            self._offset = self._file.tell()
         self._series_index_to_descriptor = {}
+        self._series_index_to_compression = {}  # {series_index -> codec name or None}
         self._series_index_to_block_index = {}  # {series_index -> SeriesBlockIndex}
-        self._read_index()
+        # {series_index -> (sorted timestamps array, sort order array or None if already sorted)}
+        self._series_index_to_timestamps = {}
+        if use_index_cache:
+            self._index_cache = IndexCache.load(filename)
+        if self._index_cache is None:
+            self._read_index()
+            if use_index_cache:
+                try:
+                    IndexCache.write(self, filename)
+                except OSError as exc:
+                    # E.g., the directory of the file is read-only; the cache is optional.
+                    LOGGER.warning("Could not write index cache for %s: %s", filename, exc)
+        else:
+            # The FileIndex is parsed from the cache when it is first used.
+            self._index_offset = self._index_cache.index_offset
+            self._checksum = self._index_cache.checksum
+        if self.has_checksum:
+            if checksum_mode == CHECKSUM_VERIFY_STRICT:
+                self.verify_checksum()
+            elif checksum_mode == CHECKSUM_VERIFY_LAZY and self._fileno() is not None:
+                self._checksum_thread = threading.Thread(target=self._run_checksum,
+                                                         name='bddf-checksum', daemon=True)
+                self._checksum_thread.start()
+
+    @property
+    def is_mmap(self):
+        """Returns True if the reader is reading from a memory-mapping of the file."""
+        return self._view is not None
+
+    @property
+    def index_offset(self):
+        """Returns the location of the FileIndex in the file."""
+        return self._index_offset
+
+    @property
+    def file_index(self):
+        """Get the FileIndex proto used which describes how to access data in the file."""
+        if self._file_index is None and self._index_cache is not None:
+            self._set_file_index(self._index_cache.file_index)
+        return self._file_index
+
+    def series_spec_to_index(self, series_spec):
+        """Given a series spec (map {key -> value}), return the series index for that series.
+
+        Raises ValueError if no such series exists.
+        """
+        self.file_index  # pylint: disable=pointless-statement
+        return super(DataReader, self).series_spec_to_index(series_spec)
+
+    def verify_checksum(self, timeout=None):
+        """Verify the checksum at the end of the file against the contents of the file.
+
+        The checksum is computed if it has not been already.  In CHECKSUM_VERIFY_LAZY mode this
+         waits for the background computation to finish.
+
+        Args:
+         timeout:  maximum time (sec) to wait for a background computation, or None to wait
+                    until it finishes.
+
+        Returns: True if the checksum matches, or the file has no checksum.
+                 False if the background computation did not finish within the timeout.
+
+        Raises ChecksumError if the checksum does not match.
+        """
+        if not self.has_checksum:
+            return True
+        if self._checksum_thread is not None:
+            self._checksum_thread.join(timeout)
+            if self._checksum_thread.is_alive():
+                return False
+            if self._checksum_error is not None:
+                raise self._checksum_error
+        if self._read_checksum is None:
+            self._read_checksum = self._compute_checksum()
+        self._check_checksum(self._checksum, self._read_checksum)
+        return True
 
     def series_descriptor(self, series_index):
         """Return SeriesDescriptor for given series index, loading it if necessary."""
@@ -38,18 +160,35 @@ class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attribute
         except KeyError:
             pass
 
-        series_block_index = self.series_block_index(series_index)
-        desc = self._read_desc_block_at("series_descriptor",
-                                        series_block_index.descriptor_file_offset)
+        if self._index_cache is not None:
+            descriptor_file_offset = self._index_cache.descriptor_file_offset(series_index)
+        else:
+            descriptor_file_offset = self.series_block_index(series_index).descriptor_file_offset
+        desc = self._read_desc_block_at("series_descriptor", descriptor_file_offset)
         self._series_index_to_descriptor[series_index] = desc
         return desc
 
+    def series_compression(self, series_index):
+        """Return the codec (string) with which the data blocks of the series are compressed,
+        or None if they are not compressed."""
+        try:
+            return self._series_index_to_compression[series_index]
+        except KeyError:
+            pass
+        codec = series_compression(self.series_descriptor(series_index))
+        self._series_index_to_compression[series_index] = codec
+        return codec
+
     def num_data_blocks(self, series_index):
         """Returns the number of data blocks for a given series in the file."""
+        if self._index_cache is not None:
+            return len(self._index_cache.block_offsets(series_index))
         return len(self.series_block_index(series_index).block_entries)
 
     def total_bytes(self, series_index):
         """Returns the total number of bytes for data in a given series in the file."""
+        if self._index_cache is not None:
+            return self._index_cache.total_bytes(series_index)
         return self.series_block_index(series_index).total_bytes
 
     def read(self, series_index, index_in_series):
@@ -59,14 +198,97 @@ class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attribute
          series_index: int selecting from which series to read the message.
          index_in_series: The index number of the message within the channel.
 
-        Returns: DataTypeDescriptor for channel, timestamp_nsec (int), message-data (bytes)
+        Returns: DataTypeDescriptor for channel, timestamp_nsec (int), message-data (bytes,
+                  or a memoryview into the file mapping if the reader is using mmap and the
+                  series is not compressed)
+
+        Raises ParseError if there is a problem with the format of the file,
+               DataError if a compressed data block cannot be decompressed.
+        """
+        if self._index_cache is not None:
+            file_offset = self._index_cache.block_offsets(series_index)[index_in_series]
+            timestamp_nsec = int(self._index_cache.block_timestamps(series_index)[index_in_series])
+        else:
+            series_block_index = self.series_block_index(series_index)
+            msg_idx = series_block_index.block_entries[index_in_series]
+            file_offset = msg_idx.file_offset
+            timestamp_nsec = msg_idx.timestamp.ToNanoseconds()
+        desc, data = self._read_data_block_at(int(file_offset))
+        codec = self.series_compression(series_index)
+        if codec:
+            data = decompress(codec, data)
+        return desc, timestamp_nsec, data
+
+    def series_timestamps(self, series_index):
+        """Returns the timestamps (nsec) of the data blocks in a series, as an int64 numpy array.
+
+        The array is in the same order as the block entries of the series, and is cached.
+        """
+        timestamps, order = self._sorted_series_timestamps(series_index)
+        if order is None:
+            return timestamps
+        unsorted = np.empty_like(timestamps)
+        unsorted[order] = timestamps
+        return unsorted
+
+    def block_indexes_in_range(self, series_index, start_nsec, end_nsec):
+        """Return the indexes of the data blocks in a series timestamped in [start_nsec, end_nsec).
+
+        Args:
+         series_index: int selecting from which series to find data blocks.
+         start_nsec:   nsec since unix epoch of the start of the range (inclusive),
+                        or None for the start of the series.
+         end_nsec:     nsec since unix epoch of the end of the range (exclusive),
+                        or None for the end of the series.
+
+        Returns: int64 numpy array of index_in_series values, in timestamp order.
+        """
+        timestamps, order = self._sorted_series_timestamps(series_index)
+        begin = 0 if start_nsec is None else np.searchsorted(timestamps, start_nsec, side='left')
+        end = len(timestamps) if end_nsec is None else np.searchsorted(
+            timestamps, end_nsec, side='left')
+        if order is None:
+            return np.arange(begin, max(begin, end), dtype=np.int64)
+        return order[begin:end]
+
+    def read_range(self, series_index, start_nsec, end_nsec):
+        """Generate the data blocks in a series which are timestamped in [start_nsec, end_nsec).
+
+        Only the matching data blocks are read from the file.
+
+        Args:
+         series_index: int selecting from which series to read the messages.
+         start_nsec:   nsec since unix epoch of the start of the range (inclusive),
+                        or None for the start of the series.
+         end_nsec:     nsec since unix epoch of the end of the range (exclusive),
+                        or None for the end of the series.
+
+        Yields: DataTypeDescriptor for channel, timestamp_nsec (int), message-data, in
+                 timestamp order.
 
         Raises ParseError if there is a problem with the format of the file.
         """
-        series_block_index = self.series_block_index(series_index)
-        msg_idx = series_block_index.block_entries[index_in_series]
-        desc, data = self._read_data_block_at(msg_idx.file_offset)
-        return desc, msg_idx.timestamp.ToNanoseconds(), data
+        for index_in_series in self.block_indexes_in_range(series_index, start_nsec, end_nsec):
+            yield self.read(series_index, int(index_in_series))
+
+    def _sorted_series_timestamps(self, series_index):
+        try:
+            return self._series_index_to_timestamps[series_index]
+        except KeyError:
+            pass
+        if self._index_cache is not None:
+            timestamps = self._index_cache.block_timestamps(series_index)
+        else:
+            block_entries = self.series_block_index(series_index).block_entries
+            timestamps = np.fromiter((entry.timestamp.ToNanoseconds() for entry in block_entries),
+                                     dtype=np.int64, count=len(block_entries))
+        order = None
+        if np.any(timestamps[1:] < timestamps[:-1]):
+            # Blocks were not written in time order.
+            order = np.argsort(timestamps, kind='stable')
+            timestamps = timestamps[order]
+        self._series_index_to_timestamps[series_index] = (timestamps, order)
+        return timestamps, order
 
     def series_block_index(self, series_index):
         """Returns the SeriesBlockIndexes for the given series_index, loading it as needed."""
@@ -80,16 +302,90 @@ class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attribute
         self._series_index_to_block_index[series_index] = block_index
         return block_index
 
+    def _close(self):
+        if self._checksum_thread is not None:
+            self._checksum_cancel.set()
+            self._checksum_thread.join()
+            self._checksum_thread = None
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # Views returned by read() are still alive; the mapping closes with them.
+            self._mmap = None
+        super(DataReader, self)._close()
+
+    def _read(self, nbytes):
+        if self._view is None:
+            return super(DataReader, self)._read(nbytes)
+        assert nbytes
+        block = self._view[self._offset:self._offset + nbytes]
+        if not block:
+            raise EOFError("Unexpected end of bddf file")
+        self._offset += len(block)
+        return block
+
+    def _seek(self, offset, whence=os.SEEK_SET):
+        if self._view is None:
+            self._file.seek(offset, whence)
+        elif whence == os.SEEK_END:
+            self._offset = len(self._view) + offset
+        else:
+            self._offset = offset
+
     def _read_index(self):
-        self._file.seek(-len(END_MAGIC), os.SEEK_END)
+        self._seek(-len(END_MAGIC), os.SEEK_END)
         end_magic = self._read(len(END_MAGIC))
         if end_magic != END_MAGIC:
             raise ParseError("Bad magic bytes at the end of the file.")
-        self._file.seek(-INDEX_OFFSET_OFFSET, os.SEEK_END)
-        self._index_offset, self._checksum = struct.unpack('<QQ', self._read(16))
+        self._seek(-INDEX_OFFSET_OFFSET, os.SEEK_END)
+        (self._index_offset,) = struct.unpack('<Q', self._read(8))
+        self._checksum = bytes(self._read(SHA1_DIGEST_NBYTES))
         if self._index_offset < len(MAGIC):
             raise ParseError('Invalid offset to index: {})'.format(self._index_offset))
-        self._file_index = self._read_desc_block_at("file_index", self._index_offset)
+        self._set_file_index(self._read_desc_block_at("file_index", self._index_offset))
+
+    def _fileno(self):
+        try:
+            return self._file.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return None
+
+    def _run_checksum(self):
+        try:
+            self._read_checksum = self._compute_checksum()
+        except Exception as err:  # pylint: disable=broad-except
+            self._checksum_error = err
+
+    def _compute_checksum(self):
+        """Compute the SHA1 of everything in the file preceding the stored checksum."""
+        hasher = sha1()
+        fileno = self._fileno()
+        if fileno is None:
+            # Not a real file: read it in chunks, then restore the position.
+            position = self._file.tell()
+            end = self._file.seek(0, os.SEEK_END) - SHA1_DIGEST_NBYTES - len(END_MAGIC)
+            self._file.seek(0)
+            for start in range(0, end, CHECKSUM_CHUNK_NBYTES):
+                hasher.update(self._file.read(min(CHECKSUM_CHUNK_NBYTES, end - start)))
+            self._file.seek(position)
+            return hasher.digest()
+
+        # Hash a separate mapping of the file, so this may run on another thread while reading.
+        with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mapping:
+            end = len(mapping) - SHA1_DIGEST_NBYTES - len(END_MAGIC)
+            with memoryview(mapping) as view:
+                for start in range(0, end, CHECKSUM_CHUNK_NBYTES):
+                    if self._checksum_cancel.is_set():
+                        return None
+                    hasher.update(view[start:min(start + CHECKSUM_CHUNK_NBYTES, end)])
+        return hasher.digest()
+
+    def _set_file_index(self, file_index):
+        self._file_index = file_index
         self._spec_index = [{key: value
                              for key, value in desc.spec.items()}
                             for desc in self._file_index.series_identifiers]
@@ -97,7 +393,7 @@ class DataReader(BaseDataReader):  # pylint: disable=too-many-instance-attribute
     def _seek_to(self, location):
         if location < len(MAGIC):
             raise ParseError('Invalid offset for block: {})'.format(location))
-        self._file.seek(location)
+        self._seek(location)
 
     def _read_data_block_at(self, location):
         self._seek_to(location)
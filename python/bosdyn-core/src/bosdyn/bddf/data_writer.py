@@ -9,6 +9,7 @@
 import bosdyn.api.bddf_pb2 as bddf
 
 from .block_writer import BlockWriter
+from .compression import COMPRESSION_ANNOTATION, check_codec, compress
 from .file_indexer import FileIndexer
 
 
@@ -17,17 +18,26 @@ class DataWriter:
 
     # pylint: disable=too-many-arguments
 
-    def __init__(self, outfile, annotations=None):
+    def __init__(self, outfile, annotations=None, buffer_size=0, background_writer=False,
+                 max_queued_buffers=16):
         """
         Args:
          outfile:       a file-like objet for writing binary data (e.g., from open(fname, 'wb')).
          annotations:   optional dict of key (string) -> value (string) pairs.
+         buffer_size:   combine writes into buffers of this many bytes before hashing them and
+                         writing them to outfile (default 0, no buffering).
+         background_writer:  if True, hash and write buffers to outfile on a background thread,
+                              keeping that work off the thread calling write_data().
+         max_queued_buffers: maximum number of buffers waiting for the background thread before
+                              write_data() blocks.
         """
-        self._writer = BlockWriter(outfile)
+        self._writer = BlockWriter(outfile, buffer_size=buffer_size, background=background_writer,
+                                   max_queued_buffers=max_queued_buffers)
         self._indexer = FileIndexer()
         self._annotations = annotations
         self._writer.write_header(annotations)
         self._on_close = []
+        self._series_index_to_compression = {}  # {series_index -> (codec, level)}
 
     def __del__(self):
         self._close()
@@ -44,7 +54,8 @@ class DataWriter:
         return self._indexer.file_index
 
     def add_message_series(self, series_type, series_spec, content_type, type_name,
-                           is_metadata=False, annotations=None, additional_index_names=None):
+                           is_metadata=False, annotations=None, additional_index_names=None,
+                           compression=None, compression_level=None):
         """Add a new series for storing message data.  Message data is variable-sized binary data.
 
         Args:
@@ -59,6 +70,9 @@ class DataWriter:
                           associate with the message channel
          additional_index_names: names of additional timestamps to store with
                                         each message (list of string).
+         compression:   name of the codec with which to compress data blocks (see compression.py),
+                         or None to store data uncompressed.
+         compression_level: codec-specific compression level, or None for the default.
 
         Returns series id (int).
         """
@@ -66,9 +80,11 @@ class DataWriter:
                                                   is_metadata=is_metadata)
         return self.add_series(series_type, series_spec, message_type=message_type,
                                annotations=annotations,
-                               additional_index_names=additional_index_names)
+                               additional_index_names=additional_index_names,
+                               compression=compression, compression_level=compression_level)
 
-    def add_pod_series(self, series_type, series_spec, type_enum, dimension=None, annotations=None):
+    def add_pod_series(self, series_type, series_spec, type_enum, dimension=None, annotations=None,
+                       compression=None, compression_level=None):
         """Add a new series for storing data POD data (float, double, int, etc....).
 
         Args:
@@ -79,14 +95,19 @@ class DataWriter:
                            [3] means vectors of size 3, [4, 4] is a 4x4 matrix, etc....
          annotations:   optional dict of key (string) -> value (string) pairs to
                             associate with the message channel
+         compression:   name of the codec with which to compress data blocks (see compression.py),
+                         or None to store data uncompressed.
+         compression_level: codec-specific compression level, or None for the default.
 
         Returns series id (int).
         """
         pod_type = bddf.PodTypeDescriptor(pod_type=type_enum, dimension=dimension)
-        return self.add_series(series_type, series_spec, pod_type=pod_type, annotations=annotations)
+        return self.add_series(series_type, series_spec, pod_type=pod_type, annotations=annotations,
+                               compression=compression, compression_level=compression_level)
 
     def add_series(self, series_type, series_spec, message_type=None, pod_type=None,
-                   annotations=None, additional_index_names=None):
+                   annotations=None, additional_index_names=None, compression=None,
+                   compression_level=None):
         """Register a new series for messages.
 
         Args:
@@ -98,13 +119,25 @@ class DataWriter:
                             associate with the message channel
          additional_index_names: names of additional timestamps to store with
                                         each message (list of string).
+         compression:   name of the codec with which to compress data blocks (see compression.py),
+                         or None to store data uncompressed.  The codec is recorded in the
+                         series annotations, so readers can decompress the data.
+         compression_level: codec-specific compression level, or None for the default.
 
         Returns series id (int).
 
-        Raises SeriesNotUniqueError if a series matching series_spec is already added.
+        Raises SeriesNotUniqueError if a series matching series_spec is already added,
+               DataFormatError if the compression codec is not available.
         """
-        return self._indexer.add_series(series_type, series_spec, message_type, pod_type,
-                                        annotations, additional_index_names, self._writer)
+        if compression:
+            check_codec(compression)
+            annotations = dict(annotations or {})
+            annotations[COMPRESSION_ANNOTATION] = compression
+        series_index = self._indexer.add_series(series_type, series_spec, message_type, pod_type,
+                                                annotations, additional_index_names, self._writer)
+        if compression:
+            self._series_index_to_compression[series_index] = (compression, compression_level)
+        return series_index
 
     def write_data(self, series_index, timestamp_nsec, data, additional_indexes=None):
         """Store binary data into the file, under a previously-defined channel.
@@ -112,18 +145,29 @@ class DataWriter:
         Args:
          series_index:   integer returned when series was registered with the file.
          timestamp_nsec: nsec since unix epoch to timestamp the data.
-         data:           binary data to store.
+         data:           binary data to store.  If the series was registered with a
+                          compression codec, the data is compressed before it is stored.
          additional_indexes: additional timestamps if needed for this channel.
 
         Raises:
             DataFormatError if the data or additional_indexes are not valid for this series.
         """
+        try:
+            codec, level = self._series_index_to_compression[series_index]
+        except KeyError:
+            pass
+        else:
+            data = compress(codec, data, level)
         self._indexer.index_data_block(series_index, timestamp_nsec, self._writer.tell(), len(data),
                                        additional_indexes)
         data_descriptor = self._indexer.make_data_descriptor(series_index, timestamp_nsec,
                                                              additional_indexes)
         self._writer.write_data_block(data_descriptor, data)
 
+    def flush(self):
+        """Write all buffered data to outfile, waiting for the background writer if needed."""
+        self._writer.flush()
+
     def run_on_close(self, thunk):
         """Register a function to be called when file is closed, before index is written."""
         self._on_close.append(thunk)
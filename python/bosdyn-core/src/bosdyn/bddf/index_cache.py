@@ -0,0 +1,179 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""IndexCache is a sidecar file caching the index of a bddf file."""
+import os
+import tempfile
+
+import numpy as np
+
+import bosdyn.api.bddf_pb2 as bddf
+
+INDEX_CACHE_VERSION = 3
+INDEX_CACHE_SUFFIX = '.idx.npy'
+
+# Layout of the int64 array stored in the sidecar file:
+#  header:        _HEADER_LEN values, see the _H_* indexes below.
+#  series table:  _SERIES_COLS values per series, see the _S_* columns below.
+#  block offsets of all series, concatenated.
+#  block timestamps (nsec) of all series, concatenated.
+#  bytes:         the serialized FileIndex followed by the checksum, padded to 8 bytes.
+_H_VERSION, _H_FILE_SIZE, _H_FILE_MTIME, _H_INDEX_OFFSET, _H_NUM_SERIES, _H_NUM_BLOCKS, \
+    _H_FILE_INDEX_NBYTES, _H_CHECKSUM_NBYTES = range(8)
+_HEADER_LEN = 8
+_S_TOTAL_BYTES, _S_DESCRIPTOR_OFFSET, _S_FIRST_BLOCK, _S_NUM_BLOCKS = range(4)
+_SERIES_COLS = 4
+
+
+class IndexCache:
+    """A sidecar file caching the index of a bddf file, as one memory-mapped numpy array.
+
+    The cache holds the block offsets, block timestamps, total bytes and descriptor offset of
+     every series, plus the serialized FileIndex, so a DataReader can locate data without
+     parsing the index protobufs stored in the bddf file.  Loading the cache maps the file
+     without reading it, and the FileIndex is only parsed when it is first used.  The cache is
+     only valid for a bddf file with the same size and modification time as when the cache
+     was written.
+    """
+
+    def __init__(self, array):
+        self._array = array
+        num_series = int(array[_H_NUM_SERIES])
+        num_blocks = int(array[_H_NUM_BLOCKS])
+        self._series = array[_HEADER_LEN:_HEADER_LEN + num_series * _SERIES_COLS].reshape(
+            num_series, _SERIES_COLS)
+        offsets_start = _HEADER_LEN + num_series * _SERIES_COLS
+        self._offsets = array[offsets_start:offsets_start + num_blocks]
+        self._timestamps = array[offsets_start + num_blocks:offsets_start + 2 * num_blocks]
+        self._bytes = array[offsets_start + 2 * num_blocks:].view(np.uint8)
+        self._file_index = None
+
+    @staticmethod
+    def sidecar_filename(filename):
+        """Return the name of the index cache file for the given bddf file name."""
+        return filename + INDEX_CACHE_SUFFIX
+
+    @staticmethod
+    def _file_key(filename):
+        stat = os.stat(filename)
+        return [INDEX_CACHE_VERSION, stat.st_size, stat.st_mtime_ns]
+
+    @classmethod
+    def load(cls, filename):
+        """Load the index cache for the given bddf file.
+
+        Returns: IndexCache, or None if there is no cache or it is out of date.
+        """
+        try:
+            array = np.load(cls.sidecar_filename(filename), mmap_mode='r')
+            if (array.dtype != np.int64 or array.ndim != 1 or len(array) < _HEADER_LEN or
+                    array[:_H_INDEX_OFFSET].tolist() != cls._file_key(filename)):
+                return None
+            index_cache = cls(array)
+        except (OSError, EOFError, ValueError):
+            return None
+        if (len(index_cache._timestamps) != int(array[_H_NUM_BLOCKS]) or
+                len(index_cache._bytes) < index_cache._bytes_end()):
+            return None
+        return index_cache
+
+    @classmethod
+    def write(cls, data_reader, filename):
+        """Write the index cache for the given bddf file.
+
+        Args:
+         data_reader:  DataReader for the file.
+         filename:     path of the bddf file.
+        """
+        file_index = data_reader.file_index
+        num_series = len(file_index.series_identifiers)
+        series = np.zeros((num_series, _SERIES_COLS), dtype=np.int64)
+        offsets = []
+        timestamps = []
+        num_blocks = 0
+        for series_index in range(num_series):
+            series_block_index = data_reader.series_block_index(series_index)
+            block_entries = series_block_index.block_entries
+            series[series_index] = (series_block_index.total_bytes,
+                                    series_block_index.descriptor_file_offset, num_blocks,
+                                    len(block_entries))
+            num_blocks += len(block_entries)
+            offsets.append(
+                np.fromiter((entry.file_offset for entry in block_entries), dtype=np.int64,
+                            count=len(block_entries)))
+            timestamps.append(
+                np.fromiter((entry.timestamp.ToNanoseconds() for entry in block_entries),
+                            dtype=np.int64, count=len(block_entries)))
+
+        file_index_bytes = file_index.SerializeToString()
+        checksum = data_reader.checksum
+        data = file_index_bytes + (checksum or b'')
+        data += b'\0' * (-len(data) % 8)
+        header = cls._file_key(filename) + [
+            data_reader.index_offset, num_series, num_blocks,
+            len(file_index_bytes), -1 if checksum is None else len(checksum)
+        ]
+        array = np.concatenate([np.array(header, dtype=np.int64), series.ravel()] + offsets +
+                               timestamps + [np.frombuffer(data, dtype=np.int64)])
+
+        # Write to a temporary file first, so readers never see a partial cache.
+        sidecar_filename = cls.sidecar_filename(filename)
+        fd, tmp_filename = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)),
+                                            suffix=INDEX_CACHE_SUFFIX)
+        try:
+            with os.fdopen(fd, 'wb') as outfile:
+                np.save(outfile, array)
+            os.replace(tmp_filename, sidecar_filename)
+        except BaseException:
+            os.unlink(tmp_filename)
+            raise
+
+    def _bytes_end(self):
+        return (int(self._array[_H_FILE_INDEX_NBYTES]) +
+                max(0, int(self._array[_H_CHECKSUM_NBYTES])))
+
+    @property
+    def file_index(self):
+        """Return the FileIndex proto of the bddf file, parsing it on first use."""
+        if self._file_index is None:
+            self._file_index = bddf.FileIndex()
+            self._file_index.ParseFromString(
+                self._bytes[:int(self._array[_H_FILE_INDEX_NBYTES])].tobytes())
+        return self._file_index
+
+    @property
+    def index_offset(self):
+        """Return the offset of the FileIndex descriptor block in the bddf file."""
+        return int(self._array[_H_INDEX_OFFSET])
+
+    @property
+    def checksum(self):
+        """Return the checksum (bytes) read from the end of the bddf file, or None."""
+        checksum_nbytes = int(self._array[_H_CHECKSUM_NBYTES])
+        if checksum_nbytes < 0:
+            return None
+        start = int(self._array[_H_FILE_INDEX_NBYTES])
+        return self._bytes[start:start + checksum_nbytes].tobytes()
+
+    def total_bytes(self, series_index):
+        """Returns the total number of bytes for data in a given series in the file."""
+        return int(self._series[series_index, _S_TOTAL_BYTES])
+
+    def descriptor_file_offset(self, series_index):
+        """Returns the file offset of the SeriesDescriptor of the given series."""
+        return int(self._series[series_index, _S_DESCRIPTOR_OFFSET])
+
+    def block_offsets(self, series_index):
+        """Returns the file offsets of the data blocks in a series, as an int64 array."""
+        return self._series_blocks(self._offsets, series_index)
+
+    def block_timestamps(self, series_index):
+        """Returns the timestamps (nsec) of the data blocks in a series, as an int64 array."""
+        return self._series_blocks(self._timestamps, series_index)
+
+    def _series_blocks(self, blocks, series_index):
+        first_block = int(self._series[series_index, _S_FIRST_BLOCK])
+        return blocks[first_block:first_block + int(self._series[series_index, _S_NUM_BLOCKS])]
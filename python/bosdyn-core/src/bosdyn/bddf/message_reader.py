@@ -97,3 +97,15 @@ class MessageReader:
         Returns: DataTypeDescriptor for channel, timestamp_nsec (int), binary data
         """
         return self._data_reader.read(series_index, index_in_series)
+
+    def read_range(self, series_index, start_nsec, end_nsec):
+        """Generate binary data from messages in a series timestamped in [start_nsec, end_nsec).
+
+        Args:
+         series_index:  index (int) from the series_index() call
+         start_nsec:    nsec since unix epoch of the start of the range (inclusive), or None
+         end_nsec:      nsec since unix epoch of the end of the range (exclusive), or None
+
+        Yields: DataTypeDescriptor for channel, timestamp_nsec (int), binary data
+        """
+        return self._data_reader.read_range(series_index, start_nsec, end_nsec)
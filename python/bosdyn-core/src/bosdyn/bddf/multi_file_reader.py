@@ -0,0 +1,228 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""A class for reading the same series of data from a set of bddf files."""
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+
+from .data_reader import DataReader
+from .file_indexer import FileIndexer
+
+
+def _read_series_from_file(filename, series_index, start_nsec, end_nsec, use_mmap):
+    """Read the blocks of a series in a time range from a file, for use in a worker process.
+
+    Returns: list of (DataDescriptor, timestamp_nsec (int), data (bytes)), in timestamp order.
+    """
+    with DataReader(filename=filename, use_mmap=use_mmap) as data_reader:
+        return [(desc, timestamp_nsec, bytes(data))
+                for desc, timestamp_nsec, data in data_reader.read_range(
+                    series_index, start_nsec, end_nsec)]
+
+
+class MultiFileReader:
+    """A class for reading the same series of data from a set of bddf files.
+
+    Files are opened as they are needed.  Series in different files are considered to be the
+     same series if their SeriesIdentifiers have the same hash.  Reads spanning several files
+     are distributed over a pool of worker processes and merged into a single stream in
+     timestamp order.
+
+    Methods raise ParseError if there is a problem with the format of a file.
+    """
+
+    def __init__(self, filenames, max_workers=None, use_mmap=False):
+        """
+        Args:
+         filenames:    list of paths of bddf files.
+         max_workers:  maximum number of worker processes for reading (default is the number of
+                        processors).  If 0, all reading is done in the calling process.
+         use_mmap:     if True, memory-map files when reading them.
+        """
+        self._filenames = list(filenames)
+        self._max_workers = max_workers
+        self._use_mmap = use_mmap
+        self._data_readers = {}  # {file_index -> DataReader}
+        self._series_hash_to_locations = None  # {series hash -> [(file_index, series_index)]}
+        self._series_hash_to_identifier = {}  # {series hash -> SeriesIdentifier}
+        self._executor = None
+
+    def __del__(self):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_, value_, tb_):
+        self.close()
+
+    def close(self):
+        """Close all open files and shut down the worker processes."""
+        for data_reader in self._data_readers.values():
+            data_reader.close()
+        self._data_readers = {}
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    @property
+    def filenames(self):
+        """Return the list of file names in the set."""
+        return self._filenames
+
+    def data_reader(self, file_index):
+        """Return the DataReader for the file at the given index in filenames, opening it if
+        necessary."""
+        try:
+            return self._data_readers[file_index]
+        except KeyError:
+            pass
+        data_reader = DataReader(filename=self._filenames[file_index], use_mmap=self._use_mmap)
+        self._data_readers[file_index] = data_reader
+        return data_reader
+
+    @property
+    def series_hashes(self):
+        """Return the list of series hashes (int) in the set, in order of first appearance."""
+        return list(self._series_locations())
+
+    def series_identifier(self, series_hash):
+        """Return the SeriesIdentifier for the series with the given hash.
+
+        Raises KeyError if no such series exists.
+        """
+        self._series_locations()
+        return self._series_hash_to_identifier[series_hash]
+
+    def series_locations(self, series_hash):
+        """Return the list of (file_index, series_index) for the series with the given hash.
+
+        Raises KeyError if no such series exists.
+        """
+        return self._series_locations()[series_hash]
+
+    def series_descriptor(self, series_hash):
+        """Return the SeriesDescriptor of the series with the given hash, from the first file
+        in which it appears.
+
+        Raises KeyError if no such series exists.
+        """
+        file_index, series_index = self.series_locations(series_hash)[0]
+        return self.data_reader(file_index).series_descriptor(series_index)
+
+    def series_spec_to_hash(self, series_type, series_spec):
+        """Given a series type and spec (map {key -> value}), return the hash for that series."""
+        for series_hash, series_identifier in self._series_identifiers():
+            if (series_identifier.series_type == series_type and
+                    dict(series_identifier.spec) == series_spec):
+                return series_hash
+        raise KeyError("No series with series_type={} and series_spec={}".format(
+            series_type, series_spec))
+
+    def channel_series_hash(self, channel_name, message_type=None):
+        """Return the hash of the message series for the given channel.
+
+        Args:
+         channel_name: name of the channel of messages.
+         message_type: specify message type, if channel may have multiple
+                        kinds of messages (optional)
+
+        Raises KeyError if no such series exists.
+        """
+        for series_hash, series_identifier in self._series_identifiers():
+            if series_identifier.spec.get("bosdyn:channel") != channel_name:
+                continue
+            series_descriptor = self.series_descriptor(series_hash)
+            if series_descriptor.WhichOneof("DataType") != "message_type":
+                continue
+            if message_type is None or message_type == series_descriptor.message_type.type_name:
+                return series_hash
+        raise KeyError("No series with channel_name={} and message_type={}".format(
+            channel_name, message_type))
+
+    def num_data_blocks(self, series_hash):
+        """Returns the number of data blocks for a given series, over all files."""
+        return sum(
+            self.data_reader(file_index).num_data_blocks(series_index)
+            for file_index, series_index in self.series_locations(series_hash))
+
+    def read_series(self, series_hash, start_nsec=None, end_nsec=None):
+        """Generate the data blocks of a series from all files, in timestamp order.
+
+        Each file is read by a worker process.  The results for each file are held in memory
+         until they are merged into the output.
+
+        Args:
+         series_hash:  hash (int) identifying the series.
+         start_nsec:   nsec since unix epoch of the start of the range (inclusive), or None.
+         end_nsec:     nsec since unix epoch of the end of the range (exclusive), or None.
+
+        Yields: DataDescriptor, timestamp_nsec (int), binary data
+        """
+        locations = self.series_locations(series_hash)
+        if self._max_workers == 0:
+            per_file = [
+                self.data_reader(file_index).read_range(series_index, start_nsec, end_nsec)
+                for file_index, series_index in locations
+            ]
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+            futures = [
+                self._executor.submit(_read_series_from_file, self._filenames[file_index],
+                                      series_index, start_nsec, end_nsec, self._use_mmap)
+                for file_index, series_index in locations
+            ]
+            per_file = [self._future_blocks(future) for future in futures]
+        return heapq.merge(*per_file, key=lambda block: block[1])
+
+    def read_channel(self, protobuf_type, channel_name=None, start_nsec=None, end_nsec=None):
+        """Generate the protobuf messages of a channel from all files, in timestamp order.
+
+        Args:
+         protobuf_type: class of the protobuf we want to deserialize.
+         channel_name:  name of the channel, defaulting to the full name of the protobuf type.
+         start_nsec:    nsec since unix epoch of the start of the range (inclusive), or None.
+         end_nsec:      nsec since unix epoch of the end of the range (exclusive), or None.
+
+        Yields: timestamp_nsec (int), deserialized protobuf object
+        """
+        type_name = protobuf_type.DESCRIPTOR.full_name
+        series_hash = self.channel_series_hash(channel_name or type_name, message_type=type_name)
+        for _desc, timestamp_nsec, data in self.read_series(series_hash, start_nsec, end_nsec):
+            protobuf = protobuf_type()
+            protobuf.ParseFromString(data)
+            yield timestamp_nsec, protobuf
+
+    @staticmethod
+    def _future_blocks(future):
+        yield from future.result()
+
+    def _series_identifiers(self):
+        self._series_locations()
+        return self._series_hash_to_identifier.items()
+
+    def _series_locations(self):
+        if self._series_hash_to_locations is not None:
+            return self._series_hash_to_locations
+        self._series_hash_to_locations = {}
+        for file_index, filename in enumerate(self._filenames):
+            # Only the index is needed, so the file is not kept open unless it is already.
+            if file_index in self._data_readers:
+                file_index_proto = self._data_readers[file_index].file_index
+            else:
+                with DataReader(filename=filename) as data_reader:
+                    file_index_proto = data_reader.file_index
+            hashes = file_index_proto.series_identifier_hashes
+            for series_index, series_identifier in enumerate(file_index_proto.series_identifiers):
+                if len(hashes) > series_index:
+                    series_hash = hashes[series_index]
+                else:
+                    series_hash = FileIndexer.series_identifier_to_hash(series_identifier)
+                self._series_hash_to_identifier.setdefault(series_hash, series_identifier)
+                self._series_hash_to_locations.setdefault(series_hash, []).append(
+                    (file_index, series_index))
+        return self._series_hash_to_locations
@@ -8,7 +8,9 @@
 import struct
 from itertools import product
 
-from .common import POD_TYPE_TO_NUM_BYTES, POD_TYPE_TO_STRUCT, ParseError
+import numpy as np
+
+from .common import POD_TYPE_TO_DTYPE, POD_TYPE_TO_NUM_BYTES, POD_TYPE_TO_STRUCT, ParseError
 
 
 class PodSeriesReader:
@@ -31,6 +33,8 @@ class PodSeriesReader:
             self._num_values_per_sample *= dim
         pod_type = self._pod_type.pod_type
         self._bytes_per_sample = POD_TYPE_TO_NUM_BYTES[pod_type] * self._num_values_per_sample
+        self._dtype = np.dtype(POD_TYPE_TO_DTYPE[pod_type])
+        self._sample_shape = tuple(self._pod_type.dimension)
         self._num_data_blocks = None
 
     @property
@@ -50,11 +54,7 @@ class PodSeriesReader:
             self._num_data_blocks = self._data_reader.num_data_blocks(self._series_index)
         return self._num_data_blocks
 
-    def read_samples(self, index_in_series):
-        """Return the POD data values from the data block of the given index.
-
-        Returns: timestamp_nsec (int), POD data values (array of (array ... (of POD values)))
-        """
+    def _read_block_data(self, index_in_series):
         _desc, timestamp_nsec, data = self._data_reader.read(self._series_index, index_in_series)
         num_samples = len(data) // self._bytes_per_sample
         expected_size = num_samples * self._bytes_per_sample
@@ -62,6 +62,47 @@ class PodSeriesReader:
             raise ParseError('{} idx={} expect {} elements but got {})'.format(
                 self._series_descriptor.series_identifier, index_in_series, expected_size,
                 len(data)))
+        return timestamp_nsec, num_samples, data
+
+    def read_samples_array(self, index_in_series):
+        """Return the POD data values from the data block of the given index as a numpy array.
+
+        The returned array is read-only, and may share memory with the underlying data reader.
+
+        Returns: timestamp_nsec (int), numpy array of shape (num_samples,) + dimension
+        """
+        timestamp_nsec, num_samples, data = self._read_block_data(index_in_series)
+        values = np.frombuffer(data, dtype=self._dtype)
+        return timestamp_nsec, values.reshape((num_samples,) + self._sample_shape)
+
+    def read_all_array(self):
+        """Return the POD data values from all data blocks in the series as numpy arrays.
+
+        The data blocks are concatenated into a single array of samples.  Samples are not
+         individually timestamped in the file, so each sample is given the timestamp of the
+         data block which contains it.
+
+        Returns: timestamps_nsec (int64 array of shape (num_samples,)),
+                 values (array of shape (num_samples,) + dimension)
+        """
+        block_timestamps = np.empty(self.num_data_blocks, dtype=np.int64)
+        block_num_samples = np.empty(self.num_data_blocks, dtype=np.int64)
+        blocks = []
+        for index_in_series in range(self.num_data_blocks):
+            timestamp_nsec, num_samples, data = self._read_block_data(index_in_series)
+            block_timestamps[index_in_series] = timestamp_nsec
+            block_num_samples[index_in_series] = num_samples
+            blocks.append(data)
+        values = np.frombuffer(b''.join(blocks), dtype=self._dtype)
+        values = values.reshape((len(values) // self._num_values_per_sample,) + self._sample_shape)
+        return np.repeat(block_timestamps, block_num_samples), values
+
+    def read_samples(self, index_in_series):
+        """Return the POD data values from the data block of the given index.
+
+        Returns: timestamp_nsec (int), POD data values (array of (array ... (of POD values)))
+        """
+        timestamp_nsec, num_samples, data = self._read_block_data(index_in_series)
 
         num_values = num_samples * self._num_values_per_sample
         format_str = '<{}{}'.format(num_values, POD_TYPE_TO_STRUCT[self._pod_type.pod_type])
@@ -12,11 +12,15 @@ from .common import POD_TYPE_TO_NUM_BYTES, POD_TYPE_TO_STRUCT, DataFormatError
 
 
 class PodSeriesWriter:  # pylint: disable=too-many-instance-attributes
-    """A class to assist with writing POD data values into a series, within a DataWriter."""
+    """A class to assist with writing POD data values into a series, within a DataWriter.
+
+    If compression names a codec (see compression.py), each data block of samples is
+     compressed with that codec before it is stored.
+    """
 
     def __init__(  # pylint: disable=too-many-arguments
             self, data_writer, series_type, series_spec, pod_type, dimensions=None,
-            annotations=None, data_block_size=2048):
+            annotations=None, data_block_size=2048, compression=None, compression_level=None):
         self._data_writer = data_writer
         self._series_type = series_type
         self._series_spec = series_spec
@@ -25,14 +29,16 @@ class PodSeriesWriter:  # pylint: disable=too-many-instance-attributes
         self._series_index = self._data_writer.add_pod_series(self.series_type, self.series_spec,
                                                               type_enum=self._pod_type,
                                                               dimension=self._dimensions,
-                                                              annotations=annotations)
+                                                              annotations=annotations,
+                                                              compression=compression,
+                                                              compression_level=compression_level)
 
         self._data_block_size = data_block_size
         self._num_values_per_sample = 1
         for dim in self._dimensions:
             self._num_values_per_sample *= dim
         self._bytes_per_sample = POD_TYPE_TO_NUM_BYTES[pod_type] * self._num_values_per_sample
-        self._block = b''
+        self._block = bytearray()
         self._timestamp_nsec = None
         self._format_str = '<{}{}'.format(self._num_values_per_sample, POD_TYPE_TO_STRUCT[pod_type])
         self._data_writer.run_on_close(self.finish_block)
@@ -60,22 +66,19 @@ class PodSeriesWriter:  # pylint: disable=too-many-instance-attributes
         if not self._block:
             # New block, starts with current timestamp.
             self._timestamp_nsec = timestamp_nsec
-            self._block = serialized_sample
-        else:
-            # Add data to pre-existing block
-            self._block += serialized_sample
+        self._block += serialized_sample
 
         if len(self._block) + self._bytes_per_sample > self._data_block_size:
             # No room for more samples before the data must be written.
             self._data_writer.write_data(self._series_index, self._timestamp_nsec, self._block)
-            self._block = b''
+            self._block = bytearray()
 
     def finish_block(self):
         """If there are samples which haven't been written to the file, write them now."""
         if not self._block:
             return
         self._data_writer.write_data(self._series_index, self._timestamp_nsec, self._block)
-        self._block = b''
+        self._block = bytearray()
 
     @property
     def series_type(self):
@@ -47,6 +47,21 @@ class ProtobufChannelReader:
                                                                   index_in_series)
         return timestamp, msg
 
+    def read_range(self, start_nsec, end_nsec):
+        """Generate the messages in the series timestamped in [start_nsec, end_nsec).
+
+        Args:
+         start_nsec:  nsec since unix epoch of the start of the range (inclusive), or None
+         end_nsec:    nsec since unix epoch of the end of the range (exclusive), or None
+
+        Yields: timestamp_nsec (int), deserialized protobuf object
+        """
+        for _desc, timestamp, data in self._protobuf_reader.read_range(
+                self._series_index, start_nsec, end_nsec):
+            protobuf = self._protobuf_type()
+            protobuf.ParseFromString(data)
+            yield timestamp, protobuf
+
     def __iter__(self):
         return ProtobufChannelReader.Iterator(self)
 
@@ -5,34 +5,47 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Data reader which reads the file format from a stream, without seeking."""
+import os
+import struct
+import time
 from hashlib import sha1
 
 from .base_data_reader import BaseDataReader
-from .common import ParseError
+from .common import (BLOCK_HEADER_SIZE_MASK, BLOCK_HEADER_TYPE_MASK, CHECKSUM_VERIFY_NONE,
+                     CHECKSUM_VERIFY_STRICT, DATA_BLOCK_TYPE, END_BLOCK_TYPE, ParseError)
+from .compression import decompress, series_compression
 from .file_indexer import FileIndexer
 
 
 class StreamDataReader(BaseDataReader):
-    """Data reader which reads the file format from a stream, without seeking."""
+    """Data reader which reads the file format from a stream, without seeking.
 
-    def __init__(self, outfile):
+    Unless checksum_mode is CHECKSUM_VERIFY_NONE, the checksum is computed as the stream is
+     read and verified when the end of the stream is reached.  CHECKSUM_VERIFY_LAZY and
+     CHECKSUM_VERIFY_STRICT behave the same way for streams.
+    """
+
+    def __init__(self, outfile, checksum_mode=CHECKSUM_VERIFY_STRICT):
         """
         Args:
-         outfile:      binary file-like object for reading (e.g., from open(fname, "rb")).
+         outfile:        binary file-like object for reading (e.g., from open(fname, "rb")).
+         checksum_mode:  how to verify the file checksum (one of the CHECKSUM_VERIFY_* modes).
         """
-        self._hasher = sha1()  # This computes a checksum
-        super(StreamDataReader, self).__init__(outfile)
+        # This computes a checksum
+        self._hasher = None if checksum_mode == CHECKSUM_VERIFY_NONE else sha1()
+        super(StreamDataReader, self).__init__(outfile, checksum_mode=checksum_mode)
         self._indexer = FileIndexer()
         self._series_index_to_block_index = {}  # {series_index -> SeriesBlockIndex}
 
     def _read(self, nbytes):
         block = BaseDataReader._read(self, nbytes)
-        self._hasher.update(block)
+        if self._hasher is not None:
+            self._hasher.update(block)
         return block
 
     @property
     def read_checksum(self):
-        """64-bit checksum read from the end of the file, or None if not yet read."""
+        """160-bit checksum computed from the stream, or None if not yet computed."""
         return self._read_checksum
 
     @property
@@ -41,6 +54,8 @@ class StreamDataReader(BaseDataReader):
         return self._indexer.file_index
 
     def _computed_checksum(self):
+        if self._hasher is None:
+            return None
         return self._hasher.digest()
 
     def series_descriptor(self, series_index):
@@ -70,7 +85,10 @@ class StreamDataReader(BaseDataReader):
         Returns: True, DataDescriptor, data (bytes)   for data block
         Returns: False, DescriptorBlock, None         for descriptor block
 
+        Data of compressed series is decompressed.
+
         Raises ParseError if there is a problem with the format of the file,
+               DataError if a compressed data block cannot be decompressed,
                EOFError if the end of the file is reached.
         """
         file_offset = self._file.tell()
@@ -82,6 +100,9 @@ class StreamDataReader(BaseDataReader):
         if is_data:
             self._indexer.index_data_block(desc.series_index, desc.timestamp.ToNanoseconds(),
                                            len(data), file_offset, desc.additional_indexes)
+            codec = series_compression(self.series_descriptor(desc.series_index))
+            if codec:
+                data = decompress(codec, data)
         else:
             desc_type = desc.WhichOneof("DescriptorType")
             if desc_type == 'file_index':
@@ -99,6 +120,67 @@ class StreamDataReader(BaseDataReader):
                 raise ParseError("Unknown DescriptorType %s" % desc_type)
         return is_data, desc, data
 
+    def follow(self, poll_interval_sec=0.1, timeout_sec=None, stop_event=None):
+        """Generate data blocks from a file which is still being written, as they are written.
+
+        Blocks are only read once they are completely in the file.  When the reader catches up
+         with the writer, it polls the file for new data every poll_interval_sec, resuming
+         from the start of the first incomplete block.  This requires the file to be seekable.
+         Data which has already been read is never read again.
+
+        The generator finishes when the end of the file is read, when no new data is written
+         for timeout_sec (if not None), or when stop_event (a threading.Event) is set.
+
+        Args:
+         poll_interval_sec:  time (sec) between checks for new data.
+         timeout_sec:        maximum time (sec) to wait for new data, or None to wait forever.
+         stop_event:         optional threading.Event to signal the generator to finish.
+
+        Yields: DataDescriptor, timestamp_nsec (int), data (bytes)
+
+        Raises ParseError if there is a problem with the format of the file.
+        """
+        last_data_time = time.monotonic()
+        while not self._eof:
+            if stop_event is not None and stop_event.is_set():
+                return
+            if not self._next_block_complete():
+                if timeout_sec is not None and time.monotonic() - last_data_time > timeout_sec:
+                    return
+                if stop_event is not None:
+                    stop_event.wait(poll_interval_sec)
+                else:
+                    time.sleep(poll_interval_sec)
+                continue
+            last_data_time = time.monotonic()
+            try:
+                is_data, desc, data = self.read_next_block()
+            except EOFError:
+                return
+            if is_data:
+                yield desc, desc.timestamp.ToNanoseconds(), data
+
+    def _next_block_complete(self):
+        """Return True if the whole of the next block is in the file, without consuming it."""
+        start = self._file.tell()
+        try:
+            header = self._file.read(8)
+            if len(header) < 8:
+                return False
+            (block_header,) = struct.unpack('<Q', header)
+            block_type = (block_header & BLOCK_HEADER_TYPE_MASK) >> 56
+            if block_type == END_BLOCK_TYPE:
+                # The index offset and the checksum follow the block header.
+                block_nbytes = 8 + self._file_descriptor.checksum_num_bytes
+            elif block_type == DATA_BLOCK_TYPE:
+                # The descriptor size precedes the descriptor and data.
+                block_nbytes = 4 + (block_header & BLOCK_HEADER_SIZE_MASK)
+            else:
+                block_nbytes = block_header & BLOCK_HEADER_SIZE_MASK
+            return self._file.seek(0, os.SEEK_END) >= start + 8 + block_nbytes
+        finally:
+            self._file.seek(start)
+
     @property
     def series_block_indexes(self):
         """Returns the current list of SeriesBlockIndexes: series_index -> SeriesBlockIndex."""
@@ -12,6 +12,7 @@ import re
 import sys
 import time
 
+import numpy as np
 from google.protobuf.duration_pb2 import Duration
 from google.protobuf.timestamp_pb2 import Timestamp
 
@@ -325,10 +326,28 @@ class RobotTimeConverter:
     """Converts times in the local system clock to times in the robot clock.
 
     Conversions are made given an estimate of clock skew from the local clock to the robot clock.
+    If the rate at which the skew changes (drift) is also known, the skew is extrapolated from
+    the local time at which it was estimated.
+
+    Args:
+      robot_clock_skew_nsec:  Robot clock minus local clock, in nanoseconds.
+      drift:                  Change of the skew per unit of local time (e.g. 1e-6 for 1 ppm).
+      reference_local_nsec:   Local time (nanoseconds) at which the skew was estimated.
     """
 
-    def __init__(self, robot_clock_skew_nsec):
+    def __init__(self, robot_clock_skew_nsec, drift=0.0, reference_local_nsec=0):
         self._clock_skew_nsec = robot_clock_skew_nsec
+        self._drift = drift
+        self._reference_local_nsec = reference_local_nsec
+
+    def clock_skew_nsec(self, local_time_nsecs=None):
+        """Returns the clock skew (integer nanoseconds) at a local time, by default now."""
+        if not self._drift:
+            return self._clock_skew_nsec
+        if local_time_nsecs is None:
+            local_time_nsecs = now_nsec()
+        return self._clock_skew_nsec + int(
+            round(self._drift * (local_time_nsecs - self._reference_local_nsec)))
 
     def robot_timestamp_from_local_nsecs(self, local_time_nsecs):
         """Returns a robot-clock Timestamp proto for a local time in nanoseconds.
@@ -336,7 +355,40 @@ class RobotTimeConverter:
         Args:
           local_time_nsecs:  Local system time, in integer of nanoseconds from the unix epoch.
         """
-        return nsec_to_timestamp(local_time_nsecs + self._clock_skew_nsec)
+        return nsec_to_timestamp(local_time_nsecs + self.clock_skew_nsec(local_time_nsecs))
+
+    def robot_nsecs_from_local_nsecs(self, local_time_nsecs):
+        """Returns robot times for many local times, in integer nanoseconds from the unix epoch.
+
+        Args:
+          local_time_nsecs:  Local system times, as an array (e.g. numpy int64) of integer
+                             nanoseconds from the unix epoch.
+
+        Returns: numpy int64 array of robot times, with the shape of local_time_nsecs.
+        """
+        local_time_nsecs = np.asarray(local_time_nsecs, dtype=np.int64)
+        if not self._drift:
+            return local_time_nsecs + np.int64(self._clock_skew_nsec)
+        drift_nsecs = np.rint(self._drift * (local_time_nsecs - self._reference_local_nsec))
+        return local_time_nsecs + (self._clock_skew_nsec + drift_nsecs.astype(np.int64))
+
+    def local_nsecs_from_robot_nsecs(self, robot_time_nsecs):
+        """Returns local times for many robot times, in integer nanoseconds from the unix epoch.
+
+        Inverse of robot_nsecs_from_local_nsecs().
+
+        Args:
+          robot_time_nsecs:  Robot times, as an array of integer nanoseconds from the unix epoch.
+
+        Returns: numpy int64 array of local times, with the shape of robot_time_nsecs.
+        """
+        robot_time_nsecs = np.asarray(robot_time_nsecs, dtype=np.int64)
+        local_time_nsecs = robot_time_nsecs - np.int64(self._clock_skew_nsec)
+        if not self._drift:
+            return local_time_nsecs
+        # The skew at the local times, approximated by the skew at robot time minus the skew.
+        return robot_time_nsecs - (self.robot_nsecs_from_local_nsecs(local_time_nsecs) -
+                                   local_time_nsecs)
 
     def robot_timestamp_from_local_secs(self, local_time_secs):
         """Returns a robot-clock Timestamp proto for a local time in seconds.
@@ -369,4 +421,4 @@ class RobotTimeConverter:
         Args:
           local_time_secs:  Local system time, in seconds from the unix epoch.
         """
-        return local_time_secs + nsec_to_sec(self._clock_skew_nsec)
+        return local_time_secs + nsec_to_sec(self.clock_skew_nsec(sec_to_nsec(local_time_secs)))
@@ -7,18 +7,27 @@
 """Test code for bosdyn.bddf"""
 from __future__ import print_function
 
+import io
 import os
+import shutil
+import struct
 import tempfile
 
+import numpy as np
 import pytest
 from google.protobuf.timestamp_pb2 import Timestamp
 
 import bosdyn.api.bddf_pb2 as bddf
 import bosdyn.api.robot_id_pb2 as robot_id
+import bosdyn.api.robot_state_pb2 as robot_state
 from bosdyn.api.data_buffer_pb2 import OperatorComment
-from bosdyn.bddf import (DataReader, DataWriter, GrpcReader, GrpcServiceWriter, PodSeriesReader,
-                         PodSeriesWriter, ProtobufChannelReader, ProtobufReader,
-                         ProtobufSeriesWriter, StreamDataReader)
+from bosdyn.bddf import (CHECKSUM_VERIFY_LAZY, CHECKSUM_VERIFY_NONE, CHECKSUM_VERIFY_STRICT,
+                         COMPRESSION_ANNOTATION, COMPRESSION_LZMA, COMPRESSION_ZLIB,
+                         ChecksumError, DataFormatError, DataReader, DataWriter, GrpcReader,
+                         GrpcServiceWriter,
+                         MultiFileReader, PodSeriesReader, PodSeriesWriter, ProtobufChannelReader,
+                         ProtobufColumnExporter, ProtobufReader, ProtobufSeriesWriter,
+                         StreamDataReader, load_columns, save_columns)
 from bosdyn.util import now_nsec, now_timestamp, nsec_to_timestamp, timestamp_to_nsec
 
 
@@ -192,3 +201,502 @@ def test_grpc_read_write():
         nsec, msg = proto_reader.get_message(0)
         assert msg == response
         assert nsec_to_timestamp(nsec) == msg.header.response_timestamp
+
+
+def test_mmap_read():
+    """Test reading a file through a memory-mapping of the file."""
+    filename = os.path.join(tempfile.gettempdir(), 'test_mmap.bddf')
+    timestamp_nsec = now_nsec()
+    msg_data = b'This is some data'
+    operator_message = OperatorComment(message="End of test", timestamp=now_timestamp())
+
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        series_index = data_writer.add_message_series('bosdyn/test/1', {'channel': 'channel_a'},
+                                                      'text/plain', 'test_type')
+        for idx in range(3):
+            data_writer.write_data(series_index, timestamp_nsec + idx, msg_data * (idx + 1))
+        proto_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+        proto_writer.write(timestamp_to_nsec(operator_message.timestamp), operator_message)
+
+    with DataReader(filename=filename, use_mmap=True) as data_reader:
+        assert data_reader.is_mmap
+        assert data_reader.version.major_version == 1
+        assert data_reader.num_data_blocks(series_index) == 3
+        for idx in range(3):
+            _desc, timestamp_, data_ = data_reader.read(series_index, idx)
+            assert isinstance(data_, memoryview)
+            assert timestamp_ == timestamp_nsec + idx
+            assert data_ == msg_data * (idx + 1)
+
+        proto_reader = ProtobufReader(data_reader)
+        operator_message_reader = ProtobufChannelReader(proto_reader, OperatorComment)
+        timestamp_, protobuf = operator_message_reader.get_message(0)
+        assert protobuf == operator_message
+        assert timestamp_ == timestamp_to_nsec(operator_message.timestamp)
+
+    # Data returned from the reader outlives the reader.
+    assert data_ == msg_data * 3
+
+    with open(filename, 'rb') as infile, DataReader(infile) as data_reader:
+        assert not data_reader.is_mmap
+
+    os.unlink(filename)
+
+
+def test_pod_read_array():
+    """Test reading POD data into numpy arrays."""
+    filename = os.path.join(tempfile.gettempdir(), 'test_pod_array.bddf')
+    timestamp_nsec = now_nsec()
+    scalar_spec = {'varname': 'scalar'}
+    vector_spec = {'varname': 'vector'}
+
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        scalar_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', scalar_spec,
+                                        bddf.TYPE_INT16, data_block_size=8)
+        for val in range(10):
+            scalar_writer.write(timestamp_nsec + val, val)
+        vector_index = data_writer.add_pod_series('bosdyn/test/pod', vector_spec,
+                                                  bddf.TYPE_FLOAT64, dimension=[3])
+        for block_start in (0, 5):
+            data_writer.write_data(
+                vector_index, timestamp_nsec + block_start,
+                b''.join(
+                    struct.pack('<3d', val, val * 2, val * 3)
+                    for val in range(block_start, block_start + 5)))
+
+    for use_mmap in (False, True):
+        with DataReader(filename=filename, use_mmap=use_mmap) as data_reader:
+            scalar_reader = PodSeriesReader(data_reader, scalar_spec)
+            assert scalar_reader.num_data_blocks == 3
+            timestamp_, samples = scalar_reader.read_samples_array(1)
+            assert timestamp_ == timestamp_nsec + 4
+            assert samples.dtype == np.int16
+            assert samples.tolist() == [4, 5, 6, 7]
+            assert samples.tolist() == scalar_reader.read_samples(1)[1]
+
+            timestamps, values = scalar_reader.read_all_array()
+            assert timestamps.dtype == np.int64
+            assert values.tolist() == list(range(10))
+            assert timestamps.tolist() == [timestamp_nsec + (val // 4) * 4 for val in range(10)]
+
+            vector_reader = PodSeriesReader(data_reader, vector_spec)
+            timestamps, values = vector_reader.read_all_array()
+            assert values.shape == (10, 3)
+            assert values.dtype == np.float64
+            assert values[:, 2].tolist() == [float(val * 3) for val in range(10)]
+            assert timestamps.tolist() == [timestamp_nsec + (val // 5) * 5 for val in range(10)]
+
+    os.unlink(filename)
+
+
+def test_read_range():
+    """Test reading the messages of a series within a time range."""
+    filename = os.path.join(tempfile.gettempdir(), 'test_range.bddf')
+    start_nsec = now_nsec()
+    timestamps = [start_nsec + idx * 10 for idx in range(10)]
+    # Write one message out of time-order.
+    timestamps[4], timestamps[5] = timestamps[5], timestamps[4]
+
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        proto_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+        for idx, timestamp_nsec in enumerate(timestamps):
+            proto_writer.write(timestamp_nsec, OperatorComment(message=str(idx)))
+
+    with DataReader(filename=filename) as data_reader:
+        proto_reader = ProtobufReader(data_reader)
+        series_index = proto_reader.series_index(OperatorComment.DESCRIPTOR.full_name)
+        assert data_reader.series_timestamps(series_index).tolist() == timestamps
+        assert data_reader.block_indexes_in_range(series_index, start_nsec + 30,
+                                                  start_nsec + 60).tolist() == [3, 5, 4]
+        assert data_reader.block_indexes_in_range(series_index, start_nsec + 91,
+                                                  None).tolist() == []
+        assert len(data_reader.block_indexes_in_range(series_index, None, None)) == 10
+
+        channel_reader = ProtobufChannelReader(proto_reader, OperatorComment)
+        messages = list(channel_reader.read_range(start_nsec + 30, start_nsec + 60))
+        assert [msg.message for _, msg in messages] == ['3', '5', '4']
+        assert [nsec for nsec, _ in messages] == [start_nsec + 30, start_nsec + 40, start_nsec + 50]
+        assert list(channel_reader.read_range(start_nsec + 200, start_nsec + 300)) == []
+
+        blobs = list(proto_reader.read_range(series_index, None, start_nsec + 10))
+        assert len(blobs) == 1
+        assert blobs[0][1] == start_nsec
+
+    os.unlink(filename)
+
+
+@pytest.mark.parametrize('buffer_size,background_writer', [(64, False), (4096, False), (0, True),
+                                                           (64, True)])
+def test_buffered_write(buffer_size, background_writer):
+    """Test that buffered and background writing produce the same file as unbuffered writing."""
+    timestamp_nsec = now_nsec()
+
+    def _write_file(filename, **kwargs):
+        with open(filename, 'wb') as outfile, DataWriter(outfile, **kwargs) as data_writer:
+            series_index = data_writer.add_message_series('bosdyn/test/1', {'channel': 'a'},
+                                                          'text/plain', 'test_type')
+            pod_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', {'varname': 'var'},
+                                         bddf.TYPE_FLOAT64, data_block_size=64)
+            for idx in range(100):
+                data_writer.write_data(series_index, timestamp_nsec + idx, b'x' * (idx + 1))
+                pod_writer.write(timestamp_nsec + idx, float(idx))
+            data_writer.flush()
+
+    filename = os.path.join(tempfile.gettempdir(), 'test_unbuffered.bddf')
+    buffered_filename = os.path.join(tempfile.gettempdir(), 'test_buffered.bddf')
+    _write_file(filename)
+    _write_file(buffered_filename, buffer_size=buffer_size, background_writer=background_writer)
+
+    with open(filename, 'rb') as infile, open(buffered_filename, 'rb') as buffered_infile:
+        assert infile.read() == buffered_infile.read()
+
+    with open(buffered_filename, 'rb') as infile, StreamDataReader(infile) as data_reader:
+        while True:
+            try:
+                data_reader.read_data_block()
+            except EOFError:
+                break
+        assert data_reader.checksum == data_reader.read_checksum
+
+    with DataReader(filename=buffered_filename) as data_reader:
+        assert data_reader.num_data_blocks(0) == 100
+        _desc, timestamp_, data_ = data_reader.read(0, 99)
+        assert timestamp_ == timestamp_nsec + 99
+        assert data_ == b'x' * 100
+
+    os.unlink(filename)
+    os.unlink(buffered_filename)
+
+
+@pytest.mark.parametrize('max_workers', [0, 2])
+def test_multi_file_read(max_workers):
+    """Test reading a channel across several files."""
+    start_nsec = now_nsec()
+    filenames = [
+        os.path.join(tempfile.gettempdir(), 'test_multi_{}.bddf'.format(idx)) for idx in range(3)
+    ]
+    for file_idx, filename in enumerate(filenames):
+        with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+            if file_idx == 1:
+                # Series are at different indexes in different files.
+                data_writer.add_message_series('bosdyn/test/1', {'channel': 'a'}, 'text/plain',
+                                               'test_type')
+            proto_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+            # Timestamps interleave across files.
+            for idx in range(file_idx, 12, 3):
+                proto_writer.write(start_nsec + idx, OperatorComment(message=str(idx)))
+
+    with MultiFileReader(filenames, max_workers=max_workers) as multi_reader:
+        assert len(multi_reader.series_hashes) == 2
+        # Reading the indexes does not leave the files open.
+        assert not multi_reader._data_readers  # pylint: disable=protected-access
+        series_hash = multi_reader.channel_series_hash(OperatorComment.DESCRIPTOR.full_name)
+        assert multi_reader.series_locations(series_hash) == [(0, 0), (1, 1), (2, 0)]
+        assert multi_reader.num_data_blocks(series_hash) == 12
+        assert multi_reader.series_spec_to_hash(
+            'bosdyn:channel', {'bosdyn:channel': OperatorComment.DESCRIPTOR.full_name}) == series_hash
+
+        messages = list(multi_reader.read_channel(OperatorComment))
+        assert [nsec for nsec, _ in messages] == [start_nsec + idx for idx in range(12)]
+        assert [msg.message for _, msg in messages] == [str(idx) for idx in range(12)]
+
+        blocks = list(multi_reader.read_series(series_hash, start_nsec + 4, start_nsec + 7))
+        assert [nsec for _, nsec, _ in blocks] == [start_nsec + 4, start_nsec + 5, start_nsec + 6]
+
+    for filename in filenames:
+        os.unlink(filename)
+
+
+def test_index_cache(monkeypatch):
+    """Test reading a file using a sidecar index cache."""
+    filename = os.path.join(tempfile.gettempdir(), 'test_index_cache.bddf')
+    sidecar_filename = filename + '.idx.npy'
+    if os.path.exists(sidecar_filename):
+        os.unlink(sidecar_filename)
+    start_nsec = now_nsec()
+
+    def _write_file(num_messages):
+        with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+            proto_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+            for idx in range(num_messages):
+                proto_writer.write(start_nsec + idx, OperatorComment(message=str(idx)))
+
+    def _check_file(num_messages):
+        with DataReader(filename=filename, use_index_cache=True) as data_reader:
+            proto_reader = ProtobufReader(data_reader)
+            channel_reader = ProtobufChannelReader(proto_reader, OperatorComment)
+            assert channel_reader.num_messages == num_messages
+            assert data_reader.series_descriptor(0).message_type.type_name == (
+                OperatorComment.DESCRIPTOR.full_name)
+            messages = list(channel_reader)
+            assert [msg.message for _, msg in messages] == [str(idx) for idx in range(num_messages)]
+            assert data_reader.series_timestamps(0).tolist() == [
+                start_nsec + idx for idx in range(num_messages)
+            ]
+            return data_reader.total_bytes(0)
+
+    _write_file(5)
+    total_bytes = _check_file(5)  # Writes the cache.
+    assert os.path.exists(sidecar_filename)
+    assert _check_file(5) == total_bytes  # Reads the cache.
+    with DataReader(filename=filename) as data_reader:
+        checksum = data_reader.checksum
+    with DataReader(filename=filename, use_index_cache=True) as data_reader:
+        # Opening the file with the cache does not parse the FileIndex.
+        assert data_reader._file_index is None  # pylint: disable=protected-access
+        assert data_reader.checksum == checksum
+        assert data_reader.num_data_blocks(0) == 5
+        assert data_reader.series_spec_to_index(
+            {'bosdyn:channel': OperatorComment.DESCRIPTOR.full_name}) == 0
+
+    # A stale cache is detected and replaced.
+    _write_file(20)
+    _check_file(20)
+    _check_file(20)
+
+    # An empty cache is replaced.
+    open(sidecar_filename, 'wb').close()
+    _check_file(20)
+    assert os.path.getsize(sidecar_filename) > 0
+
+    # Failing to write the cache does not prevent reading the file.
+    os.unlink(sidecar_filename)
+
+    def _fail_mkstemp(*args, **kwargs):
+        raise PermissionError('read-only directory')
+
+    monkeypatch.setattr(tempfile, 'mkstemp', _fail_mkstemp)
+    _check_file(20)
+    assert not os.path.exists(sidecar_filename)
+    monkeypatch.undo()
+    _check_file(20)
+
+    with pytest.raises(ValueError):
+        with open(filename, 'rb') as infile:
+            DataReader(infile, use_index_cache=True)
+
+    os.unlink(filename)
+    os.unlink(sidecar_filename)
+
+
+def test_checksum_modes():
+    """Test verifying the checksum of a file."""
+    filename = os.path.join(tempfile.gettempdir(), 'test_checksum.bddf')
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        series_index = data_writer.add_message_series('bosdyn/test/1', {'channel': 'a'},
+                                                      'text/plain', 'test_type')
+        for idx in range(100):
+            data_writer.write_data(series_index, idx + 1, b'This is some data')
+
+    for checksum_mode in (CHECKSUM_VERIFY_NONE, CHECKSUM_VERIFY_LAZY, CHECKSUM_VERIFY_STRICT):
+        with DataReader(filename=filename, checksum_mode=checksum_mode) as data_reader:
+            assert data_reader.checksum_mode == checksum_mode
+            assert data_reader.read(series_index, 50)[2] == b'This is some data'
+            assert data_reader.verify_checksum()
+            assert data_reader.read_checksum == data_reader.checksum
+
+    with open(filename, 'rb') as infile:
+        data = infile.read()
+    with pytest.raises(ValueError):
+        DataReader(io.BytesIO(data), checksum_mode='bogus')
+    with DataReader(io.BytesIO(data), checksum_mode=CHECKSUM_VERIFY_LAZY) as data_reader:
+        assert data_reader.verify_checksum()
+
+    # Corrupt one byte of message data.
+    corrupt_offset = data.rindex(b'This is some data')
+    with open(filename, 'wb') as outfile:
+        outfile.write(data[:corrupt_offset] + b't' + data[corrupt_offset + 1:])
+
+    with DataReader(filename=filename) as data_reader:
+        with pytest.raises(ChecksumError):
+            data_reader.verify_checksum()
+    with DataReader(filename=filename, checksum_mode=CHECKSUM_VERIFY_LAZY) as data_reader:
+        with pytest.raises(ChecksumError):
+            data_reader.verify_checksum()
+    with pytest.raises(ChecksumError):
+        DataReader(filename=filename, checksum_mode=CHECKSUM_VERIFY_STRICT)
+
+    def _read_stream(checksum_mode):
+        with open(filename, 'rb') as infile, StreamDataReader(
+                infile, checksum_mode=checksum_mode) as data_reader:
+            with pytest.raises(EOFError):
+                while True:
+                    data_reader.read_data_block()
+
+    with pytest.raises(ChecksumError):
+        _read_stream(CHECKSUM_VERIFY_STRICT)
+    _read_stream(CHECKSUM_VERIFY_NONE)
+
+    os.unlink(filename)
+
+
+@pytest.mark.parametrize('max_workers', [0, 2])
+def test_column_export(max_workers):
+    """Test exporting fields of a protobuf channel into columns."""
+    filename = os.path.join(tempfile.gettempdir(), 'test_columns.bddf')
+    start_nsec = now_nsec()
+    num_messages = 25
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        proto_writer = ProtobufSeriesWriter(data_writer, robot_state.RobotState)
+        for idx in range(num_messages):
+            state = robot_state.RobotState()
+            kinematic_state = state.kinematic_state
+            kinematic_state.acquisition_timestamp.seconds = idx
+            # Number of joints varies, and odd messages have no velocity.
+            for joint_idx in range(idx % 3 + 1):
+                joint_state = kinematic_state.joint_states.add(name='joint{}'.format(joint_idx))
+                joint_state.position.value = idx + joint_idx * 0.5
+            if idx % 2 == 0:
+                kinematic_state.velocity_of_body_in_odom.linear.x = idx
+            proto_writer.write(start_nsec + idx, state)
+
+    exporter = ProtobufColumnExporter(robot_state.RobotState, [
+        'kinematic_state.acquisition_timestamp.seconds',
+        'kinematic_state.joint_states[*].position',
+        'kinematic_state.joint_states[0].name',
+        'kinematic_state.velocity_of_body_in_odom',
+    ])
+    assert 'kinematic_state.velocity_of_body_in_odom.angular.z' in exporter.column_names
+    with pytest.raises(ValueError):
+        ProtobufColumnExporter(robot_state.RobotState, ['kinematic_state.joint_states.name'])
+    with pytest.raises(ValueError):
+        ProtobufColumnExporter(robot_state.RobotState, ['kinematic_state.bogus'])
+
+    columns = exporter.export_channel(filename, max_workers=max_workers, chunk_size=10)
+    assert columns['timestamp_nsec'].tolist() == [start_nsec + idx for idx in range(num_messages)]
+    assert columns['kinematic_state.acquisition_timestamp.seconds'].tolist() == list(
+        range(num_messages))
+    positions = columns['kinematic_state.joint_states[*].position.value']
+    assert positions.shape == (num_messages, 3)
+    assert positions[4][:2].tolist() == [4.0, 4.5]
+    assert np.isnan(positions[4][2])
+    assert np.isnan(positions[3][1])
+    assert columns['kinematic_state.joint_states[0].name'][0] == 'joint0'
+    linear_x = columns['kinematic_state.velocity_of_body_in_odom.linear.x']
+    assert linear_x[2] == 2.0
+    assert np.isnan(linear_x[3])
+
+    columns = exporter.export_channel(filename, start_nsec=start_nsec + 5,
+                                      end_nsec=start_nsec + 8, max_workers=max_workers)
+    assert columns['kinematic_state.acquisition_timestamp.seconds'].tolist() == [5, 6, 7]
+
+    # Column names may collide with the arguments of numpy functions.
+    columns['file'] = columns['timestamp_nsec']
+    for path in (os.path.join(tempfile.gettempdir(), 'test_columns.npz'),
+                 os.path.join(tempfile.gettempdir(), 'test_columns_dir')):
+        save_columns(columns, path)
+        loaded = load_columns(path)
+        assert sorted(loaded) == sorted(columns)
+        for name, array in columns.items():
+            assert np.array_equal(loaded[name], array, equal_nan=array.dtype.kind == 'f')
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.unlink(path)
+
+    os.unlink(filename)
+
+
+def test_stream_follow():
+    """Test following a file as it is written."""
+    filename = os.path.join(tempfile.gettempdir(), 'test_follow.bddf')
+    follow_filename = os.path.join(tempfile.gettempdir(), 'test_follow_growing.bddf')
+    start_nsec = now_nsec()
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        proto_writer = ProtobufSeriesWriter(data_writer, OperatorComment)
+        for idx in range(10):
+            proto_writer.write(start_nsec + idx, OperatorComment(message=str(idx)))
+    with open(filename, 'rb') as infile:
+        data = infile.read()
+
+    # Split the file in the middle of the block for message 5.
+    split_offset = data.index(OperatorComment(message='5').SerializeToString()) - 3
+    with open(follow_filename, 'wb') as outfile:
+        outfile.write(data[:split_offset])
+
+    def _messages(blocks):
+        messages = []
+        for _desc, timestamp_nsec, msg_data in blocks:
+            messages.append(OperatorComment())
+            messages[-1].ParseFromString(msg_data)
+            assert timestamp_nsec == start_nsec + int(messages[-1].message)
+        return [msg.message for msg in messages]
+
+    with open(follow_filename, 'rb') as infile, StreamDataReader(infile) as data_reader:
+        blocks = data_reader.follow(poll_interval_sec=0.01, timeout_sec=0.05)
+        assert _messages(blocks) == [str(idx) for idx in range(5)]
+        assert not data_reader.eof
+
+        with open(follow_filename, 'ab') as outfile:
+            outfile.write(data[split_offset:])
+        blocks = data_reader.follow(poll_interval_sec=0.01, timeout_sec=0.05)
+        assert _messages(blocks) == [str(idx) for idx in range(5, 10)]
+        assert data_reader.eof
+        assert data_reader.checksum == data_reader.read_checksum
+
+    os.unlink(filename)
+    os.unlink(follow_filename)
+
+
+@pytest.mark.parametrize('codec', [COMPRESSION_ZLIB, COMPRESSION_LZMA])
+def test_compression(codec):
+    """Test writing and reading compressed series."""
+    filename = os.path.join(tempfile.gettempdir(), 'test_compression.bddf')
+    start_nsec = now_nsec()
+    comments = [OperatorComment(message='comment {}'.format(idx) * 20) for idx in range(10)]
+    raw_data = bytes(range(256)) * 16
+    pod_spec = {'varname': 'compressed'}
+
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        proto_writer = ProtobufSeriesWriter(data_writer, OperatorComment, compression=codec,
+                                            annotations={'key': 'value'})
+        pod_writer = PodSeriesWriter(data_writer, 'bosdyn/test/pod', pod_spec, bddf.TYPE_FLOAT64,
+                                     data_block_size=80, compression=codec, compression_level=1)
+        raw_index = data_writer.add_message_series('bosdyn/test/raw', {'name': 'raw'},
+                                                   'application/octet-stream', 'raw',
+                                                   compression=codec)
+        for idx, comment in enumerate(comments):
+            proto_writer.write(start_nsec + idx, comment)
+            pod_writer.write(start_nsec + idx, float(idx))
+        data_writer.write_data(raw_index, start_nsec, raw_data)
+        with pytest.raises(DataFormatError):
+            data_writer.add_message_series('bosdyn/test/raw', {'name': 'bad'},
+                                           'application/octet-stream', 'raw',
+                                           compression='no-such-codec')
+
+    for use_mmap in (False, True):
+        with DataReader(filename=filename, use_mmap=use_mmap) as data_reader:
+            proto_reader = ProtobufReader(data_reader)
+            channel_reader = ProtobufChannelReader(proto_reader, OperatorComment)
+            assert [channel_reader.get_message(idx)[1] for idx in range(10)] == comments
+            series_index = 0  # The protobuf series was added first.
+            descriptor = data_reader.series_descriptor(series_index)
+            assert descriptor.annotations[COMPRESSION_ANNOTATION] == codec
+            assert descriptor.annotations['key'] == 'value'
+            assert data_reader.series_compression(series_index) == codec
+            # The index records the size of the data as stored.
+            stored_bytes = data_reader.total_bytes(series_index)
+            assert stored_bytes < sum(len(msg.SerializeToString()) for msg in comments)
+
+            pod_reader = PodSeriesReader(data_reader, pod_spec)
+            assert pod_reader.num_data_blocks == 1
+            _timestamps, values = pod_reader.read_all_array()
+            assert values.tolist() == [float(idx) for idx in range(10)]
+
+            assert data_reader.read(raw_index, 0)[2] == raw_data
+
+    with open(filename, 'rb') as infile, StreamDataReader(infile) as data_reader:
+        messages = []
+        while True:
+            try:
+                desc, series_descriptor, data = data_reader.read_data_block()
+            except EOFError:
+                break
+            if desc.series_index == raw_index:
+                assert data == raw_data
+            elif series_descriptor.message_type.type_name == OperatorComment.DESCRIPTOR.full_name:
+                messages.append(OperatorComment())
+                messages[-1].ParseFromString(data)
+        assert messages == comments
+
+    os.unlink(filename)
@@ -5,6 +5,8 @@
 # Development Kit License (20191101-BDSDK-SL).
 
 """Tests for bosdyn.util"""
+import numpy as np
+import pytest
 from google.protobuf.timestamp_pb2 import Timestamp
 
 from bosdyn import util
@@ -21,6 +23,37 @@ def test_time_converter():
     assert timestamp.nanos == 100
 
 
+def test_robot_time_converter_drift():
+    """tests for RobotTimeConverter with a clock drift """
+    converter = util.RobotTimeConverter(100, drift=1e-3, reference_local_nsec=10**6)
+    assert converter.clock_skew_nsec(10**6) == 100
+    assert converter.clock_skew_nsec(2 * 10**6) == 1100
+    timestamp = converter.robot_timestamp_from_local_nsecs(2 * 10**6)
+    assert timestamp.seconds == 0
+    assert timestamp.nanos == 2 * 10**6 + 1100
+    assert converter.robot_seconds_from_local_seconds(0.002) == pytest.approx(0.0020011)
+
+
+def test_robot_time_converter_arrays():
+    """tests for RobotTimeConverter conversion of arrays of times """
+    local_nsecs = np.arange(5, dtype=np.int64) * 10**9 + 1600000000 * 10**9
+    converter = util.RobotTimeConverter(-123)
+    robot_nsecs = converter.robot_nsecs_from_local_nsecs(local_nsecs)
+    assert robot_nsecs.dtype == np.int64
+    np.testing.assert_array_equal(robot_nsecs, local_nsecs - 123)
+    np.testing.assert_array_equal(converter.local_nsecs_from_robot_nsecs(robot_nsecs),
+                                  local_nsecs)
+
+    converter = util.RobotTimeConverter(100, drift=1e-6, reference_local_nsec=local_nsecs[0])
+    robot_nsecs = converter.robot_nsecs_from_local_nsecs(local_nsecs)
+    assert list(robot_nsecs) == [
+        util.timestamp_to_nsec(converter.robot_timestamp_from_local_nsecs(int(local_nsec)))
+        for local_nsec in local_nsecs
+    ]
+    np.testing.assert_array_equal(converter.local_nsecs_from_robot_nsecs(robot_nsecs),
+                                  local_nsecs)
+
+
 def test_timestamp_conversion():
     """Check timestamp conversion functions."""
     sec = util.timestamp_to_sec(Timestamp(seconds=2, nanos=5 * 10**8))
@@ -0,0 +1,97 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Measure how well the data in a bddf file compresses with each available codec."""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from bosdyn.bddf import DataReader, DataWriter, available_codecs
+
+
+def read_blocks(filename):
+    """Read all series descriptors and data blocks from a bddf file into memory.
+
+    Returns: list of SeriesDescriptor, list of (series_index, timestamp_nsec, data, DataDescriptor)
+    """
+    with DataReader(filename=filename) as data_reader:
+        descriptors = [
+            data_reader.series_descriptor(series_index)
+            for series_index in range(len(data_reader.file_index.series_identifiers))
+        ]
+        blocks = []
+        for series_index in range(len(descriptors)):
+            for index_in_series in range(data_reader.num_data_blocks(series_index)):
+                desc, timestamp_nsec, data = data_reader.read(series_index, index_in_series)
+                blocks.append((series_index, timestamp_nsec, bytes(data), desc))
+    return descriptors, blocks
+
+
+def write_file(filename, descriptors, blocks, codec, level):
+    """Write the series and blocks to a bddf file, compressed with the codec."""
+    with open(filename, 'wb') as outfile, DataWriter(outfile) as data_writer:
+        for descriptor in descriptors:
+            identifier = descriptor.series_identifier
+            data_type = descriptor.WhichOneof('DataType')
+            data_writer.add_series(
+                identifier.series_type, dict(identifier.spec),
+                message_type=descriptor.message_type if data_type == 'message_type' else None,
+                pod_type=descriptor.pod_type if data_type == 'pod_type' else None,
+                annotations=dict(descriptor.annotations),
+                additional_index_names=list(descriptor.additional_index_names),
+                compression=codec, compression_level=level)
+        for series_index, timestamp_nsec, data, desc in blocks:
+            additional_indexes = list(desc.additional_indexes) or None
+            data_writer.write_data(series_index, timestamp_nsec, data, additional_indexes)
+
+
+def read_file(filename):
+    """Read and decompress every data block of a bddf file."""
+    with DataReader(filename=filename) as data_reader:
+        for series_index in range(len(data_reader.file_index.series_identifiers)):
+            for index_in_series in range(data_reader.num_data_blocks(series_index)):
+                data_reader.read(series_index, index_in_series)
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('filename', help='bddf file to benchmark')
+    parser.add_argument('--codec', action='append', choices=available_codecs(),
+                        help='codec to measure (may be repeated, default all available)')
+    parser.add_argument('--level', type=int, help='codec-specific compression level')
+    options = parser.parse_args()
+
+    descriptors, blocks = read_blocks(options.filename)
+    raw_nbytes = sum(len(block[2]) for block in blocks)
+    if not raw_nbytes:
+        print('No data in {}'.format(options.filename))
+        return False
+    print('{}: {} series, {} blocks, {} bytes of data'.format(options.filename, len(descriptors),
+                                                              len(blocks), raw_nbytes))
+    print('{:>6} {:>12} {:>8} {:>12} {:>12}'.format('codec', 'file bytes', 'ratio', 'write MB/s',
+                                                    'read MB/s'))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for codec in [None] + (options.codec or available_codecs()):
+            filename = os.path.join(tmpdir, '{}.bddf'.format(codec or 'none'))
+            start = time.perf_counter()
+            write_file(filename, descriptors, blocks, codec, options.level)
+            write_sec = time.perf_counter() - start
+            start = time.perf_counter()
+            read_file(filename)
+            read_sec = time.perf_counter() - start
+            file_nbytes = os.path.getsize(filename)
+            print('{:>6} {:>12} {:>8.2f} {:>12.1f} {:>12.1f}'.format(
+                codec or 'none', file_nbytes, raw_nbytes / file_nbytes,
+                raw_nbytes / write_sec / 1e6, raw_nbytes / read_sec / 1e6))
+    return True
+
+
+if __name__ == '__main__':
+    if not main():
+        sys.exit(1)
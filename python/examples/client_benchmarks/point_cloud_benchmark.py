@@ -0,0 +1,84 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Compare decoding and encoding point clouds with bosdyn.client.point_cloud against per-point
+struct loops."""
+import argparse
+import struct
+import time
+
+import numpy as np
+
+from bosdyn.api import point_cloud_pb2
+from bosdyn.client.point_cloud import decode_point_cloud, encode_point_cloud
+
+ENCODINGS = {
+    'XYZ_32F': point_cloud_pb2.PointCloud.ENCODING_XYZ_32F,
+    'XYZ_4SC': point_cloud_pb2.PointCloud.ENCODING_XYZ_4SC,
+    'XYZ_5SC': point_cloud_pb2.PointCloud.ENCODING_XYZ_5SC,
+}
+
+
+def naive_decode(point_cloud):
+    """Decode a point cloud one point at a time."""
+    data = point_cloud.data
+    if point_cloud.encoding == point_cloud_pb2.PointCloud.ENCODING_XYZ_32F:
+        return [struct.unpack_from('<3f', data, 12 * index) for index in range(len(data) // 12)]
+    params = point_cloud.encoding_parameters
+    f = params.scale_factor
+    maxes = (params.max_x, params.max_y, params.max_z)
+    extra_format = '<B' if params.bytes_per_point == 4 else '<H'
+    points = []
+    for index in range(point_cloud.num_points):
+        offset = index * params.bytes_per_point
+        p1 = struct.unpack_from('<3b', data, offset)
+        (x,) = struct.unpack_from(extra_format, data, offset + 3)
+        p2 = (x % f - f / 2.0, (x // f) % f - f / 2.0, (x // (f * f)) % f - f / 2.0)
+        points.append(
+            tuple((p1[i] * f + p2[i]) / (params.remapping_constant * f) * maxes[i]
+                  for i in range(3)))
+    return points
+
+
+def naive_encode_32f(points):
+    """Encode an XYZ_32F point cloud one point at a time."""
+    data = b''.join(struct.pack('<3f', *point) for point in points.tolist())
+    return point_cloud_pb2.PointCloud(num_points=len(points),
+                                      encoding=point_cloud_pb2.PointCloud.ENCODING_XYZ_32F,
+                                      data=data)
+
+
+def _mean_msec(func, iterations):
+    func()  # Warm up.
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=5, help='calls per measurement')
+    parser.add_argument('--num-points', type=int, nargs='+', default=[10000, 100000],
+                        help='point cloud sizes to measure')
+    options = parser.parse_args()
+    for num_points in options.num_points:
+        points = np.random.default_rng(0).uniform(-10, 10, (num_points, 3)).astype(np.float32)
+        for name, encoding in ENCODINGS.items():
+            point_cloud = encode_point_cloud(points, encoding, max_bounds=(10, 10, 10))
+            naive_msec = _mean_msec(lambda: naive_decode(point_cloud), options.iterations)
+            numpy_msec = _mean_msec(lambda: decode_point_cloud(point_cloud), options.iterations)
+            print('  decode {:>8} points {}: {:10.3f} ms naive {:10.3f} ms numpy'.format(
+                num_points, name, naive_msec, numpy_msec))
+        naive_msec = _mean_msec(lambda: naive_encode_32f(points), options.iterations)
+        numpy_msec = _mean_msec(lambda: encode_point_cloud(points), options.iterations)
+        print('  encode {:>8} points XYZ_32F: {:10.3f} ms naive {:10.3f} ms numpy'.format(
+            num_points, naive_msec, numpy_msec))
+
+
+if __name__ == '__main__':
+    main()
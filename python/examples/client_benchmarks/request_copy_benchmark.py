@@ -0,0 +1,131 @@
+# Copyright (c) 2022 Boston Dynamics, Inc.  All rights reserved.
+#
+# Downloading, reproducing, distributing or otherwise using the SDK Software
+# is subject to the terms and conditions of the Boston Dynamics Software
+# Development Kit License (20191101-BDSDK-SL).
+
+"""Measure the cost of copying large requests and responses in client rpcs.
+
+Requests are sent to mock services running in this process, so no robot is needed.
+"""
+import argparse
+import concurrent.futures
+import copy
+import time
+
+import grpc
+
+from bosdyn.api import data_buffer_pb2, data_buffer_service_pb2_grpc
+from bosdyn.api.graph_nav import graph_nav_pb2, graph_nav_service_pb2_grpc, map_pb2
+from bosdyn.client.common import REQUEST_COPY_DEEP, REQUEST_COPY_PROCESSED_FIELDS
+from bosdyn.client.data_buffer import DataBufferClient
+from bosdyn.client.graph_nav import GraphNavClient
+from bosdyn.client.processors import AddRequestHeader
+
+CHUNK_NBYTES = 1024 * 1024
+MAX_MESSAGE_NBYTES = 512 * 1024 * 1024
+CHANNEL_OPTIONS = [
+    ('grpc.max_send_message_length', MAX_MESSAGE_NBYTES),
+    ('grpc.max_receive_message_length', MAX_MESSAGE_NBYTES),
+]
+
+
+class MockDataBufferServicer(data_buffer_service_pb2_grpc.DataBufferServiceServicer):
+    """Accepts blobs without storing them."""
+
+    def RecordDataBlobs(self, request, context):
+        response = data_buffer_pb2.RecordDataBlobsResponse()
+        response.header.request_header.CopyFrom(request.header)
+        response.header.error.code = response.header.error.CODE_OK
+        return response
+
+
+class MockGraphNavServicer(graph_nav_service_pb2_grpc.GraphNavServiceServicer):
+    """Streams a waypoint snapshot of a given size in chunks."""
+
+    def __init__(self, snapshot_nbytes):
+        super(MockGraphNavServicer, self).__init__()
+        snapshot = map_pb2.WaypointSnapshot(id='benchmark')
+        snapshot.point_cloud.data = bytes(snapshot_nbytes)
+        self._serialized = snapshot.SerializeToString()
+
+    def DownloadWaypointSnapshot(self, request, context):
+        for start in range(0, len(self._serialized), CHUNK_NBYTES):
+            response = graph_nav_pb2.DownloadWaypointSnapshotResponse(
+                status=graph_nav_pb2.DownloadWaypointSnapshotResponse.STATUS_OK)
+            response.header.request_header.CopyFrom(request.header)
+            response.header.error.code = response.header.error.CODE_OK
+            response.chunk.total_size = len(self._serialized)
+            response.chunk.data = self._serialized[start:start + CHUNK_NBYTES]
+            yield response
+
+
+def _start_server(servicer, servicer_adder, client):
+    server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=4),
+                         options=CHANNEL_OPTIONS)
+    servicer_adder(servicer, server)
+    port = server.add_insecure_port('localhost:0')
+    server.start()
+    client.channel = grpc.insecure_channel('localhost:{}'.format(port), options=CHANNEL_OPTIONS)
+    client.request_processors.append(AddRequestHeader(lambda: 'benchmark'))
+    return server
+
+
+def _mean_msec(func, iterations):
+    func()  # Warm up the channel.
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def benchmark_requests(payload_nbytes, iterations):
+    """Print the latency of sending a large request with each request copy policy."""
+    client = DataBufferClient()
+    server = _start_server(MockDataBufferServicer(),
+                           data_buffer_service_pb2_grpc.add_DataBufferServiceServicer_to_server,
+                           client)
+    request = data_buffer_pb2.RecordDataBlobsRequest()
+    request.blob_data.add(channel='benchmark', type_id='bytes', data=bytes(payload_nbytes))
+    for policy in (REQUEST_COPY_DEEP, REQUEST_COPY_PROCESSED_FIELDS):
+        client.request_copy_policy = policy
+        msec = _mean_msec(lambda: client.call(client._stub.RecordDataBlobs, request), iterations)
+        print('  request  {:>10} bytes  {:>16}: {:8.2f} ms/call'.format(
+            payload_nbytes, policy, msec))
+    server.stop(None)
+
+
+def benchmark_streamed_response(payload_nbytes, iterations):
+    """Print the latency of downloading a large streamed response, and the cost of the
+    per-chunk response copies which were previously made."""
+    client = GraphNavClient()
+    server = _start_server(MockGraphNavServicer(payload_nbytes),
+                           graph_nav_service_pb2_grpc.add_GraphNavServiceServicer_to_server,
+                           client)
+    msec = _mean_msec(lambda: client.download_waypoint_snapshot('benchmark'), iterations)
+    request = graph_nav_pb2.DownloadWaypointSnapshotRequest(waypoint_snapshot_id='benchmark')
+    responses = list(client._stub.DownloadWaypointSnapshot(request))
+    copy_msec = _mean_msec(lambda: [copy.deepcopy(response) for response in responses],
+                           iterations)
+    print('  response {:>10} bytes  {:>16}: {:8.2f} ms/call'.format(payload_nbytes, 'no copy',
+                                                                     msec))
+    print('  response {:>10} bytes  {:>16}: {:8.2f} ms/call'.format(payload_nbytes, 'deep copy',
+                                                                     msec + copy_msec))
+    server.stop(None)
+
+
+def main():
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=20, help='rpcs per measurement')
+    parser.add_argument('--sizes-mb', type=int, nargs='+', default=[1, 10, 50],
+                        help='payload sizes (MB) to measure')
+    options = parser.parse_args()
+    for size_mb in options.sizes_mb:
+        payload_nbytes = size_mb * 1024 * 1024
+        benchmark_requests(payload_nbytes, options.iterations)
+        benchmark_streamed_response(payload_nbytes, options.iterations)
+
+
+if __name__ == '__main__':
+    main()